@@ -0,0 +1,75 @@
+"""File size, load time and save time of the JSON and binary todo formats.
+
+``baseline`` is the original single ``json.dump(indent=2)`` / ``json.load``
+of the whole list, for comparison with the stores.
+
+Usage: python benchmarks/bench_formats.py [count]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from models import Priority, Status, TodoItem  # noqa: E402
+from storage import BinaryStore, JsonStore  # noqa: E402
+
+DEFAULT_COUNT = 100_000
+
+
+def make_todos(count: int) -> list:
+    priorities, statuses = list(Priority), list(Status)
+    return [
+        TodoItem(
+            title=f"Todo number {i}",
+            details="Some details about the task" if i % 3 else "",
+            priority=priorities[i % 3],
+            status=statuses[i % 2],
+            owner=f"user{i % 50}",
+        ).to_dict()
+        for i in range(count)
+    ]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+class BaselineStore:
+    """The whole-list json.dump/json.load the stores replaced."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def save(self, todos: list) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(todos, f, indent=2)
+
+    def load(self) -> list:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def main(count: int) -> None:
+    todos = make_todos(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "baseline": BaselineStore(Path(tmp) / "baseline.json"),
+            "json": JsonStore(Path(tmp) / "todos.json"),
+            "binary": BinaryStore(Path(tmp) / "todos.bin"),
+        }
+        print(f"{count} to-dos")
+        print(f"{'format':>8} {'size (KiB)':>11} {'save (s)':>9} {'load (s)':>9}")
+        for name, store in stores.items():
+            save_s = timed(lambda: store.save(todos))
+            load_s = timed(store.load)
+            size_kib = store.path.stat().st_size / 1024
+            print(f"{name:>8} {size_kib:>11.0f} {save_s:>9.3f} {load_s:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
@@ -0,0 +1,26 @@
+"""Throughput of the uuid7 generator against uuid.uuid4().
+
+Usage: python benchmarks/bench_ids.py [count]
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import ids  # noqa: E402
+
+DEFAULT_COUNT = 200_000
+
+
+def main(count: int) -> None:
+    cases = {"uuid4": ids.uuid4, "uuid7": ids.uuid7}
+    print(f"{count} ids, best of 5")
+    print(f"{'generator':>10} {'ids/s':>12}")
+    for name, generate in cases.items():
+        best = min(timeit.repeat(generate, number=count, repeat=5))
+        print(f"{name:>10} {count / best:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
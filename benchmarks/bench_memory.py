@@ -0,0 +1,61 @@
+"""Bytes per todo held in memory by each in-memory representation.
+
+Compares the list of dicts a JSON load produces, TodoManager's default
+``id -> TodoItem`` dict and the columnar store, measured with tracemalloc.
+
+Usage: python benchmarks/bench_memory.py [count]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from columnar import ColumnarTodos  # noqa: E402
+from models import Priority, Status, TodoItem  # noqa: E402
+
+DEFAULT_COUNT = 1_000_000
+
+
+def iter_records(count: int):
+    """Records as json.loads returns them: every value is its own string."""
+    priorities, statuses = list(Priority), list(Status)
+    for i in range(count):
+        line = json.dumps(TodoItem(
+            title=f"Todo number {i}",
+            details="Some details about the task" if i % 3 else "",
+            priority=priorities[i % 3],
+            status=statuses[i % 2],
+            owner=f"user{i % 1000}",
+        ).to_dict())
+        yield json.loads(line)
+
+
+def measure(build, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build(iter_records(count))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del result
+    return used / count
+
+
+def main(count: int) -> None:
+    cases = {
+        "list of dicts": list,
+        "TodoItem dict": lambda records: {t.id: t for t in map(TodoItem.from_dict, records)},
+        "columnar": ColumnarTodos.from_records,
+    }
+    print(f"{count} records")
+    print(f"{'layout':>14} {'bytes/todo':>10}")
+    for name, build in cases.items():
+        print(f"{name:>14} {measure(build, count):>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
@@ -0,0 +1,78 @@
+"""Micro-benchmark of TodoItem.from_dict / to_dict against the original dataclass.
+
+Usage: python benchmarks/bench_models.py [count]
+"""
+import sys
+import timeit
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from models import Priority, Status, TodoItem  # noqa: E402
+
+DEFAULT_COUNT = 100_000
+
+
+@dataclass
+class LegacyTodoItem:
+    """TodoItem as it was before it became slotted (kept for comparison)."""
+
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    title: str = ""
+    details: str = ""
+    priority: Priority = Priority.MID
+    status: Status = Status.PENDING
+    owner: str = ""
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    version: int = 1
+
+    def to_dict(self):
+        d = asdict(self)
+        d["priority"] = self.priority.value
+        d["status"] = self.status.value
+        return d
+
+    @staticmethod
+    def from_dict(data):
+        return LegacyTodoItem(
+            id=data.get("id", str(uuid.uuid4())),
+            title=data.get("title", ""),
+            details=data.get("details", ""),
+            priority=Priority(data.get("priority", "MID")),
+            status=Status(data.get("status", "PENDING")),
+            owner=data.get("owner", ""),
+            created_at=data.get("created_at", datetime.now(timezone.utc).isoformat()),
+            updated_at=data.get("updated_at", datetime.now(timezone.utc).isoformat()),
+            version=data.get("version", 1),
+        )
+
+
+def best_of(stmt) -> float:
+    return min(timeit.repeat(stmt, number=1, repeat=5))
+
+
+def main(count: int) -> None:
+    records = [TodoItem(title=f"Todo {i}", owner="alice").to_dict() for i in range(count)]
+    legacy_items = [LegacyTodoItem.from_dict(r) for r in records]
+    items = [TodoItem.from_dict(r) for r in records]
+    cases = {
+        "from_dict": (lambda: [LegacyTodoItem.from_dict(r) for r in records],
+                      lambda: [TodoItem.from_dict(r) for r in records]),
+        "to_dict": (lambda: [t.to_dict() for t in legacy_items],
+                    lambda: [t.to_dict() for t in items]),
+    }
+    print(f"{count} records, best of 5 (seconds)")
+    print(f"{'operation':>10} {'legacy':>8} {'slotted':>8} {'speedup':>8}")
+    for name, (legacy_stmt, new_stmt) in cases.items():
+        legacy, new = best_of(legacy_stmt), best_of(new_stmt)
+        print(f"{name:>10} {legacy:>8.3f} {new:>8.3f} {legacy / new:>7.1f}x")
+    legacy_size = sys.getsizeof(legacy_items[0]) + sys.getsizeof(legacy_items[0].__dict__)
+    print(f"instance size: legacy {legacy_size} B, slotted {sys.getsizeof(items[0])} B")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
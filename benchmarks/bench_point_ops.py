@@ -0,0 +1,68 @@
+"""Latency of TodoManager point operations as the dataset grows.
+
+Usage: python benchmarks/bench_point_ops.py [sizes...]
+
+Persistence is stubbed out so the numbers reflect the in-memory lookup cost
+of get_todo_by_id / update_todo / delete_todo only.
+"""
+import random
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from main import TodoManager  # noqa: E402
+from models import TodoItem  # noqa: E402
+from storage import JsonStore  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+SAMPLES = 2_000
+
+
+class NullStore(JsonStore):
+    """Never touches the filesystem, not even for the lock file."""
+
+    def __init__(self, todos: list):
+        super().__init__(Path("/dev/null"))
+        self._todos = todos
+
+    def lock(self, shared: bool = False):
+        return nullcontext()
+
+    def signature(self):
+        return None
+
+    def load(self) -> list:
+        return self._todos
+
+    def save(self, todos) -> None:
+        pass
+
+
+def build_manager(size: int) -> TodoManager:
+    todos = [TodoItem(title=f"Todo {i}", owner=f"user{i % 100}").to_dict() for i in range(size)]
+    return TodoManager(store=NullStore(todos))
+
+
+def per_op_us(fn, ids: list) -> float:
+    start = time.perf_counter()
+    for todo_id in ids:
+        fn(todo_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main(sizes) -> None:
+    print(f"{'items':>10} {'get (us)':>10} {'update (us)':>12} {'delete (us)':>12}")
+    for size in sizes:
+        manager = build_manager(size)
+        ids = random.sample(list(manager.todos), min(SAMPLES, size))
+        get_us = per_op_us(manager.get_todo_by_id, ids)
+        update_us = per_op_us(lambda i: manager.update_todo(i, status="COMPLETED"), ids)
+        delete_us = per_op_us(manager.delete_todo, ids)
+        print(f"{size:>10} {get_us:>10.2f} {update_us:>12.2f} {delete_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,182 @@
+"""Maintenance commands for the to-do data directory.
+
+Usage: python src/admin.py <command> [options]
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from clock import us_from_iso
+from main import DB_FILE, TODOS_FILE, USERS_FILE, create_todo_manager, using_sqlite
+from models import Priority, Status
+import sqlite_backend
+from storage import JsonStore, ShardedStore, convert_file, open_store, reshard
+from streaming import OffsetIndex
+from transfer import DATE_FIELDS, RecordFilter, export_jsonl, iter_jsonl_chunks
+
+MAX_REPORTED_ERRORS = 20
+
+SHARD_DIR = TODOS_FILE.with_suffix("")
+
+
+def cmd_migrate_sqlite(args: argparse.Namespace) -> int:
+    todo_count, user_count = sqlite_backend.migrate_from_json(args.todos, args.users, args.db)
+    print(f"Migrated {todo_count} to-dos and {user_count} users into {args.db}")
+    return 0
+
+
+def cmd_reshard(args: argparse.Namespace) -> int:
+    if not (args.root / ShardedStore.MANIFEST).exists():
+        ShardedStore(args.root, legacy_path=args.legacy)
+    counts = reshard(args.root)
+    print(f"Resharded {sum(counts.values())} to-dos across {len(counts)} owners in {args.root}")
+    return 0
+
+
+def cmd_unshard(args: argparse.Namespace) -> int:
+    store = ShardedStore(args.root)
+    # Held until the merged file is written, so no shard changes in between.
+    with store.lock():
+        todos = store.load()
+        JsonStore(args.output).save(todos)
+    print(f"Wrote {len(todos)} to-dos to {args.output}")
+    return 0
+
+
+def cmd_convert(args: argparse.Namespace) -> int:
+    count = convert_file(args.source, args.dest)
+    print(f"Converted {count} to-dos from {args.source} to {args.dest}")
+    return 0
+
+
+def cmd_build_index(args: argparse.Namespace) -> int:
+    index = OffsetIndex.build(args.file)
+    print(f"Indexed {len(index)} to-dos into {OffsetIndex.index_path(args.file)}")
+    return 0
+
+
+def _timestamp(value: str) -> int:
+    micros = us_from_iso(value)
+    if micros is None:
+        raise argparse.ArgumentTypeError(f"not an ISO date or time: {value!r}")
+    return micros
+
+
+def _record_filter(args: argparse.Namespace) -> RecordFilter:
+    return RecordFilter(
+        owner=args.owner,
+        status=args.status,
+        priority=args.priority,
+        since=args.since,
+        until=args.until,
+        date_field=args.date_field,
+    )
+
+
+def _export_source(owner: str | None):
+    if not using_sqlite():
+        yield from open_store(TODOS_FILE).stream(owner)
+        return
+    manager = sqlite_backend.SqliteTodoManager(DB_FILE)
+    try:
+        yield from manager.iter_records(owner)
+    finally:
+        manager.close()
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    records = _export_source(args.owner)
+    if args.output == "-":
+        count = export_jsonl(records, sys.stdout, _record_filter(args))
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            count = export_jsonl(records, f, _record_filter(args))
+    print(f"Exported {count} to-dos", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    manager = create_todo_manager()
+    imported, errors = 0, []
+    try:
+        with manager.transaction():
+            for records, parse_errors in iter_jsonl_chunks(args.file, _record_filter(args), args.workers):
+                errors.extend(parse_errors)
+                for result in manager.import_many(records, overwrite=args.overwrite):
+                    if result.ok:
+                        imported += 1
+                    else:
+                        errors.append(f"{result.todo_id}: {result.error}")
+    finally:
+        manager.close()
+    for error in errors[:MAX_REPORTED_ERRORS]:
+        print(f"skipped {error}", file=sys.stderr)
+    if len(errors) > MAX_REPORTED_ERRORS:
+        print(f"... and {len(errors) - MAX_REPORTED_ERRORS} more", file=sys.stderr)
+    print(f"Imported {imported} to-dos from {args.file} ({len(errors)} skipped)")
+    return 1 if errors else 0
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--owner")
+    parser.add_argument("--status", type=str.upper, choices=[s.value for s in Status])
+    parser.add_argument("--priority", type=str.upper, choices=[p.value for p in Priority])
+    parser.add_argument("--since", type=_timestamp, help="only records at or after this ISO date/time")
+    parser.add_argument("--until", type=_timestamp, help="only records before this ISO date/time")
+    parser.add_argument("--date-field", choices=DATE_FIELDS, default="created_at",
+                        help="timestamp that --since/--until apply to")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="admin.py", description="To-do data maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate-sqlite", help="copy todos.json and users.json into SQLite")
+    migrate.add_argument("--todos", type=Path, default=TODOS_FILE)
+    migrate.add_argument("--users", type=Path, default=USERS_FILE)
+    migrate.add_argument("--db", type=Path, default=DB_FILE)
+    migrate.set_defaults(func=cmd_migrate_sqlite)
+
+    resh = sub.add_parser("reshard", help="split todos.json into per-owner shards, or rebuild existing shards")
+    resh.add_argument("--root", type=Path, default=SHARD_DIR)
+    resh.add_argument("--legacy", type=Path, default=TODOS_FILE)
+    resh.set_defaults(func=cmd_reshard)
+
+    unshard = sub.add_parser("unshard", help="merge per-owner shards back into a single JSON file")
+    unshard.add_argument("--root", type=Path, default=SHARD_DIR)
+    unshard.add_argument("--output", type=Path, default=TODOS_FILE)
+    unshard.set_defaults(func=cmd_unshard)
+
+    convert = sub.add_parser("convert", help="convert between JSON/JSONL and the binary format (.bin)")
+    convert.add_argument("source", type=Path)
+    convert.add_argument("dest", type=Path)
+    convert.set_defaults(func=cmd_convert)
+
+    build_index = sub.add_parser("build-index", help="write an id -> byte offset index next to a data file")
+    build_index.add_argument("file", type=Path, nargs="?", default=TODOS_FILE)
+    build_index.set_defaults(func=cmd_build_index)
+
+    export = sub.add_parser("export", help="stream to-dos to a JSON Lines file")
+    export.add_argument("--output", "-o", default="-", help="output file (default: stdout)")
+    _add_filter_arguments(export)
+    export.set_defaults(func=cmd_export)
+
+    imp = sub.add_parser("import", help="add to-dos from a JSON Lines file in one batched write")
+    imp.add_argument("file", type=Path)
+    imp.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                     help="processes used to parse the input (default: CPU count)")
+    imp.add_argument("--overwrite", action="store_true", help="replace to-dos whose id already exists")
+    _add_filter_arguments(imp)
+    imp.set_defaults(func=cmd_import)
+
+    return parser
+
+
+def main(argv: list | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
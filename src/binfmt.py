@@ -0,0 +1,242 @@
+"""Compact binary encoding for todo records.
+
+File layout::
+
+    header   b"TODB" | version u8
+    record*  u32 length | body
+
+Record body (format 3)::
+
+    flags u8 | priority u8 | status u8 | version u32
+    created_at, updated_at   int64 epoch microseconds
+    id                       16 raw UUID bytes (zero unless flag bit 0 is set)
+    7 x u32                  byte lengths of the strings below
+    id, created_at, updated_at, title, details, owner, extras   UTF-8 bytes
+
+The head is fixed-size, so a record is packed and unpacked with a single
+precompiled ``Struct`` call followed by one string decode. The id string
+is empty when the raw UUID is used, and a timestamp string is empty unless
+it could not be stored as micros. Timestamps are stored in UTC; flag bits
+record whether the original ISO string was naive so it can be reproduced
+exactly. ``extras`` is a JSON object of any other keys, empty when there
+are none. Formats 1 and 2 (each field length-prefixed in turn, format 1
+without the record version) are still read.
+"""
+import json
+import struct
+from typing import BinaryIO, Iterable, Iterator
+
+from clock import TS_STRING, micros_to_timestamp, timestamp_to_micros
+from models import Priority
+
+MAGIC = b"TODB"
+VERSION = 3
+READABLE_VERSIONS = (1, 2, 3)
+
+PRIORITY_CODES = {p.value: p.rank for p in Priority}
+STATUS_CODES = {"PENDING": 0, "COMPLETED": 1}
+PRIORITY_NAMES = {v: k for k, v in PRIORITY_CODES.items()}
+STATUS_NAMES = {v: k for k, v in STATUS_CODES.items()}
+CORE_FIELDS = frozenset(("id", "title", "details", "priority", "status", "owner", "created_at", "updated_at", "version"))
+
+FLAG_UUID_ID = 0x01
+# Two bits per timestamp, holding the clock.TS_* kind.
+CREATED_SHIFT, UPDATED_SHIFT = 1, 3
+
+_HEADER = struct.Struct("<4sB")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+# The u32 record length followed by the fixed part of a format 3 body.
+_RECORD = struct.Struct("<IBBBIqq16s7I")
+_BODY = struct.Struct("<BBBIqq16s7I")
+_NO_UUID = bytes(16)
+_FIXED_V2 = struct.Struct("<BBBI")
+_FIXED_V1 = struct.Struct("<BBB")
+
+
+class BinaryFormatError(ValueError):
+    """Raised when a file is not in the binary todo format."""
+
+
+def _uuid_str(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _uuid_bytes(value) -> bytes | None:
+    """16 raw bytes for a canonical lowercase UUID string, else None."""
+    if not isinstance(value, str) or len(value) != 36:
+        return None
+    try:
+        raw = bytes.fromhex(value.replace("-", ""))
+    except ValueError:
+        return None
+    return raw if len(raw) == 16 and _uuid_str(raw) == value else None
+
+
+def encode_record(record: dict) -> bytes:
+    todo_id = record.get("id", "")
+    raw = _uuid_bytes(todo_id)
+    if raw is not None:
+        flags, todo_id = FLAG_UUID_ID, ""
+    else:
+        flags, raw, todo_id = 0, _NO_UUID, str(todo_id)
+    created_at, updated_at = record.get("created_at", ""), record.get("updated_at", "")
+    created_kind, created_us = timestamp_to_micros(created_at)
+    if updated_at == created_at:
+        updated_kind, updated_us = created_kind, created_us
+    else:
+        updated_kind, updated_us = timestamp_to_micros(updated_at)
+    flags |= created_kind << CREATED_SHIFT | updated_kind << UPDATED_SHIFT
+    extras = ""
+    if not record.keys() <= CORE_FIELDS:
+        extras = json.dumps({k: v for k, v in record.items() if k not in CORE_FIELDS}, separators=(",", ":"))
+    strings = (
+        todo_id,
+        str(created_at) if created_kind == TS_STRING else "",
+        str(updated_at) if updated_kind == TS_STRING else "",
+        record.get("title", ""),
+        record.get("details", ""),
+        record.get("owner", ""),
+        extras,
+    )
+    text = "".join(strings)
+    data = text.encode("utf-8")
+    lengths = [len(s) for s in strings] if len(data) == len(text) else [len(s.encode("utf-8")) for s in strings]
+    return _RECORD.pack(
+        _BODY.size + len(data),
+        flags,
+        PRIORITY_CODES[record.get("priority", "MID")],
+        STATUS_CODES[record.get("status", "PENDING")],
+        record.get("version", 1),
+        created_us or 0,
+        updated_us or 0,
+        raw,
+        *lengths,
+    ) + data
+
+
+def decode_record(body: bytes, file_version: int = VERSION) -> dict:
+    if file_version < 3:
+        return _decode_record_v2(body, file_version)
+    (flags, priority, status, version, created_us, updated_us, raw,
+     n_id, n_created, n_updated, n_title, n_details, n_owner, n_extras) = _BODY.unpack_from(body)
+    data = body[_BODY.size:]
+    text = data.decode("utf-8")
+    # Lengths are in bytes, so they index the decoded text only when it is ASCII.
+    strings = text if len(text) == len(data) else data
+    a = n_id
+    b = a + n_created
+    c = b + n_updated
+    d = c + n_title
+    e = d + n_details
+    f = e + n_owner
+    fields = (strings[:a], strings[a:b], strings[b:c], strings[c:d], strings[d:e], strings[e:f], strings[f:f + n_extras])
+    if strings is data:
+        fields = [field.decode("utf-8") for field in fields]
+    todo_id, created_at, updated_at, title, details, owner, extras = fields
+    created_kind = (flags >> CREATED_SHIFT) & 0x3
+    updated_kind = (flags >> UPDATED_SHIFT) & 0x3
+    if created_kind != TS_STRING:
+        created_at = micros_to_timestamp(created_us, created_kind)
+    if updated_kind != TS_STRING:
+        # New to-dos have both timestamps equal.
+        same = updated_us == created_us and updated_kind == created_kind
+        updated_at = created_at if same else micros_to_timestamp(updated_us, updated_kind)
+    record = {
+        "id": _uuid_str(raw) if flags & FLAG_UUID_ID else todo_id,
+        "title": title,
+        "details": details,
+        "priority": PRIORITY_NAMES[priority],
+        "status": STATUS_NAMES[status],
+        "owner": owner,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "version": version,
+    }
+    if extras:
+        record.update(json.loads(extras))
+    return record
+
+
+def _read_str(body: bytes, pos: int) -> tuple:
+    (n,) = _U32.unpack_from(body, pos)
+    pos += 4
+    return body[pos:pos + n].decode("utf-8"), pos + n
+
+
+def _read_timestamp(body: bytes, pos: int, kind: int) -> tuple:
+    if kind == TS_STRING:
+        return _read_str(body, pos)
+    (micros,) = _I64.unpack_from(body, pos)
+    return micros_to_timestamp(micros, kind), pos + 8
+
+
+def _decode_record_v2(body: bytes, file_version: int) -> dict:
+    if file_version == 1:
+        flags, priority, status = _FIXED_V1.unpack_from(body, 0)
+        version, pos = None, _FIXED_V1.size
+    else:
+        flags, priority, status, version = _FIXED_V2.unpack_from(body, 0)
+        pos = _FIXED_V2.size
+    if flags & FLAG_UUID_ID:
+        todo_id = _uuid_str(body[pos:pos + 16])
+        pos += 16
+    else:
+        todo_id, pos = _read_str(body, pos)
+    created_at, pos = _read_timestamp(body, pos, (flags >> CREATED_SHIFT) & 0x3)
+    updated_at, pos = _read_timestamp(body, pos, (flags >> UPDATED_SHIFT) & 0x3)
+    title, pos = _read_str(body, pos)
+    details, pos = _read_str(body, pos)
+    owner, pos = _read_str(body, pos)
+    extras, pos = _read_str(body, pos)
+    record = {
+        "id": todo_id,
+        "title": title,
+        "details": details,
+        "priority": PRIORITY_NAMES[priority],
+        "status": STATUS_NAMES[status],
+        "owner": owner,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+    if version is not None:
+        record["version"] = version
+    if extras:
+        record.update(json.loads(extras))
+    return record
+
+
+def write_records(f: BinaryIO, todos: Iterable[dict]) -> None:
+    f.write(_HEADER.pack(MAGIC, VERSION))
+    f.writelines(map(encode_record, todos))
+
+
+def iter_records(f: BinaryIO) -> Iterator[dict]:
+    header = f.read(_HEADER.size)
+    if not header:
+        return
+    if len(header) < _HEADER.size:
+        raise BinaryFormatError("Truncated header")
+    magic, version = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise BinaryFormatError("Not a binary todo file")
+    if version not in READABLE_VERSIONS:
+        raise BinaryFormatError(f"Unsupported binary todo format version {version}")
+    while True:
+        prefix = f.read(4)
+        if not prefix:
+            return
+        (n,) = _U32.unpack(prefix)
+        body = f.read(n)
+        if len(body) < n:
+            raise BinaryFormatError("Truncated record")
+        yield decode_record(body, version)
+
+
+def is_binary_file(path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,243 @@
+"""Non-interactive to-do commands: ``python src/main.py <command> [options]``.
+
+Every command authenticates, loads only the signed-in user's to-dos, does
+one thing and exits. Credentials come from ``--user``/``--password``, then
+the TODO_USER/TODO_PASSWORD environment variables, then a token file
+(``--token-file`` or TODO_TOKEN_FILE) holding ``username:password``.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+USER_ENV = "TODO_USER"
+PASSWORD_ENV = "TODO_PASSWORD"
+TOKEN_FILE_ENV = "TODO_TOKEN_FILE"
+
+EXIT_OK = 0
+EXIT_NOT_FOUND = 1
+EXIT_AUTH = 2
+# A batched change was dropped because another process changed the to-do first.
+EXIT_CONFLICT = 3
+
+RECENT_LIMIT = 10
+NEXT_LIMIT = 5
+
+
+class CommandError(Exception):
+    """A command failed; carries the process exit code."""
+
+    def __init__(self, message: str, code: int = EXIT_NOT_FOUND):
+        super().__init__(message)
+        self.code = code
+
+
+def read_token_file(path: Path) -> tuple:
+    try:
+        text = Path(path).read_text(encoding="utf-8").strip()
+    except OSError as e:
+        raise CommandError(f"Cannot read token file: {e}", EXIT_AUTH) from None
+    username, sep, password = text.partition(":")
+    if not sep or not username:
+        raise CommandError("Token file must contain username:password", EXIT_AUTH)
+    return username, password
+
+
+def credentials(args: argparse.Namespace) -> tuple:
+    username = args.user or os.environ.get(USER_ENV)
+    password = args.password if args.password is not None else os.environ.get(PASSWORD_ENV)
+    token_file = args.token_file or os.environ.get(TOKEN_FILE_ENV)
+    if (not username or password is None) and token_file:
+        token_user, token_password = read_token_file(token_file)
+        username = username or token_user
+        if password is None and username == token_user:
+            password = token_password
+    if not username or password is None:
+        raise CommandError("Not signed in: pass --user/--password, set "
+                           f"{USER_ENV}/{PASSWORD_ENV} or use a token file", EXIT_AUTH)
+    return username, password
+
+
+def authenticate(args: argparse.Namespace) -> str:
+    from main import find_user, load_users
+
+    username, password = credentials(args)
+    user = find_user(load_users(), username)
+    if not user or user.get("password") != password:
+        raise CommandError("Invalid credentials.", EXIT_AUTH)
+    return username
+
+
+def resolve_id(manager, username: str, prefix: str):
+    """The one to-do of ``username``'s whose id starts with ``prefix``.
+
+    An ambiguous prefix raises AmbiguousIdError, a ValueError.
+    """
+    todo = manager.resolve_id(username, prefix)
+    if todo is None:
+        raise CommandError(f"No to-do matches {prefix!r}")
+    return todo
+
+
+def print_todos(manager, todos: list, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps([t.to_dict() for t in todos], indent=2))
+        return
+    for t in todos:
+        print(f"{manager.short_id(t):<8}  {t.status.value:<9}  {t.priority.value:<4}  {t.title}")
+
+
+def report_results(results: list, done: str) -> int:
+    """Print one line per BatchResult; failures go to stderr and set the exit code."""
+    code = EXIT_OK
+    for result in results:
+        if result.ok:
+            print(f"{done} {result.todo_id}")
+            continue
+        reason = "no such to-do" if isinstance(result.error, KeyError) else result.error
+        print(f"{result.todo_id}: {reason}", file=sys.stderr)
+        code = EXIT_NOT_FOUND
+    return code
+
+
+def cmd_add(manager, username: str, args: argparse.Namespace) -> int:
+    todo = manager.create_todo(args.title, args.details, args.priority, username)
+    if args.json:
+        print(json.dumps(todo.to_dict(), indent=2))
+    else:
+        print(todo.id)
+    return EXIT_OK
+
+
+def cmd_list(manager, username: str, args: argparse.Namespace) -> int:
+    todos = manager.query(username, status=args.status, priority=args.priority,
+                          order_by=args.order_by, limit=args.limit)
+    print_todos(manager, todos, args.json)
+    return EXIT_OK
+
+
+def cmd_search(manager, username: str, args: argparse.Namespace) -> int:
+    print_todos(manager, manager.search(username, " ".join(args.words), args.limit), args.json)
+    return EXIT_OK
+
+
+def cmd_recent(manager, username: str, args: argparse.Namespace) -> int:
+    if args.since is not None:
+        todos = manager.changed_since(username, args.since, args.limit)
+    else:
+        todos = manager.recently_updated(username, RECENT_LIMIT if args.limit is None else args.limit)
+    print_todos(manager, todos, args.json)
+    return EXIT_OK
+
+
+def cmd_next(manager, username: str, args: argparse.Namespace) -> int:
+    print_todos(manager, manager.next_todos(username, args.limit), args.json)
+    return EXIT_OK
+
+
+def cmd_show(manager, username: str, args: argparse.Namespace) -> int:
+    todo = resolve_id(manager, username, args.id)
+    if args.json:
+        print(json.dumps(todo.to_dict(), indent=2))
+        return EXIT_OK
+    print(f"ID: {todo.id}")
+    print(f"Title: {todo.title}")
+    print(f"Details: {todo.details if todo.details else '(no details)'}")
+    print(f"Priority: {todo.priority.value}")
+    print(f"Status: {todo.status.value}")
+    print(f"Created: {todo.created_at}")
+    print(f"Updated: {todo.updated_at}")
+    return EXIT_OK
+
+
+def cmd_done(manager, username: str, args: argparse.Namespace) -> int:
+    targets = [resolve_id(manager, username, prefix) for prefix in args.ids]
+    results = manager.update_many({"id": t.id, "status": "COMPLETED"} for t in targets)
+    return report_results(results, "Completed")
+
+
+def cmd_rm(manager, username: str, args: argparse.Namespace) -> int:
+    targets = [resolve_id(manager, username, prefix) for prefix in args.ids]
+    return report_results(manager.delete_many(t.id for t in targets), "Deleted")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.py", description="To-do commands (run without arguments for the menu)")
+    parser.add_argument("--user", help=f"username (default: ${USER_ENV})")
+    parser.add_argument("--password", help=f"password (default: ${PASSWORD_ENV})")
+    parser.add_argument("--token-file", type=Path, help=f"file holding username:password (default: ${TOKEN_FILE_ENV})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="create a to-do and print its id")
+    add.add_argument("title")
+    add.add_argument("--details", default="")
+    add.add_argument("--priority", type=str.upper, choices=["HIGH", "MID", "LOW"], default="MID")
+    add.add_argument("--json", action="store_true")
+    add.set_defaults(func=cmd_add)
+
+    lst = sub.add_parser("list", help="list your to-dos")
+    lst.add_argument("--status", type=str.upper, choices=["PENDING", "COMPLETED"])
+    lst.add_argument("--priority", type=str.upper, choices=["HIGH", "MID", "LOW"])
+    lst.add_argument("--order-by", default="created_at",
+                     help="created_at, updated_at, priority or title; prefix with - to reverse")
+    lst.add_argument("--limit", type=int)
+    lst.add_argument("--json", action="store_true")
+    lst.set_defaults(func=cmd_list)
+
+    search = sub.add_parser("search", help="find to-dos containing every word, best match first")
+    search.add_argument("words", nargs="+", metavar="word")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--json", action="store_true")
+    search.set_defaults(func=cmd_search)
+
+    recent = sub.add_parser("recent", help="most recently updated to-dos, newest first")
+    recent.add_argument("--since", metavar="TIMESTAMP",
+                        help="instead list everything updated at or after this ISO timestamp, oldest first")
+    recent.add_argument("--limit", type=int, help=f"at most this many (default {RECENT_LIMIT} without --since)")
+    recent.add_argument("--json", action="store_true")
+    recent.set_defaults(func=cmd_recent)
+
+    nxt = sub.add_parser("next", help="most urgent pending to-dos: highest priority, then oldest")
+    nxt.add_argument("--limit", type=int, default=NEXT_LIMIT)
+    nxt.add_argument("--json", action="store_true")
+    nxt.set_defaults(func=cmd_next)
+
+    show = sub.add_parser("show", help="show one to-do")
+    show.add_argument("id", help="id or unique id prefix")
+    show.add_argument("--json", action="store_true")
+    show.set_defaults(func=cmd_show)
+
+    done = sub.add_parser("done", help="mark to-dos as completed")
+    done.add_argument("ids", nargs="+", metavar="id", help="id or unique id prefix")
+    done.set_defaults(func=cmd_done)
+
+    rm = sub.add_parser("rm", help="delete to-dos")
+    rm.add_argument("ids", nargs="+", metavar="id", help="id or unique id prefix")
+    rm.set_defaults(func=cmd_rm)
+
+    return parser
+
+
+def main(argv: list | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        username = authenticate(args)
+        from main import create_todo_manager, dropped_change_message
+        from models import VersionConflictError
+
+        manager = create_todo_manager(username)
+        try:
+            try:
+                return args.func(manager, username, args)
+            finally:
+                manager.close()
+        except VersionConflictError as e:
+            print(dropped_change_message(e), file=sys.stderr)
+            return EXIT_CONFLICT
+    except CommandError as e:
+        print(e, file=sys.stderr)
+        return e.code
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_NOT_FOUND
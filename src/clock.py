@@ -0,0 +1,88 @@
+"""The clock every todo timestamp comes from, and its ISO boundary.
+
+Timestamps are integer epoch microseconds (UTC) wherever they are compared
+or sorted. They are turned into ISO strings only for display and for the
+data files, which keep the ``datetime.isoformat()`` text they always had.
+Tests and benchmarks can swap the clock with ``set_clock`` to get
+deterministic timestamps.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# How an ISO string maps onto micros: 0 = aware UTC, 1 = naive UTC, 2 = neither.
+TS_AWARE, TS_NAIVE, TS_STRING = 0, 1, 2
+
+
+def _system_clock() -> int:
+    return time.time_ns() // 1000
+
+
+_clock = _system_clock
+
+
+def set_clock(clock=None):
+    """Use ``clock()`` (returning epoch microseconds) from now on; None restores
+    the system clock. Returns the previous clock."""
+    global _clock
+    previous = _clock
+    _clock = clock or _system_clock
+    return previous
+
+
+def now_us() -> int:
+    return _clock()
+
+
+def now_iso() -> str:
+    return iso_from_us(_clock())
+
+
+def iso_from_us(micros: int) -> str:
+    """Timezone-aware UTC ISO string for epoch microseconds."""
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def us_from_iso(value: str) -> int | None:
+    """Epoch microseconds for any ISO timestamp (naive means UTC), else None."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def as_micros(value: int | str | None) -> int | None:
+    """Epoch microseconds from micros or an ISO timestamp; ValueError if it does not parse."""
+    if value is None or isinstance(value, int):
+        return value
+    micros = us_from_iso(value)
+    if micros is None:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    return micros
+
+
+def timestamp_to_micros(value: str) -> tuple:
+    """``(kind, epoch_micros)`` that reproduce ``value`` exactly; micros is None for TS_STRING."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return TS_STRING, None
+    # Only use the integer form when decoding reproduces the exact string.
+    if dt.isoformat() != value:
+        return TS_STRING, None
+    if dt.tzinfo is None:
+        return TS_NAIVE, (dt - _EPOCH_NAIVE) // _MICROSECOND
+    if dt.utcoffset():
+        return TS_STRING, None
+    return TS_AWARE, (dt - EPOCH) // _MICROSECOND
+
+
+def micros_to_timestamp(micros: int, kind: int) -> str:
+    """Inverse of timestamp_to_micros for TS_AWARE and TS_NAIVE."""
+    return ((_EPOCH_NAIVE if kind == TS_NAIVE else EPOCH) + timedelta(microseconds=micros)).isoformat()
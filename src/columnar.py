@@ -0,0 +1,195 @@
+"""Column-oriented in-memory todo store for very large datasets.
+
+``ColumnarTodos`` is a drop-in replacement for TodoManager's ``id -> TodoItem``
+dict. Each field lives in its own compact column instead of in a Python
+object per todo:
+
+* priority, status and timestamp kinds are ``array('B')`` codes,
+* owners are interned to integer codes (``array('I')``),
+* created_at/updated_at are ``array('q')`` epoch microseconds,
+* title and details are UTF-8 slices of one shared ``bytearray`` pool.
+
+Rows are materialised as TodoItem views only when read, so the returned
+items are copies: assign them back (``todos[item.id] = item``) to keep a
+change. Deleted and rewritten data is left in place and reclaimed by
+``compact()``, which runs automatically once more than half of the rows
+or of the string pool is garbage.
+"""
+from array import array
+from collections.abc import MutableMapping
+
+from clock import TS_STRING, micros_to_timestamp, timestamp_to_micros
+from models import Priority, Status, TodoItem
+
+# Indexed by code; a priority's code is its rank.
+PRIORITIES = tuple(sorted(Priority, key=lambda p: p.rank))
+STATUSES = tuple(Status)
+_PRIORITY_CODES = {p: p.rank for p in PRIORITIES}
+_STATUS_CODES = {s: i for i, s in enumerate(STATUSES)}
+
+
+class StringPool:
+    """Append-only UTF-8 byte pool addressed by ``(offset, length)``."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.garbage = 0
+
+    def add(self, value: str) -> tuple:
+        raw = value.encode("utf-8")
+        offset = len(self.data)
+        self.data += raw
+        return offset, len(raw)
+
+    def get(self, offset: int, length: int) -> str:
+        return self.data[offset:offset + length].decode("utf-8")
+
+    def release(self, length: int) -> None:
+        self.garbage += length
+
+
+class ColumnarTodos(MutableMapping):
+    """``id -> TodoItem`` mapping backed by typed arrays, in insertion order."""
+
+    def __init__(self, items=()):
+        self._clear_columns()
+        for item in items:
+            self[item.id] = item
+
+    def _clear_columns(self) -> None:
+        # id -> row number; dict order is the mapping's iteration order.
+        self._rows = {}
+        self.priority = array("B")
+        self.status = array("B")
+        self.version = array("I")
+        self.owner = array("I")
+        self.owners = []
+        self._owner_codes = {}
+        self.created = array("q")
+        self.updated = array("q")
+        self.ts_kinds = array("B")
+        # Timestamps that do not round-trip through micros, keyed by (row, field).
+        self.raw_timestamps = {}
+        self.title = array("Q")
+        self.title_len = array("I")
+        self.details = array("Q")
+        self.details_len = array("I")
+        self.strings = StringPool()
+
+    @classmethod
+    def from_records(cls, records) -> "ColumnarTodos":
+        todos = cls()
+        for record in records:
+            todos[record.get("id")] = TodoItem.from_dict(record)
+        return todos
+
+    def _intern_owner(self, owner: str) -> int:
+        code = self._owner_codes.get(owner)
+        if code is None:
+            code = self._owner_codes[owner] = len(self.owners)
+            self.owners.append(owner)
+        return code
+
+    def _encode_timestamp(self, row: int, field: int, value: str) -> tuple:
+        kind, micros = timestamp_to_micros(value)
+        if kind == TS_STRING:
+            self.raw_timestamps[row, field] = value
+            return kind, 0
+        self.raw_timestamps.pop((row, field), None)
+        return kind, micros
+
+    def _timestamp(self, row: int, field: int, micros: int) -> str:
+        kind = (self.ts_kinds[row] >> (2 * field)) & 0x3
+        if kind == TS_STRING:
+            return self.raw_timestamps[row, field]
+        return micros_to_timestamp(micros, kind)
+
+    def _write_row(self, row: int, item: TodoItem) -> None:
+        created_kind, created = self._encode_timestamp(row, 0, item.created_at)
+        updated_kind, updated = self._encode_timestamp(row, 1, item.updated_at)
+        title, title_len = self.strings.add(item.title)
+        details, details_len = self.strings.add(item.details)
+        values = (
+            (self.priority, _PRIORITY_CODES[item.priority]),
+            (self.status, _STATUS_CODES[item.status]),
+            (self.version, item.version),
+            (self.owner, self._intern_owner(item.owner)),
+            (self.created, created),
+            (self.updated, updated),
+            (self.ts_kinds, created_kind | updated_kind << 2),
+            (self.title, title),
+            (self.title_len, title_len),
+            (self.details, details),
+            (self.details_len, details_len),
+        )
+        if row == len(self.priority):
+            for column, value in values:
+                column.append(value)
+        else:
+            self.strings.release(self.title_len[row] + self.details_len[row])
+            for column, value in values:
+                column[row] = value
+
+    def _read_row(self, todo_id: str, row: int) -> TodoItem:
+        return TodoItem(
+            todo_id,
+            self.strings.get(self.title[row], self.title_len[row]),
+            self.strings.get(self.details[row], self.details_len[row]),
+            PRIORITIES[self.priority[row]],
+            STATUSES[self.status[row]],
+            self.owners[self.owner[row]],
+            self._timestamp(row, 0, self.created[row]),
+            self._timestamp(row, 1, self.updated[row]),
+            self.version[row],
+        )
+
+    def __getitem__(self, todo_id: str) -> TodoItem:
+        return self._read_row(todo_id, self._rows[todo_id])
+
+    def __setitem__(self, todo_id: str, item: TodoItem) -> None:
+        row = self._rows.get(todo_id)
+        if row is None:
+            row = self._rows[todo_id] = len(self.priority)
+        self._write_row(row, item)
+        self._maybe_compact()
+
+    def __delitem__(self, todo_id: str) -> None:
+        row = self._rows.pop(todo_id)
+        self.strings.release(self.title_len[row] + self.details_len[row])
+        self.raw_timestamps.pop((row, 0), None)
+        self.raw_timestamps.pop((row, 1), None)
+        self._maybe_compact()
+
+    def __contains__(self, todo_id) -> bool:
+        return todo_id in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def items(self):
+        return ((todo_id, self._read_row(todo_id, row)) for todo_id, row in self._rows.items())
+
+    def values(self):
+        return (self._read_row(todo_id, row) for todo_id, row in self._rows.items())
+
+    def _maybe_compact(self) -> None:
+        dead_rows = len(self.priority) - len(self._rows)
+        if dead_rows > 1024 and dead_rows > len(self._rows):
+            self.compact()
+        elif self.strings.garbage > 1 << 20 and self.strings.garbage * 2 > len(self.strings.data):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite every column keeping only live rows."""
+        fresh = ColumnarTodos(self.values())
+        self.__dict__.update(fresh.__dict__)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the columns, excluding the id dict."""
+        columns = (self.priority, self.status, self.version, self.owner, self.created,
+                   self.updated, self.ts_kinds, self.title, self.title_len,
+                   self.details, self.details_len)
+        return sum(c.buffer_info()[1] * c.itemsize for c in columns) + len(self.strings.data)
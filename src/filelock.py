@@ -0,0 +1,85 @@
+"""Advisory inter-process file locks and cheap file change detection."""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def file_signature(path: Path) -> tuple | None:
+    """(inode, size, mtime_ns) of ``path``, or None if it does not exist.
+
+    Saves replace the file with a freshly written one, so the inode alone
+    changes on every save; size and mtime also catch in-place appends.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileLock:
+    """Advisory lock held on a sidecar ``.lock`` file.
+
+    Exclusive locks are taken around read-modify-write cycles and shared
+    locks around plain reads. Threads of one process are serialised by an
+    in-process lock first. The lock is re-entrant for the thread holding it,
+    so nested ``with lock.hold()`` blocks do not deadlock; a nested request
+    keeps whatever mode the outermost block took.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    @contextmanager
+    def hold(self, shared: bool = False):
+        with self._thread_lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                _acquire(fd, shared)
+                self._depth = 1
+                try:
+                    yield
+                finally:
+                    self._depth = 0
+                    _release(fd)
+            finally:
+                os.close(fd)
+
+
+def _acquire(fd: int, shared: bool) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        return
+    # msvcrt has no shared locks and gives up after ten one-second retries.
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.05)
+
+
+def _release(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,95 @@
+"""Write-behind persistence for TodoManager.
+
+In batched mode a mutation only marks the manager dirty. A background thread
+coalesces those marks into one save, either every ``interval`` seconds or as
+soon as ``max_ops`` mutations are pending, and any manager still open when
+the interpreter exits is flushed by an atexit hook. If a background save
+fails, the changes stay pending, the thread retries after ``interval``, and
+the error is raised from the next ``flush()`` or ``close()``, or printed
+to stderr by the atexit hook.
+"""
+import atexit
+import sys
+import threading
+import weakref
+from typing import Callable
+
+_open_flushers = weakref.WeakSet()
+
+
+class WriteBehindFlusher:
+    def __init__(self, save: Callable[[], None], lock: threading.RLock,
+                 interval: float, max_ops: int):
+        self.save = save
+        self.interval = interval
+        self.max_ops = max_ops
+        self.pending_ops = 0
+        self._cond = threading.Condition(lock)
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="todo-flusher", daemon=True)
+        self._thread.start()
+        _open_flushers.add(self)
+
+    def mark_dirty(self) -> None:
+        """Record one mutation; must be called while holding the manager lock."""
+        self.pending_ops += 1
+        if self.pending_ops >= self.max_ops:
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Save now if anything changed since the last save.
+
+        Raises the error from a failed background save, if there was one,
+        after retrying it.
+        """
+        with self._cond:
+            error, self._error = self._error, None
+            if self.pending_ops:
+                self.save()
+                self.pending_ops = 0
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        """Stop the background thread and write any pending changes."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        try:
+            self.flush()
+        finally:
+            _open_flushers.discard(self)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self.pending_ops >= self.max_ops,
+                    timeout=self.interval,
+                )
+                if self._closed:
+                    return
+                if self.pending_ops:
+                    try:
+                        self.save()
+                    except Exception as exc:
+                        self._error = exc
+                        # Retry after a full interval rather than spinning.
+                        self._cond.wait(self.interval)
+                    else:
+                        self.pending_ops = 0
+
+
+@atexit.register
+def _flush_all_on_exit() -> None:
+    for flusher in list(_open_flushers):
+        try:
+            flusher.close()
+        except Exception as exc:
+            # Raising here would only print a traceback; say what was lost.
+            print(f"Could not save all pending to-do changes at exit: {exc}", file=sys.stderr)
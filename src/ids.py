@@ -0,0 +1,79 @@
+"""Time-ordered todo ids.
+
+``uuid7()`` returns RFC 9562 version 7 UUID strings: a 48-bit Unix
+millisecond timestamp, then a 12-bit counter, then 62 random bits. Within
+one process every id sorts after the one before it, including several ids
+in the same millisecond, so sorting ids as strings sorts them by creation
+time. They have the same canonical form as uuid4 strings, so both kinds
+can live side by side in one data file.
+"""
+import os
+import threading
+
+from clock import now_us
+
+ID_SCHEME_ENV = "TODO_ID_SCHEME"
+UUID4 = "uuid4"
+UUID7 = "uuid7"
+
+_COUNTER_BITS = 12
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+_VERSION_7 = 0x7 << 76
+_VARIANT = 0b10 << 62
+
+
+class _Uuid7Generator:
+    def __init__(self, clock=now_us):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.last_ms = -1
+        self.counter = 0
+
+    def __call__(self) -> str:
+        rand = int.from_bytes(os.urandom(10), "big")
+        with self.lock:
+            ms = self.clock() // 1000
+            if ms > self.last_ms:
+                # Seed with the top counter bit clear so a burst in one
+                # millisecond has room to count up before it overflows.
+                self.last_ms = ms
+                self.counter = rand >> 69
+            else:
+                # Same millisecond, or the clock stepped back: keep counting
+                # from the last id and borrow the next millisecond on overflow.
+                self.counter += 1
+                if self.counter > _COUNTER_MAX:
+                    self.last_ms += 1
+                    self.counter = 0
+            value = (self.last_ms << 80) | _VERSION_7 | (self.counter << 64) | _VARIANT | (rand & ((1 << 62) - 1))
+        h = f"{value:032x}"
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+uuid7 = _Uuid7Generator()
+
+
+def uuid4() -> str:
+    import uuid
+
+    return str(uuid.uuid4())
+
+
+def id_timestamp_ms(todo_id: str) -> int | None:
+    """Creation time in Unix milliseconds encoded in a uuid7 id, else None."""
+    if len(todo_id) != 36 or todo_id[14] != "7":
+        return None
+    try:
+        return int(todo_id[:8] + todo_id[9:13], 16)
+    except ValueError:
+        return None
+
+
+def id_generator(scheme: str | None = None):
+    """The id function for ``scheme`` (default: ``$TODO_ID_SCHEME`` or uuid4)."""
+    scheme = (scheme or os.environ.get(ID_SCHEME_ENV, UUID4)).lower()
+    if scheme == UUID4:
+        return uuid4
+    if scheme == UUID7:
+        return uuid7
+    raise ValueError(f"Unknown id scheme: {scheme!r}")
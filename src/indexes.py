@@ -0,0 +1,497 @@
+"""Secondary indexes maintained incrementally by TodoManager.
+
+Indexes are fed TodoItem instances and store only ids, integer keys and
+search terms.
+"""
+import heapq
+import json
+import math
+import os
+import re
+from bisect import bisect_left, insort
+from operator import itemgetter
+from pathlib import Path
+
+from models import AmbiguousIdError, Priority, Status
+
+# Sub-indexed fields inside each owner's bucket.
+OWNER_SUBINDEX_FIELDS = ("status", "priority")
+
+
+class OwnerIndex:
+    """owner -> ids, with per-owner sub-indexes on status and priority.
+
+    Every bucket is a dict used as an ordered set, so membership changes are
+    O(1) and iteration of the owner bucket follows creation order. A sequence
+    number per id lets filtered results be put back into creation order
+    without touching the rest of the owner's data.
+    """
+
+    def __init__(self):
+        self.by_owner = {}
+        self.by_field = {}
+        self.seq = {}
+        self._next_seq = 0
+
+    def add(self, todo_id: str, todo) -> None:
+        if todo_id not in self.seq:
+            self.seq[todo_id] = self._next_seq
+            self._next_seq += 1
+        owner = todo.owner
+        self.by_owner.setdefault(owner, {})[todo_id] = None
+        for field in OWNER_SUBINDEX_FIELDS:
+            self.by_field.setdefault((owner, field, getattr(todo, field)), {})[todo_id] = None
+
+    def remove(self, todo_id: str, todo) -> None:
+        owner = todo.owner
+        self._discard(self.by_owner, owner, todo_id)
+        for field in OWNER_SUBINDEX_FIELDS:
+            self._discard(self.by_field, (owner, field, getattr(todo, field)), todo_id)
+        self.seq.pop(todo_id, None)
+
+    def update(self, todo_id: str, before, after) -> None:
+        """Move ``todo_id`` between buckets for the fields that changed."""
+        if before.owner != after.owner:
+            seq = self.seq[todo_id]
+            self.remove(todo_id, before)
+            self.seq[todo_id] = seq
+            self.add(todo_id, after)
+            return
+        owner = after.owner
+        for field in OWNER_SUBINDEX_FIELDS:
+            old, new = getattr(before, field), getattr(after, field)
+            if old != new:
+                self._discard(self.by_field, (owner, field, old), todo_id)
+                self.by_field.setdefault((owner, field, new), {})[todo_id] = None
+
+    def ids(self, owner: str, **filters) -> list:
+        """Ids for ``owner`` matching every ``field=value`` filter, in creation order."""
+        filters = {f: v for f, v in filters.items() if v is not None}
+        if not filters:
+            return list(self.by_owner.get(owner, ()))
+        buckets = [self.by_field.get((owner, f, v), {}) for f, v in filters.items()]
+        buckets.sort(key=len)
+        smallest, rest = buckets[0], buckets[1:]
+        matches = [i for i in smallest if all(i in b for b in rest)]
+        matches.sort(key=self.seq.__getitem__)
+        return matches
+
+    @staticmethod
+    def _discard(buckets: dict, key, todo_id: str) -> None:
+        bucket = buckets.get(key)
+        if bucket is None:
+            return
+        bucket.pop(todo_id, None)
+        if not bucket:
+            del buckets[key]
+
+
+# A title word counts this many times a details word when ranking.
+TITLE_WEIGHT = 3
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased word tokens of ``text``."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def term_weights(todo) -> dict:
+    """term -> weight for one todo's title and details."""
+    weights = {}
+    for term in tokenize(todo.title):
+        weights[term] = weights.get(term, 0) + TITLE_WEIGHT
+    for term in tokenize(todo.details):
+        weights[term] = weights.get(term, 0) + 1
+    return weights
+
+
+class TextIndex:
+    """Per-owner inverted index over title and details.
+
+    ``postings`` maps ``(owner, term)`` to ``{id: weight}``, so a query only
+    touches the postings of its own terms. Results must contain every query
+    term and are ranked by the sum of weight * idf over the terms, where idf
+    is computed against the owner's todo count.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.doc_count = {}
+
+    def add(self, todo_id: str, todo) -> None:
+        owner = todo.owner
+        for term, weight in term_weights(todo).items():
+            self.postings.setdefault((owner, term), {})[todo_id] = weight
+        self.doc_count[owner] = self.doc_count.get(owner, 0) + 1
+
+    def remove(self, todo_id: str, todo) -> None:
+        owner = todo.owner
+        for term in term_weights(todo):
+            OwnerIndex._discard(self.postings, (owner, term), todo_id)
+        self.doc_count[owner] -= 1
+        if not self.doc_count[owner]:
+            del self.doc_count[owner]
+
+    def update(self, todo_id: str, before, after) -> None:
+        if (before.owner, before.title, before.details) != (after.owner, after.title, after.details):
+            self.remove(todo_id, before)
+            self.add(todo_id, after)
+
+    def search(self, owner: str, query: str, limit: int | None = None) -> list:
+        """Ids of ``owner``'s todos containing every word of ``query``, best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings = [self.postings.get((owner, term)) for term in terms]
+        if not all(postings):
+            return []
+        total = self.doc_count[owner]
+        weighted = sorted(((p, math.log(1 + total / len(p))) for p in postings), key=lambda x: len(x[0]))
+        (smallest, _), rest = weighted[0], weighted[1:]
+        scored = []
+        for todo_id in smallest:
+            if all(todo_id in p for p, _ in rest):
+                scored.append((sum(p[todo_id] * idf for p, idf in weighted), todo_id))
+        # Both are stable, so equal scores keep posting order.
+        if limit is None:
+            scored.sort(key=itemgetter(0), reverse=True)
+        else:
+            scored = heapq.nlargest(limit, scored, key=itemgetter(0))
+        return [todo_id for _, todo_id in scored]
+
+
+# Share of the query's trigrams a title must contain to count as a match.
+MIN_SIMILARITY = 0.5
+TRIGRAM_INDEX_FORMAT = 1
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of each word of ``text``, padded so word starts and ends count."""
+    grams = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Per-owner trigram index over titles, for typo-tolerant lookup.
+
+    ``postings`` maps ``(owner, trigram)`` to ids and ``sizes`` holds how
+    many distinct trigrams each title has. A title's similarity to a query
+    is the share of the query's trigrams it contains, so both misspellings
+    ("grocry") and fragments ("groc") of a title score high; equal scores
+    prefer titles closer in length to the query.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.sizes = {}
+
+    def add(self, todo_id: str, todo) -> None:
+        grams = trigrams(todo.title)
+        for gram in grams:
+            self.postings.setdefault((todo.owner, gram), {})[todo_id] = None
+        self.sizes[todo_id] = len(grams)
+
+    def remove(self, todo_id: str, todo) -> None:
+        for gram in trigrams(todo.title):
+            OwnerIndex._discard(self.postings, (todo.owner, gram), todo_id)
+        self.sizes.pop(todo_id, None)
+
+    def update(self, todo_id: str, before, after) -> None:
+        if (before.owner, before.title) != (after.owner, after.title):
+            self.remove(todo_id, before)
+            self.add(todo_id, after)
+
+    def search(self, owner: str, query: str, limit: int = 10,
+               min_similarity: float = MIN_SIMILARITY) -> list:
+        """``(similarity, id)`` for ``owner``'s best matching titles, best first."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        hits = {}
+        for gram in grams:
+            for todo_id in self.postings.get((owner, gram), ()):
+                hits[todo_id] = hits.get(todo_id, 0) + 1
+        n = len(grams)
+        scored = ((h / n, h / (n + self.sizes[i] - h), i) for i, h in hits.items() if h >= n * min_similarity)
+        return [(similarity, todo_id) for similarity, _, todo_id in heapq.nlargest(limit, scored, key=itemgetter(0, 1))]
+
+    def to_json(self) -> dict:
+        ids = list(self.sizes)
+        position = {todo_id: i for i, todo_id in enumerate(ids)}
+        postings = {}
+        for (owner, gram), bucket in self.postings.items():
+            postings.setdefault(owner, {})[gram] = [position[i] for i in bucket]
+        return {"ids": ids, "sizes": list(self.sizes.values()), "postings": postings}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "TrigramIndex":
+        index = cls()
+        ids = data["ids"]
+        index.sizes = dict(zip(ids, data["sizes"]))
+        for owner, grams in data["postings"].items():
+            for gram, positions in grams.items():
+                index.postings[owner, gram] = dict.fromkeys(ids[i] for i in positions)
+        return index
+
+
+def load_trigram_index(path: Path, scope: str | None, signature) -> TrigramIndex | None:
+    """The index saved at ``path`` for ``scope``, if it was built from data with ``signature``."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("format") != TRIGRAM_INDEX_FORMAT:
+            return None
+        signature = json.loads(json.dumps(signature))
+        for section in saved["sections"]:
+            if section["scope"] == scope and section["signature"] == signature:
+                return TrigramIndex.from_json(section)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, IndexError):
+        pass
+    return None
+
+
+def save_trigram_index(path: Path, scope: str | None, signature, index: TrigramIndex) -> None:
+    """Save ``index`` for ``scope`` next to the data, replacing sections for stale data."""
+    signature = json.loads(json.dumps(signature))
+    sections = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("format") == TRIGRAM_INDEX_FORMAT:
+            sections = [s for s in saved["sections"] if s["scope"] != scope and s["signature"] == signature]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    sections.append({"scope": scope, "signature": signature, **index.to_json()})
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"format": TRIGRAM_INDEX_FORMAT, "sections": sections}, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _prefix_bounds(ids: list, prefix: str) -> tuple:
+    """``(start, end)`` of the slice of sorted ``ids`` that start with ``prefix``."""
+    start = bisect_left(ids, prefix)
+    if not prefix:
+        return start, len(ids)
+    # The smallest string greater than every string starting with prefix.
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return start, bisect_left(ids, upper, start)
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+# Shortest id prefix the UI shows; longer when needed to stay unique.
+SHORT_ID_LENGTH = 8
+
+
+class PrefixIndex:
+    """owner -> that owner's ids in sorted order, for resolving id prefixes.
+
+    Finding the ids that start with a prefix is two binary searches, so a
+    short prefix resolves in O(log n) however many todos the owner has.
+    """
+
+    def __init__(self):
+        self.by_owner = {}
+
+    @classmethod
+    def build(cls, items) -> "PrefixIndex":
+        """Index ``(id, todo)`` pairs, sorting once instead of inserting one by one."""
+        index = cls()
+        for todo_id, todo in items:
+            index.by_owner.setdefault(todo.owner, []).append(todo_id)
+        for ids in index.by_owner.values():
+            ids.sort()
+        return index
+
+    def add(self, todo_id: str, todo) -> None:
+        insort(self.by_owner.setdefault(todo.owner, []), todo_id)
+
+    def remove(self, todo_id: str, todo) -> None:
+        ids = self.by_owner.get(todo.owner)
+        if ids is None:
+            return
+        i = bisect_left(ids, todo_id)
+        if i < len(ids) and ids[i] == todo_id:
+            del ids[i]
+        if not ids:
+            del self.by_owner[todo.owner]
+
+    def update(self, todo_id: str, before, after) -> None:
+        if before.owner != after.owner:
+            self.remove(todo_id, before)
+            self.add(todo_id, after)
+
+    def resolve(self, owner: str, prefix: str) -> str | None:
+        """The one id of ``owner``'s starting with ``prefix``, or None if there is none.
+
+        Raises AmbiguousIdError when several ids start with it.
+        """
+        ids = self.by_owner.get(owner, [])
+        start, end = _prefix_bounds(ids, prefix)
+        if end - start > 1:
+            raise AmbiguousIdError(prefix, end - start)
+        return ids[start] if end > start else None
+
+    def shortest_unique_prefix(self, owner: str, todo_id: str, min_length: int = SHORT_ID_LENGTH) -> str:
+        """The shortest prefix of ``todo_id``, at least ``min_length`` long, that
+        no other id of ``owner``'s starts with.
+
+        Only the ids either side of it in sorted order can share a longer
+        prefix, so this is one binary search. Time-ordered uuid7 ids made
+        close together share their first 8 characters.
+        """
+        ids = self.by_owner.get(owner, [])
+        i = bisect_left(ids, todo_id)
+        after = i + 1 if i < len(ids) and ids[i] == todo_id else i
+        shared = 0
+        if i > 0:
+            shared = common_prefix_length(todo_id, ids[i - 1])
+        if after < len(ids):
+            shared = max(shared, common_prefix_length(todo_id, ids[after]))
+        return todo_id[:max(min_length, shared + 1)]
+
+
+# Timestamp fields TimeIndex orders by, and the TodoItem property holding each as micros.
+TIME_FIELDS = {"created_at": "created_us", "updated_at": "updated_us"}
+
+
+class TimeIndex:
+    """Per-owner lists of ``(micros, id)`` sorted by created_at and by updated_at.
+
+    Keys are inserted with insort; new and just-updated todos carry the
+    newest timestamps, so they usually land at the end of the list. A time
+    range is two binary searches and "most recent" reads the tail, so
+    neither sorts anything. Timestamps that do not parse sort as 0.
+    """
+
+    def __init__(self):
+        self.keys = {}
+
+    @staticmethod
+    def _key(todo_id: str, todo, field: str) -> tuple:
+        return getattr(todo, TIME_FIELDS[field]) or 0, todo_id
+
+    @classmethod
+    def build(cls, items) -> "TimeIndex":
+        """Index ``(id, todo)`` pairs, sorting once instead of inserting one by one."""
+        index = cls()
+        for todo_id, todo in items:
+            for field in TIME_FIELDS:
+                index.keys.setdefault((todo.owner, field), []).append(cls._key(todo_id, todo, field))
+        for keys in index.keys.values():
+            keys.sort()
+        return index
+
+    def add(self, todo_id: str, todo) -> None:
+        for field in TIME_FIELDS:
+            insort(self.keys.setdefault((todo.owner, field), []), self._key(todo_id, todo, field))
+
+    def remove(self, todo_id: str, todo) -> None:
+        for field in TIME_FIELDS:
+            keys = self.keys.get((todo.owner, field))
+            if keys is None:
+                continue
+            key = self._key(todo_id, todo, field)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+            if not keys:
+                del self.keys[todo.owner, field]
+
+    def update(self, todo_id: str, before, after) -> None:
+        if (before.owner, before.created_at, before.updated_at) != (after.owner, after.created_at, after.updated_at):
+            self.remove(todo_id, before)
+            self.add(todo_id, after)
+
+    def ids(self, owner: str, field: str, since: int | None = None, until: int | None = None,
+            descending: bool = False) -> list:
+        """Ids of ``owner``'s todos with ``since <= field < until`` (micros), oldest first."""
+        keys = self.keys.get((owner, field), [])
+        start = 0 if since is None else bisect_left(keys, (since,))
+        end = len(keys) if until is None else bisect_left(keys, (until,), start)
+        ids = [todo_id for _, todo_id in keys[start:end]]
+        if descending:
+            ids.reverse()
+        return ids
+
+    def latest(self, owner: str, field: str, limit: int) -> list:
+        """Ids of ``owner``'s ``limit`` most recent todos by ``field``, newest first."""
+        keys = self.keys.get((owner, field), [])
+        return [todo_id for _, todo_id in reversed(keys[max(len(keys) - limit, 0):])]
+
+
+class PriorityIndex:
+    """Per-owner pending todos bucketed by priority rank, oldest first in each bucket.
+
+    ``pending`` maps ``(owner, rank)`` to a list of ``(created micros, id)``
+    kept sorted with insort; new todos are the newest, so they append.
+    The k most urgent are read bucket by bucket from HIGH down, in
+    O(k + log n), and completed todos are not in the index at all.
+    """
+
+    def __init__(self):
+        self.pending = {}
+
+    @staticmethod
+    def _entry(todo_id: str, todo) -> tuple | None:
+        if todo.status != Status.PENDING:
+            return None
+        return (todo.owner, todo.priority.rank), (todo.created_us or 0, todo_id)
+
+    @classmethod
+    def build(cls, items) -> "PriorityIndex":
+        """Index ``(id, todo)`` pairs, sorting once instead of inserting one by one."""
+        index = cls()
+        for todo_id, todo in items:
+            entry = cls._entry(todo_id, todo)
+            if entry is not None:
+                index.pending.setdefault(entry[0], []).append(entry[1])
+        for keys in index.pending.values():
+            keys.sort()
+        return index
+
+    def add(self, todo_id: str, todo) -> None:
+        entry = self._entry(todo_id, todo)
+        if entry is not None:
+            insort(self.pending.setdefault(entry[0], []), entry[1])
+
+    def remove(self, todo_id: str, todo) -> None:
+        entry = self._entry(todo_id, todo)
+        if entry is None:
+            return
+        bucket, key = entry
+        keys = self.pending.get(bucket)
+        if keys is None:
+            return
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+        if not keys:
+            del self.pending[bucket]
+
+    def update(self, todo_id: str, before, after) -> None:
+        if self._entry(todo_id, before) != self._entry(todo_id, after):
+            self.remove(todo_id, before)
+            self.add(todo_id, after)
+
+    def top(self, owner: str, limit: int) -> list:
+        """Ids of ``owner``'s ``limit`` most urgent pending todos: highest priority, then oldest."""
+        ids = []
+        for priority in Priority:
+            if len(ids) >= limit:
+                break
+            keys = self.pending.get((owner, priority.rank), ())
+            ids.extend(todo_id for _, todo_id in keys[:limit - len(ids)])
+        return ids
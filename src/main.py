@@ -1,22 +1,75 @@
 import json
 import os
 import sys
-from getpass import getpass
+import threading
+from contextlib import contextmanager
+from dataclasses import fields, replace
 from pathlib import Path
-from datetime import datetime
 
-from models import TodoItem, Priority, Status
+from models import (
+    AmbiguousIdError,
+    BatchResult,
+    TodoItem,
+    Priority,
+    Status,
+    VersionConflictError,
+    enum_member,
+    enum_member_or,
+    new_todo_from_input,
+    validate_changes,
+)
+from clock import as_micros, now_iso
+from indexes import (
+    OwnerIndex,
+    PrefixIndex,
+    PriorityIndex,
+    TextIndex,
+    TimeIndex,
+    TrigramIndex,
+    load_trigram_index,
+    save_trigram_index,
+)
+from storage import STORAGE_ENV, JsonStore, open_store
+
+# getpass, sqlite_backend (sqlite3), columnar and flusher are imported where
+# they are used, so a command that does not need them does not pay for them.
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 USERS_FILE = DATA_DIR / "users.json"
 TODOS_FILE = DATA_DIR / "todos.json"
+DB_FILE = DATA_DIR / "todos.db"
+
+DURABILITY_ENV = "TODO_DURABILITY"
+MEMORY_LAYOUT_ENV = "TODO_MEMORY_LAYOUT"
+FLUSH_INTERVAL_ENV = "TODO_FLUSH_INTERVAL"
+FLUSH_OPS_ENV = "TODO_FLUSH_OPS"
+STRICT = "strict"
+BATCHED = "batched"
+OBJECTS = "objects"
+COLUMNAR = "columnar"
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_FLUSH_OPS = 100
+# Saved trigram index, next to the data file.
+TRIGRAM_SUFFIX = ".trgm"
+# How many matches a selection screen offers for a title search.
+SELECT_MATCHES = 10
+# How many to-dos "What should I do next?" suggests.
+NEXT_TODOS = 5
 
 
 def ensure_data_dir() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def using_sqlite() -> bool:
+    return os.environ.get(STORAGE_ENV, "json").lower() == "sqlite"
+
+
 def load_users() -> list:
+    if using_sqlite():
+        import sqlite_backend
+
+        return sqlite_backend.load_users(DB_FILE)
     if not USERS_FILE.exists():
         return []
     try:
@@ -27,6 +80,11 @@ def load_users() -> list:
 
 
 def save_users(users: list) -> None:
+    if using_sqlite():
+        import sqlite_backend
+
+        sqlite_backend.save_users(DB_FILE, users)
+        return
     with open(USERS_FILE, "w", encoding="utf-8") as f:
         json.dump(users, f, indent=2)
 
@@ -38,74 +96,670 @@ def find_user(users: list, username: str) -> dict | None:
     return None
 
 
+QUERY_SORT_KEYS = {
+    "created_at": None,
+    "updated_at": None,
+    "priority": lambda t: t.priority.rank,
+    "title": lambda t: t.title.lower(),
+}
+
+
+TODO_FIELDS = tuple(f.name for f in fields(TodoItem))
+
+
 class TodoManager:
-    def __init__(self):
+    """In-memory todos with indexes, persisted through a store.
+
+    durability "strict" (default) persists every mutation before returning.
+    "batched" only marks the manager dirty and lets a background flusher
+    write everything in one atomic save; call flush() or close() to force it.
+    Both default from TODO_DURABILITY, TODO_FLUSH_INTERVAL and TODO_FLUSH_OPS.
+
+    Several processes may share one data file. Writes take the store's
+    advisory lock, and before reading or writing the manager compares the
+    file's signature with the one it last saw, reloading only when another
+    process has changed it. Pending batched changes are merged on top of
+    the reloaded data record by record, unless another process wrote that
+    record since it was changed here: then the other write wins, the local
+    change is dropped, and the next compare-and-swap on the record and the
+    next flush() raise VersionConflictError.
+    """
+
+    def __init__(self, store: JsonStore | None = None, owner: str | None = None,
+                 durability: str | None = None, flush_interval: float | None = None,
+                 flush_ops: int | None = None, layout: str | None = None):
+        self.store = store if store is not None else open_store(TODOS_FILE, owner=owner)
+        self.layout = (layout or os.environ.get(MEMORY_LAYOUT_ENV, OBJECTS)).lower()
+        if self.layout not in (OBJECTS, COLUMNAR):
+            raise ValueError(f"Unknown memory layout: {self.layout!r}")
+        self.lock = threading.RLock()
+        self._signature = self.store.signature()
+        # Primary store: id -> TodoItem. Dicts keep insertion order, so this
+        # is also the creation-order list and deletes do not shift anything.
+        # Records are only converted to dicts when they are written out, and
+        # readers get these shared instances back: change them through
+        # update_todo() rather than by assigning attributes. The columnar
+        # layout keeps the same mapping in typed arrays and hands out copies.
         self.todos = self.load_todos()
+        self.rebuild_indexes()
+        # Ids changed or deleted since the last batched flush, and the
+        # version each had on disk before its first change (None if created
+        # here).
+        self._dirty_ids = set()
+        self._deleted_ids = set()
+        self._base_versions = {}
+        # Batched changes dropped because another process wrote the record
+        # first: ids a compare-and-swap must refuse once, and the conflicts
+        # the next flush reports.
+        self._conflicted_ids = set()
+        self._unreported_conflicts = []
+        # Nesting depth of _deferred() blocks, and whether a strict-mode write
+        # was put off until the outermost one ends.
+        self._defer_depth = 0
+        self._write_deferred = False
+        # One undo log per open transaction(), innermost last:
+        # id -> (TodoItem before its first change or None if created, seq).
+        self._undo_logs = []
+        durability = (durability or os.environ.get(DURABILITY_ENV, STRICT)).lower()
+        if durability == STRICT:
+            self.flusher = None
+        elif durability == BATCHED:
+            if flush_interval is None:
+                flush_interval = float(os.environ.get(FLUSH_INTERVAL_ENV, DEFAULT_FLUSH_INTERVAL))
+            if flush_ops is None:
+                flush_ops = int(os.environ.get(FLUSH_OPS_ENV, DEFAULT_FLUSH_OPS))
+            from flusher import WriteBehindFlusher
+
+            self.flusher = WriteBehindFlusher(self._write_batch, self.lock, flush_interval, flush_ops)
+        else:
+            raise ValueError(f"Unknown durability: {durability!r}")
+
+    def flush(self) -> None:
+        """Write pending batched changes now. A no-op in strict mode."""
+        if self.flusher is not None:
+            self.flusher.flush()
+
+    def close(self) -> None:
+        """Flush pending changes, stop the background flusher and save the title index.
 
-    def load_todos(self) -> list:
-        if not TODOS_FILE.exists():
-            return []
+        In batched mode this raises VersionConflictError if a pending change
+        was dropped because another process changed the same to-do first.
+        """
         try:
-            with open(TODOS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
+            if self.flusher is not None:
+                self.flusher.close()
+        finally:
+            self.save_trigram_index()
+
+    def refresh(self) -> bool:
+        """Reload if another process changed the data since we last saw it."""
+        with self.lock:
+            signature = self.store.signature()
+            if signature == self._signature:
+                return False
+            todos = self.load_todos()
+            for todo_id in list(self._deleted_ids):
+                if self._changed_elsewhere(todo_id, todos):
+                    self._drop_conflicting(todo_id, todos)
+                else:
+                    todos.pop(todo_id, None)
+            for todo_id in list(self._dirty_ids):
+                if self._changed_elsewhere(todo_id, todos):
+                    self._drop_conflicting(todo_id, todos)
+                elif todo_id in self.todos:
+                    todos[todo_id] = self.todos[todo_id]
+            self.todos = todos
+            self.rebuild_indexes()
+            self._signature = signature
+            return True
+
+    def _changed_elsewhere(self, todo_id: str, reloaded) -> bool:
+        """Whether another process wrote ``todo_id`` since its pending batched change was made."""
+        base = self._base_versions.get(todo_id)
+        if base is None:
+            return False
+        theirs = reloaded.get(todo_id)
+        if theirs is None:
+            return todo_id not in self._deleted_ids
+        return theirs.version != base
+
+    def _drop_conflicting(self, todo_id: str, reloaded) -> None:
+        theirs = reloaded.get(todo_id)
+        self._dirty_ids.discard(todo_id)
+        self._deleted_ids.discard(todo_id)
+        base = self._base_versions.pop(todo_id)
+        self._conflicted_ids.add(todo_id)
+        self._unreported_conflicts.append(
+            VersionConflictError(todo_id, base, None if theirs is None else theirs.version))
+
+    def _check_version(self, todo: TodoItem, expected_version: int | None) -> None:
+        # After a dropped batched change the caller may hold the dropped
+        # version, whose number can equal the one the other process wrote.
+        conflicted = todo.id in self._conflicted_ids
+        self._conflicted_ids.discard(todo.id)
+        if expected_version is not None and (conflicted or todo.version != expected_version):
+            if conflicted:
+                # Reported here, so flush() need not report it again.
+                self._unreported_conflicts = [c for c in self._unreported_conflicts if c.todo_id != todo.id]
+            raise VersionConflictError(todo.id, expected_version, todo.version)
+
+    @contextmanager
+    def _mutating(self):
+        with self.lock:
+            if self.flusher is not None:
+                with self.store.lock(shared=True):
+                    self.refresh()
+                yield
+                return
+            with self.store.lock():
+                self.refresh()
+                yield
+                self._signature = self.store.signature()
+
+    def _write_batch(self) -> None:
+        with self.store.lock():
+            self.refresh()
+            self.save_todos()
+            self._signature = self.store.signature()
+            self._dirty_ids.clear()
+            self._deleted_ids.clear()
+            self._base_versions.clear()
+            conflicts, self._unreported_conflicts = self._unreported_conflicts, []
+        if conflicts:
+            raise conflicts[0]
+
+    @contextmanager
+    def _deferred(self):
+        """Apply every mutation in the block in memory and write them once at the end."""
+        with self._mutating():
+            self._defer_depth += 1
+            try:
+                yield
+            finally:
+                self._defer_depth -= 1
+            if not self._defer_depth and self._write_deferred:
+                self.save_todos()
+                self._write_deferred = False
+
+    @contextmanager
+    def transaction(self):
+        """Group creates, updates and deletes into one unit of work.
+
+        Changes apply in memory straight away, so reads inside the block see
+        them, and are written with a single save when the outermost block
+        exits. If the block raises (or the save fails), every change made in
+        it is undone and the exception propagates. Transactions nest: an
+        inner block that fails is undone on its own and, once the outer one
+        commits, an inner one is written with it.
+        """
+        with self._mutating():
+            undo = {}
+            was_deferred = self._write_deferred
+            self._undo_logs.append(undo)
+            try:
+                with self._deferred():
+                    yield self
+            except BaseException:
+                self._undo_logs.pop()
+                self._rollback(undo)
+                if not self._undo_logs:
+                    self._write_deferred = was_deferred
+                raise
+            self._undo_logs.pop()
+            if self._undo_logs:
+                outer = self._undo_logs[-1]
+                for todo_id, entry in undo.items():
+                    outer.setdefault(todo_id, entry)
+
+    def _remember(self, todo_id: str, before: TodoItem | None) -> None:
+        if self.flusher is not None and todo_id not in self._base_versions:
+            self._base_versions[todo_id] = None if before is None else before.version
+        if self._undo_logs:
+            self._undo_logs[-1].setdefault(todo_id, (before, self.owner_index.seq.get(todo_id)))
+
+    def _rollback(self, undo: dict) -> None:
+        self._defer_depth += 1
+        try:
+            reorder = False
+            for todo_id, (before, seq) in undo.items():
+                current = self.todos.get(todo_id)
+                if before is None:
+                    if current is not None:
+                        del self.todos[todo_id]
+                        self._index_remove(todo_id, current)
+                        self._persist(self.store.record_delete, current)
+                elif current is None:
+                    self.todos[todo_id] = before
+                    self.owner_index.seq[todo_id] = seq
+                    self._index_add(todo_id, before)
+                    self._persist(self.store.record_create, before)
+                    reorder = True
+                else:
+                    # Restore in place so callers holding the item see it too.
+                    snapshot = replace(current)
+                    for name in TODO_FIELDS:
+                        setattr(current, name, getattr(before, name))
+                    self.todos[todo_id] = current
+                    self._index_update(todo_id, snapshot, current)
+                    self._persist(self.store.record_update, current, {})
+            if reorder:
+                # Re-inserted todos went to the end; put them back in place.
+                seq = self.owner_index.seq
+                todos = type(self.todos)()
+                for todo_id in sorted(self.todos, key=seq.__getitem__):
+                    todos[todo_id] = self.todos[todo_id]
+                self.todos = todos
+                self.rebuild_indexes()
+        finally:
+            self._defer_depth -= 1
+
+    def _persist(self, record_fn, todo: TodoItem, *args) -> None:
+        if self.flusher is None:
+            if self._defer_depth:
+                self._write_deferred = True
+                return
+            record_fn(self._records(), todo.to_dict(), *args)
+            return
+        if record_fn == self.store.record_delete:
+            self._dirty_ids.discard(todo.id)
+            self._deleted_ids.add(todo.id)
+        else:
+            self._dirty_ids.add(todo.id)
+        self.flusher.mark_dirty()
+
+    def _records(self):
+        return (t.to_dict() for t in self.todos.values())
+
+    def rebuild_indexes(self) -> None:
+        self.owner_index = OwnerIndex()
+        for todo_id, t in self.todos.items():
+            self.owner_index.add(todo_id, t)
+        # Built again (or loaded) on next use.
+        self._text_index = None
+        self._prefix_index = None
+        self._time_index = None
+        self._priority_index = None
+        self._trigram_index = None
+        self._trigram_changed = False
+
+    @property
+    def text_index(self) -> TextIndex:
+        """Full-text index, built on first use and then kept up to date."""
+        if self._text_index is None:
+            index = TextIndex()
+            for todo_id, t in self.todos.items():
+                index.add(todo_id, t)
+            self._text_index = index
+        return self._text_index
+
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        """Sorted ids per owner, built on first use and then kept up to date."""
+        if self._prefix_index is None:
+            self._prefix_index = PrefixIndex.build(self.todos.items())
+        return self._prefix_index
+
+    @property
+    def time_index(self) -> TimeIndex:
+        """Ids per owner sorted by created_at and updated_at, built on first use and then kept up to date."""
+        if self._time_index is None:
+            self._time_index = TimeIndex.build(self.todos.items())
+        return self._time_index
+
+    @property
+    def priority_index(self) -> PriorityIndex:
+        """Pending ids per owner by priority and age, built on first use and then kept up to date."""
+        if self._priority_index is None:
+            self._priority_index = PriorityIndex.build(self.todos.items())
+        return self._priority_index
+
+    def _trigram_path(self) -> Path | None:
+        base = getattr(self.store, "path", None) or getattr(self.store, "root", None)
+        return None if base is None else base.with_name(base.name + TRIGRAM_SUFFIX)
+
+    def _matches_store(self) -> bool:
+        """Whether memory holds exactly the data last read from or written to the store."""
+        return not (self._dirty_ids or self._deleted_ids or self._undo_logs or self._write_deferred)
+
+    @property
+    def trigram_index(self) -> TrigramIndex:
+        """Title trigram index: loaded from disk if it matches the data, else built."""
+        if self._trigram_index is None:
+            path = self._trigram_path()
+            index = None
+            if path is not None and self._matches_store():
+                index = load_trigram_index(path, getattr(self.store, "owner", None), self._signature)
+            if index is None:
+                index = TrigramIndex()
+                for todo_id, t in self.todos.items():
+                    index.add(todo_id, t)
+                self._trigram_changed = True
+            self._trigram_index = index
+        return self._trigram_index
+
+    def save_trigram_index(self) -> None:
+        """Write the trigram index next to the data file if it changed since it was loaded."""
+        with self.lock:
+            path = self._trigram_path()
+            if path is None or not self._trigram_changed or not self._matches_store():
+                return
+            try:
+                save_trigram_index(path, getattr(self.store, "owner", None), self._signature, self._trigram_index)
+            except OSError:
+                return  # only a cache; it is rebuilt next time
+            self._trigram_changed = False
+
+    def _touch_lazy_indexes(self) -> list:
+        """The on-demand indexes built so far, for a change about to be applied; marks the trigram index for saving."""
+        if self._trigram_index is not None:
+            self._trigram_changed = True
+        indexes = (self._text_index, self._trigram_index, self._prefix_index,
+                   self._time_index, self._priority_index)
+        return [i for i in indexes if i is not None]
+
+    def _index_add(self, todo_id: str, todo: TodoItem) -> None:
+        self.owner_index.add(todo_id, todo)
+        for index in self._touch_lazy_indexes():
+            index.add(todo_id, todo)
+
+    def _index_remove(self, todo_id: str, todo: TodoItem) -> None:
+        self.owner_index.remove(todo_id, todo)
+        for index in self._touch_lazy_indexes():
+            index.remove(todo_id, todo)
+
+    def _index_update(self, todo_id: str, before: TodoItem, after: TodoItem) -> None:
+        self.owner_index.update(todo_id, before, after)
+        for index in self._touch_lazy_indexes():
+            index.update(todo_id, before, after)
+
+    def load_todos(self) -> dict:
+        if self.layout == COLUMNAR:
+            from columnar import ColumnarTodos
+
+            return ColumnarTodos.from_records(self.store.load())
+        todos = (TodoItem.from_dict(t) for t in self.store.load())
+        return {t.id: t for t in todos}
 
     def save_todos(self) -> None:
-        with open(TODOS_FILE, "w", encoding="utf-8") as f:
-            json.dump(self.todos, f, indent=2)
+        self.store.save(self._records())
 
     def create_todo(self, title: str, details: str, priority: str, owner: str) -> TodoItem:
         """Create a new todo item."""
         priority_obj = Priority[priority.upper()] if priority.upper() in Priority.__members__ else Priority.MID
+        now = now_iso()
         todo = TodoItem(
             title=title,
             details=details,
             priority=priority_obj,
-            owner=owner
+            owner=owner,
+            created_at=now,
+            updated_at=now,
         )
-        self.todos.append(todo.to_dict())
-        self.save_todos()
+        with self._mutating():
+            self._insert(todo)
         return todo
 
+    def _insert(self, todo: TodoItem) -> None:
+        self._remember(todo.id, None)
+        self.todos[todo.id] = todo
+        self._index_add(todo.id, todo)
+        self._persist(self.store.record_create, todo)
+
+    def create_many(self, items) -> list:
+        """Create a todo for each dict of title, details, priority and owner.
+
+        Every item is validated on its own and the whole batch is written
+        once. Returns one BatchResult per item, in order; invalid items get
+        their ValueError and are skipped.
+        """
+        now = now_iso()
+        results = []
+        with self._deferred():
+            for item in items:
+                try:
+                    todo = new_todo_from_input(item, now)
+                except ValueError as e:
+                    results.append(BatchResult(None, error=e))
+                    continue
+                self._insert(todo)
+                results.append(BatchResult(todo.id, todo))
+        return results
+
+    def import_many(self, records, overwrite: bool = False) -> list:
+        """Add complete todo records (ids, timestamps and versions kept) and write once.
+
+        A record whose id already exists fails with ValueError, or with
+        ``overwrite`` replaces the existing todo in place. Returns one
+        BatchResult per record, in order.
+        """
+        results = []
+        with self._deferred():
+            for record in records:
+                try:
+                    todo = TodoItem.from_dict(record)
+                except (ValueError, TypeError, AttributeError) as e:
+                    results.append(BatchResult(None, error=ValueError(f"Invalid record: {e}")))
+                    continue
+                existing = self.todos.get(todo.id)
+                if existing is None:
+                    self._insert(todo)
+                elif not overwrite:
+                    results.append(BatchResult(todo.id, error=ValueError(f"Duplicate id {todo.id}")))
+                    continue
+                else:
+                    self._remember(todo.id, replace(existing))
+                    self.todos[todo.id] = todo
+                    self._index_update(todo.id, existing, todo)
+                    self._persist(self.store.record_update, todo, todo.to_dict())
+                results.append(BatchResult(todo.id, todo))
+        return results
+
     def get_todos_by_owner(self, owner: str) -> list:
         """Get all todos for a specific owner."""
-        return [TodoItem.from_dict(t) for t in self.todos if t.get("owner") == owner]
+        self.refresh()
+        return [self.todos[i] for i in self.owner_index.ids(owner)]
+
+    def query(self, owner: str, status: str | None = None, priority: str | None = None,
+              order_by: str = "created_at", limit: int | None = None, offset: int = 0) -> list:
+        """Get an owner's todos filtered by status/priority, sorted and paged.
+
+        order_by is one of created_at, updated_at, priority or title; prefix it
+        with "-" for descending order.
+        """
+        self.refresh()
+        ids = self.owner_index.ids(
+            owner,
+            status=None if status is None else enum_member(Status, status),
+            priority=None if priority is None else enum_member(Priority, priority),
+        )
+        descending = order_by.startswith("-")
+        field = order_by.lstrip("-")
+        if field not in QUERY_SORT_KEYS:
+            raise ValueError(f"Cannot order by {order_by!r}")
+        if field == "created_at":
+            if descending:
+                ids.reverse()
+        elif field == "updated_at":
+            ordered = self.time_index.ids(owner, "updated_at", descending=descending)
+            if status is not None or priority is not None:
+                matching = set(ids)
+                ordered = [i for i in ordered if i in matching]
+            ids = ordered
+        else:
+            key = QUERY_SORT_KEYS[field]
+            ids.sort(key=lambda i: key(self.todos[i]), reverse=descending)
+        end = None if limit is None else offset + limit
+        return [self.todos[i] for i in ids[offset:end]]
+
+    def search(self, owner: str, query: str, limit: int | None = 20) -> list:
+        """Get ``owner``'s todos whose title or details contain every word of ``query``.
+
+        Matching is on whole words, ignoring case; results are ranked with
+        title matches and rarer words counting most.
+        """
+        self.refresh()
+        return [self.todos[i] for i in self.text_index.search(owner, query, limit)]
+
+    def fuzzy_search(self, owner: str, query: str, limit: int = 10) -> list:
+        """Get ``owner``'s todos whose titles best match ``query``, tolerating typos.
+
+        "grocry" and "groc" both find "Grocery run"; see TrigramIndex.
+        """
+        self.refresh()
+        return [self.todos[i] for _, i in self.trigram_index.search(owner, query, limit)]
+
+    def resolve_id(self, owner: str, prefix: str) -> TodoItem | None:
+        """Get ``owner``'s todo whose id starts with ``prefix``, or None if there is none.
+
+        Raises AmbiguousIdError if more than one id starts with it.
+        """
+        self.refresh()
+        todo_id = self.prefix_index.resolve(owner, prefix)
+        return None if todo_id is None else self.todos[todo_id]
+
+    def short_id(self, todo: TodoItem) -> str:
+        """The shortest prefix of ``todo``'s id, at least 8 characters, that
+        resolve_id maps back to it."""
+        return self.prefix_index.shortest_unique_prefix(todo.owner, todo.id)
+
+    def changed_since(self, owner: str, since: int | str, limit: int | None = None) -> list:
+        """Get ``owner``'s todos updated at or after ``since``, oldest change first.
+
+        ``since`` is epoch microseconds or an ISO timestamp. Passing the
+        newest updated_at from one call to the next picks up where it left
+        off (that todo comes back once more).
+        """
+        self.refresh()
+        ids = self.time_index.ids(owner, "updated_at", since=as_micros(since))
+        return [self.todos[i] for i in ids[:limit]]
+
+    def created_between(self, owner: str, start: int | str | None = None,
+                        end: int | str | None = None) -> list:
+        """Get ``owner``'s todos created at or after ``start`` and before ``end``, oldest first."""
+        self.refresh()
+        ids = self.time_index.ids(owner, "created_at", since=as_micros(start), until=as_micros(end))
+        return [self.todos[i] for i in ids]
+
+    def recently_updated(self, owner: str, limit: int = 10) -> list:
+        """Get ``owner``'s ``limit`` most recently updated todos, newest first."""
+        self.refresh()
+        return [self.todos[i] for i in self.time_index.latest(owner, "updated_at", limit)]
+
+    def next_todos(self, owner: str, limit: int = NEXT_TODOS) -> list:
+        """Get ``owner``'s ``limit`` most urgent pending todos: HIGH before MID before LOW, oldest first."""
+        self.refresh()
+        return [self.todos[i] for i in self.priority_index.top(owner, limit)]
 
     def get_todo_by_id(self, todo_id: str) -> TodoItem | None:
         """Get a specific todo by ID."""
-        for t in self.todos:
-            if t.get("id") == todo_id:
-                return TodoItem.from_dict(t)
-        return None
+        self.refresh()
+        return self.todos.get(todo_id)
 
-    def update_todo(self, todo_id: str, **kwargs) -> bool:
-        """Update a todo item. Accepted kwargs: title, details, priority, status."""
-        for i, t in enumerate(self.todos):
-            if t.get("id") == todo_id:
-                if "title" in kwargs:
-                    t["title"] = kwargs["title"]
-                if "details" in kwargs:
-                    t["details"] = kwargs["details"]
-                if "priority" in kwargs:
-                    priority_obj = Priority[kwargs["priority"].upper()] if kwargs["priority"].upper() in Priority.__members__ else Priority.MID
-                    t["priority"] = priority_obj.value
-                if "status" in kwargs:
-                    status_obj = Status[kwargs["status"].upper()] if kwargs["status"].upper() in Status.__members__ else Status.PENDING
-                    t["status"] = status_obj.value
-                t["updated_at"] = datetime.utcnow().isoformat()
-                self.save_todos()
-                return True
-        return False
-
-    def delete_todo(self, todo_id: str) -> bool:
-        """Delete a todo item by ID."""
-        for i, t in enumerate(self.todos):
-            if t.get("id") == todo_id:
-                self.todos.pop(i)
-                self.save_todos()
-                return True
-        return False
+    def update_todo(self, todo_id: str, expected_version: int | None = None, **kwargs) -> bool:
+        """Update a todo item. Accepted kwargs: title, details, priority, status.
+
+        With expected_version, raise VersionConflictError instead of writing
+        if the todo has been changed since that version was read.
+        """
+        with self._mutating():
+            return self._update_locked(todo_id, expected_version, kwargs)
+
+    def _update_locked(self, todo_id: str, expected_version: int | None, kwargs: dict) -> bool:
+        t = self.todos.get(todo_id)
+        if t is None:
+            return False
+        self._check_version(t, expected_version)
+        # Convert every value before touching t, so a bad one changes nothing.
+        values = {key: kwargs[key] for key in ("title", "details") if key in kwargs}
+        if "priority" in kwargs:
+            values["priority"] = enum_member_or(Priority, kwargs["priority"], Priority.MID)
+        if "status" in kwargs:
+            values["status"] = enum_member_or(Status, kwargs["status"], Status.PENDING)
+        before = replace(t)
+        self._remember(todo_id, before)
+        # changes holds the serialised values written to the store.
+        changes = {}
+        for key, value in values.items():
+            setattr(t, key, value)
+            changes[key] = value.value if key in ("priority", "status") else value
+        t.updated_at = changes["updated_at"] = now_iso()
+        t.version = changes["version"] = t.version + 1
+        self.todos[todo_id] = t
+        self._index_update(todo_id, before, t)
+        self._persist(self.store.record_update, t, changes)
+        return True
+
+    def update_many(self, updates) -> list:
+        """Apply a list of ``{"id": ..., "expected_version": ..., **changes}`` dicts.
+
+        Changes are validated strictly (unknown fields or priority/status
+        names are errors), missing ids fail with KeyError and stale
+        expected_versions with VersionConflictError. Successful updates are
+        written once. Returns one BatchResult per update, in order.
+        """
+        results = []
+        with self._deferred():
+            for update in updates:
+                changes = dict(update)
+                todo_id = changes.pop("id", None)
+                expected_version = changes.pop("expected_version", None)
+                try:
+                    validate_changes(changes)
+                    if not self._update_locked(todo_id, expected_version, changes):
+                        raise KeyError(todo_id)
+                except (ValueError, KeyError, VersionConflictError) as e:
+                    results.append(BatchResult(todo_id, error=e))
+                    continue
+                results.append(BatchResult(todo_id, self.todos[todo_id]))
+        return results
+
+    def delete_todo(self, todo_id: str, expected_version: int | None = None) -> bool:
+        """Delete a todo item by ID, optionally only if still at expected_version."""
+        with self._mutating():
+            return self._delete_locked(todo_id, expected_version)
+
+    def _delete_locked(self, todo_id: str, expected_version: int | None) -> bool:
+        t = self.todos.get(todo_id)
+        if t is None:
+            return False
+        self._check_version(t, expected_version)
+        self._remember(todo_id, t)
+        del self.todos[todo_id]
+        self._index_remove(todo_id, t)
+        self._persist(self.store.record_delete, t)
+        return True
+
+    def delete_many(self, todo_ids, expected_versions: dict | None = None) -> list:
+        """Delete every id in ``todo_ids`` and write once.
+
+        ``expected_versions`` optionally maps ids to the version each delete
+        requires. Returns one BatchResult per id, in order; missing ids fail
+        with KeyError and stale versions with VersionConflictError.
+        """
+        expected_versions = expected_versions or {}
+        results = []
+        with self._deferred():
+            for todo_id in todo_ids:
+                try:
+                    if not self._delete_locked(todo_id, expected_versions.get(todo_id)):
+                        raise KeyError(todo_id)
+                except (KeyError, VersionConflictError) as e:
+                    results.append(BatchResult(todo_id, error=e))
+                    continue
+                results.append(BatchResult(todo_id))
+        return results
+
+
+def create_todo_manager(owner: str | None = None):
+    """Return the TodoManager for the backend selected by TODO_STORAGE.
+
+    Passing ``owner`` lets sharded storage load only that user's todos.
+    """
+    if using_sqlite():
+        import sqlite_backend
+
+        return sqlite_backend.SqliteTodoManager(DB_FILE)
+    return TodoManager(owner=owner)
 
 
 def signup() -> None:
@@ -118,6 +772,8 @@ def signup() -> None:
     if find_user(users, username):
         print("User already exists.")
         return
+    from getpass import getpass
+
     password = getpass("Password: ")
     users.append({"username": username, "password": password})
     save_users(users)
@@ -127,6 +783,8 @@ def signup() -> None:
 def login() -> str | None:
     print("== Login ==")
     username = input("Username: ").strip()
+    from getpass import getpass
+
     password = getpass("Password: ")
     users = load_users()
     user = find_user(users, username)
@@ -137,10 +795,28 @@ def login() -> str | None:
     return username
 
 
+def dropped_change_message(error: VersionConflictError) -> str:
+    """Tell the user which batched change lost to another process's write."""
+    if error.actual is None:
+        return f"Your change to to-do {error.todo_id} was not saved: it was deleted in another session."
+    return (f"Your change to to-do {error.todo_id} was not saved: it was changed in another "
+            f"session first (now version {error.actual}).")
+
+
 def post_login_menu(username: str) -> None:
     """Main menu for logged-in users."""
-    todo_manager = TodoManager()
-    
+    todo_manager = create_todo_manager(username)
+    try:
+        _menu_loop(todo_manager, username)
+    finally:
+        try:
+            todo_manager.close()
+        except VersionConflictError as e:
+            print(dropped_change_message(e))
+
+
+def _menu_loop(todo_manager: TodoManager, username: str) -> None:
+    """Run the main menu until the user logs out."""
     while True:
         print(f"\n=== Main Menu ({username}) ===")
         print("1) Create a to-do")
@@ -149,7 +825,9 @@ def post_login_menu(username: str) -> None:
         print("4) Mark to-do as completed")
         print("5) Edit a to-do")
         print("6) Delete a to-do")
-        print("7) Logout")
+        print("7) Search to-dos")
+        print("8) What should I do next?")
+        print("9) Logout")
         print()
         
         choice = input("Select an option: ").strip()
@@ -167,10 +845,14 @@ def post_login_menu(username: str) -> None:
         elif choice == "6":
             delete_todo_interactive(todo_manager, username)
         elif choice == "7":
+            search_todos_interactive(todo_manager, username)
+        elif choice == "8":
+            view_next_todos(todo_manager, username)
+        elif choice == "9":
             print("Logging out...")
             break
         else:
-            print("Invalid choice. Enter 1-7.")
+            print("Invalid choice. Enter 1-9.")
 
 
 def create_todo_interactive(todo_manager: TodoManager, username: str) -> None:
@@ -203,136 +885,166 @@ def view_all_todos(todo_manager: TodoManager, username: str) -> None:
     print(f"\n=== Your To-Dos ===")
     for todo in todos:
         status_marker = "✓" if todo.status == Status.COMPLETED else "○"
-        print(f"{status_marker} [{todo.id[:8]}...] {todo.title} ({todo.priority.value})")
+        print(f"{status_marker} [{todo_manager.short_id(todo)}...] {todo.title} ({todo.priority.value})")
 
 
-def view_todo_details(todo_manager: TodoManager, username: str) -> None:
-    """View detailed information about a specific todo."""
-    todos = todo_manager.get_todos_by_owner(username)
-    
+def view_next_todos(todo_manager: TodoManager, username: str) -> None:
+    """Suggest the most urgent pending todos: highest priority, then oldest."""
+    todos = todo_manager.next_todos(username)
+
     if not todos:
-        print("\nNo to-dos found.")
+        print("\nNothing pending. Well done!")
         return
-    
-    print("\n=== Select a To-Do to View ===")
+
+    print("\n=== What Should I Do Next? ===")
     for i, todo in enumerate(todos, 1):
+        print(f"{i}) [{todo_manager.short_id(todo)}...] {todo.title} ({todo.priority.value}, created {todo.created_at[:10]})")
+
+
+def search_todos_interactive(todo_manager: TodoManager, username: str) -> None:
+    """Search the logged-in user's todos by words in the title or details."""
+    query = input("\nSearch for: ").strip()
+    if not query:
+        print("Search cannot be empty.")
+        return
+
+    todos = todo_manager.search(username, query)
+    if not todos:
+        print("No matching to-dos.")
+        return
+
+    print(f"\n=== Results for '{query}' ===")
+    for todo in todos:
         status_marker = "✓" if todo.status == Status.COMPLETED else "○"
-        print(f"{i}) {status_marker} {todo.title}")
-    
+        print(f"{status_marker} [{todo_manager.short_id(todo)}...] {todo.title} ({todo.priority.value})")
+
+
+def _select_todo(todo_manager: TodoManager, username: str, heading: str,
+                 show_status: bool = True) -> TodoItem | None:
+    """Let the user pick one of their todos, optionally narrowed by a title search.
+
+    Answering ``#`` and an id prefix (as shown by "View all to-dos") picks
+    that todo directly. Prints why when nothing is picked and returns None.
+    """
+    if not todo_manager.query(username, limit=1):
+        print("\nNo to-dos found.")
+        return None
+
+    print(f"\n=== {heading} ===")
+    search = input("Search by title or #id (leave empty to list all): ").strip()
+    if search.startswith("#"):
+        try:
+            todo = todo_manager.resolve_id(username, search[1:].strip())
+        except AmbiguousIdError as e:
+            print(e)
+            return None
+        if todo is None:
+            print("No to-do has that id.")
+        return todo
+    if search:
+        todos = todo_manager.fuzzy_search(username, search, limit=SELECT_MATCHES)
+        if not todos:
+            print("No matching to-dos.")
+            return None
+    else:
+        todos = todo_manager.get_todos_by_owner(username)
+
+    for i, todo in enumerate(todos, 1):
+        if show_status:
+            status_marker = "✓" if todo.status == Status.COMPLETED else "○"
+            print(f"{i}) {status_marker} {todo.title}")
+        else:
+            print(f"{i}) {todo.title}")
+
     try:
         choice = int(input("Select a to-do (number): ").strip())
-        if 1 <= choice <= len(todos):
-            todo = todos[choice - 1]
-            print("\n=== To-Do Details ===")
-            print(f"ID: {todo.id}")
-            print(f"Title: {todo.title}")
-            print(f"Details: {todo.details if todo.details else '(no details)'}")
-            print(f"Priority: {todo.priority.value}")
-            print(f"Status: {todo.status.value}")
-            print(f"Owner: {todo.owner}")
-            print(f"Created: {todo.created_at}")
-            print(f"Updated: {todo.updated_at}")
-        else:
-            print("Invalid selection.")
     except ValueError:
         print("Invalid input.")
+        return None
+    if not 1 <= choice <= len(todos):
+        print("Invalid selection.")
+        return None
+    return todos[choice - 1]
+
+
+def view_todo_details(todo_manager: TodoManager, username: str) -> None:
+    """View detailed information about a specific todo."""
+    todo = _select_todo(todo_manager, username, "Select a To-Do to View")
+    if todo is None:
+        return
+
+    print("\n=== To-Do Details ===")
+    print(f"ID: {todo.id}")
+    print(f"Title: {todo.title}")
+    print(f"Details: {todo.details if todo.details else '(no details)'}")
+    print(f"Priority: {todo.priority.value}")
+    print(f"Status: {todo.status.value}")
+    print(f"Owner: {todo.owner}")
+    print(f"Created: {todo.created_at}")
+    print(f"Updated: {todo.updated_at}")
 
 
 def mark_todo_completed(todo_manager: TodoManager, username: str) -> None:
     """Mark a todo as completed."""
-    todos = todo_manager.get_todos_by_owner(username)
-    
-    if not todos:
-        print("\nNo to-dos found.")
+    todo = _select_todo(todo_manager, username, "Mark To-Do as Completed")
+    if todo is None:
+        return
+
+    if todo.status == Status.COMPLETED:
+        print(f"To-do '{todo.title}' is already completed.")
         return
-    
-    print("\n=== Mark To-Do as Completed ===")
-    for i, todo in enumerate(todos, 1):
-        status_marker = "✓" if todo.status == Status.COMPLETED else "○"
-        print(f"{i}) {status_marker} {todo.title}")
-    
     try:
-        choice = int(input("Select a to-do (number): ").strip())
-        if 1 <= choice <= len(todos):
-            todo = todos[choice - 1]
-            if todo.status == Status.COMPLETED:
-                print(f"To-do '{todo.title}' is already completed.")
-            else:
-                todo_manager.update_todo(todo.id, status="COMPLETED")
-                print(f"To-do '{todo.title}' marked as completed.")
-        else:
-            print("Invalid selection.")
-    except ValueError:
-        print("Invalid input.")
+        todo_manager.update_todo(todo.id, expected_version=todo.version, status="COMPLETED")
+        print(f"To-do '{todo.title}' marked as completed.")
+    except VersionConflictError:
+        print("This to-do was changed elsewhere. Please try again.")
 
 
 def edit_todo_interactive(todo_manager: TodoManager, username: str) -> None:
     """Edit an existing todo."""
-    todos = todo_manager.get_todos_by_owner(username)
-    
-    if not todos:
-        print("\nNo to-dos found.")
+    todo = _select_todo(todo_manager, username, "Edit a To-Do", show_status=False)
+    if todo is None:
+        return
+
+    print(f"\nEditing: {todo.title}")
+
+    title = input("New title (leave empty to skip): ").strip()
+    details = input("New details (leave empty to skip): ").strip()
+    priority = input("New priority [HIGH/MID/LOW] (leave empty to skip): ").strip().upper()
+
+    updates = {}
+    if title:
+        updates["title"] = title
+    if details:
+        updates["details"] = details
+    if priority and priority in ["HIGH", "MID", "LOW"]:
+        updates["priority"] = priority
+
+    if not updates:
+        print("No changes made.")
         return
-    
-    print("\n=== Edit a To-Do ===")
-    for i, todo in enumerate(todos, 1):
-        print(f"{i}) {todo.title}")
-    
     try:
-        choice = int(input("Select a to-do (number): ").strip())
-        if 1 <= choice <= len(todos):
-            todo = todos[choice - 1]
-            print(f"\nEditing: {todo.title}")
-            
-            title = input("New title (leave empty to skip): ").strip()
-            details = input("New details (leave empty to skip): ").strip()
-            priority = input("New priority [HIGH/MID/LOW] (leave empty to skip): ").strip().upper()
-            
-            updates = {}
-            if title:
-                updates["title"] = title
-            if details:
-                updates["details"] = details
-            if priority and priority in ["HIGH", "MID", "LOW"]:
-                updates["priority"] = priority
-            
-            if updates:
-                todo_manager.update_todo(todo.id, **updates)
-                print("To-do updated successfully.")
-            else:
-                print("No changes made.")
-        else:
-            print("Invalid selection.")
-    except ValueError:
-        print("Invalid input.")
+        todo_manager.update_todo(todo.id, expected_version=todo.version, **updates)
+        print("To-do updated successfully.")
+    except VersionConflictError:
+        print("This to-do was changed elsewhere. Please try again.")
 
 
 def delete_todo_interactive(todo_manager: TodoManager, username: str) -> None:
     """Delete a todo."""
-    todos = todo_manager.get_todos_by_owner(username)
-    
-    if not todos:
-        print("\nNo to-dos found.")
+    todo = _select_todo(todo_manager, username, "Delete a To-Do", show_status=False)
+    if todo is None:
+        return
+
+    confirm = input(f"Are you sure you want to delete '{todo.title}'? (yes/no): ").strip().lower()
+    if confirm != "yes":
+        print("Deletion cancelled.")
         return
-    
-    print("\n=== Delete a To-Do ===")
-    for i, todo in enumerate(todos, 1):
-        print(f"{i}) {todo.title}")
-    
     try:
-        choice = int(input("Select a to-do (number): ").strip())
-        if 1 <= choice <= len(todos):
-            todo = todos[choice - 1]
-            confirm = input(f"Are you sure you want to delete '{todo.title}'? (yes/no): ").strip().lower()
-            if confirm == "yes":
-                todo_manager.delete_todo(todo.id)
-                print("To-do deleted successfully.")
-            else:
-                print("Deletion cancelled.")
-        else:
-            print("Invalid selection.")
-    except ValueError:
-        print("Invalid input.")
+        todo_manager.delete_todo(todo.id, expected_version=todo.version)
+        print("To-do deleted successfully.")
+    except VersionConflictError:
+        print("This to-do was changed elsewhere. Please try again.")
 
 
 def pre_login_menu() -> None:
@@ -354,6 +1066,16 @@ def pre_login_menu() -> None:
 
 
 if __name__ == "__main__":
+    if "--startup-profile" in sys.argv[1:]:
+        import startup
+
+        sys.exit(startup.profile_startup([a for a in sys.argv[1:] if a != startup.PROFILE_FLAG]))
+    if len(sys.argv) > 1:
+        # Let cli's "from main import ..." reuse this module instead of loading it twice.
+        sys.modules.setdefault("main", sys.modules[__name__])
+        import cli
+
+        sys.exit(cli.main(sys.argv[1:]))
     try:
         pre_login_menu()
     except KeyboardInterrupt:
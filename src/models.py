@@ -1,63 +1,218 @@
 from dataclasses import dataclass, field, asdict
 from enum import Enum
-from typing import Any, Dict
-import uuid
-from datetime import datetime, timezone
+
+from clock import now_iso, us_from_iso
+from ids import id_generator
 
 
 class Priority(Enum):
+    """Declared most urgent first; ``rank`` is 0 for HIGH and grows as urgency falls."""
+
     HIGH = "HIGH"
     MID = "MID"
     LOW = "LOW"
 
+    @property
+    def rank(self) -> int:
+        return _PRIORITY_RANKS[self]
+
+
+_PRIORITY_RANKS = {priority: rank for rank, priority in enumerate(Priority)}
+
 
 class Status(Enum):
     PENDING = "PENDING"
     COMPLETED = "COMPLETED"
 
 
+class VersionConflictError(Exception):
+    """Raised when a compare-and-swap update or delete sees a newer version."""
+
+    def __init__(self, todo_id: str, expected: int, actual: int):
+        super().__init__(f"To-do {todo_id} is at version {actual}, expected {expected}")
+        self.todo_id = todo_id
+        self.expected = expected
+        self.actual = actual
+
+
+class AmbiguousIdError(ValueError):
+    """Raised when an id prefix matches more than one to-do."""
+
+    def __init__(self, prefix: str, count: int):
+        super().__init__(f"{prefix!r} matches {count} to-dos; use a longer prefix")
+        self.prefix = prefix
+        self.count = count
+
+
 @dataclass
 class User:
     username: str = ""
     password: str = ""
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> dict:
         return asdict(self)
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> "User":
+    def from_dict(data: dict) -> "User":
         return User(
             username=data.get("username", ""),
             password=data.get("password", ""),
         )
 
 
-@dataclass
+# uuid4 by default; TODO_ID_SCHEME=uuid7 makes new ids sort by creation time.
+_generate_id = id_generator()
+
+
+def _new_id() -> str:
+    return _generate_id()
+
+
+def _now_iso() -> str:
+    return now_iso()
+
+
+# Plain dict lookups instead of going through EnumMeta.__call__ each time.
+_PRIORITY_BY_VALUE = {p.value: p for p in Priority}
+_STATUS_BY_VALUE = {s.value: s for s in Status}
+
+
+@dataclass(slots=True)
 class TodoItem:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_new_id)
     title: str = ""
     details: str = ""
     priority: Priority = Priority.MID
     status: Status = Status.PENDING
     owner: str = ""
-    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = field(default_factory=_now_iso)
+    updated_at: str = field(default_factory=_now_iso)
+    version: int = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "details": self.details,
+            "priority": self.priority.value,
+            "status": self.status.value,
+            "owner": self.owner,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "version": self.version,
+        }
 
-    def to_dict(self) -> Dict[str, Any]:
-        d = asdict(self)
-        d["priority"] = self.priority.value
-        d["status"] = self.status.value
-        return d
+    @property
+    def created_us(self) -> int | None:
+        """created_at as epoch microseconds, or None if it is not a timestamp."""
+        return us_from_iso(self.created_at)
+
+    @property
+    def updated_us(self) -> int | None:
+        """updated_at as epoch microseconds, or None if it is not a timestamp."""
+        return us_from_iso(self.updated_at)
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> "TodoItem":
+    def from_dict(data: dict) -> "TodoItem":
+        get = data.get
+        # Defaults are only generated for fields that are actually missing.
+        todo_id = get("id")
+        created_at = get("created_at")
+        updated_at = get("updated_at")
+        if todo_id is None:
+            todo_id = _new_id()
+        if created_at is None or updated_at is None:
+            now = _now_iso()
+            created_at = now if created_at is None else created_at
+            updated_at = now if updated_at is None else updated_at
+        priority = get("priority", "MID")
+        status = get("status", "PENDING")
         return TodoItem(
-            id=data.get("id", str(uuid.uuid4())),
-            title=data.get("title", ""),
-            details=data.get("details", ""),
-            priority=Priority(data.get("priority", "MID")),
-            status=Status(data.get("status", "PENDING")),
-            owner=data.get("owner", ""),
-            created_at=data.get("created_at", datetime.now(timezone.utc).isoformat()),
-            updated_at=data.get("updated_at", datetime.now(timezone.utc).isoformat()),
+            todo_id,
+            get("title", ""),
+            get("details", ""),
+            _PRIORITY_BY_VALUE.get(priority) or Priority(priority),
+            _STATUS_BY_VALUE.get(status) or Status(status),
+            get("owner", ""),
+            created_at,
+            updated_at,
+            get("version", 1),
         )
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """Outcome of one item of a create_many, update_many or delete_many call."""
+
+    todo_id: str | None
+    todo: TodoItem | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+NEW_TODO_FIELDS = ("title", "details", "priority", "owner")
+CHANGEABLE_FIELDS = ("title", "details", "priority", "status")
+
+
+def _check_fields(item: dict, allowed) -> None:
+    unknown = sorted(k for k in item if k not in allowed)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+
+def enum_member(enum_cls, value):
+    """Normalise an enum member or (case-insensitive) name to the member; ValueError otherwise."""
+    if isinstance(value, enum_cls):
+        return value
+    try:
+        return enum_cls[value.upper()]
+    except (AttributeError, KeyError):
+        raise ValueError(f"Invalid {enum_cls.__name__.lower()}: {value!r}") from None
+
+
+def enum_member_or(enum_cls, value, default):
+    """Like enum_member, but ``default`` for anything that is not a member or name."""
+    try:
+        return enum_member(enum_cls, value)
+    except ValueError:
+        return default
+
+
+def _text(item: dict, key: str, required: bool = False) -> str:
+    value = item.get(key, "")
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a string")
+    if required and not value.strip():
+        raise ValueError(f"{key} cannot be empty")
+    return value
+
+
+def new_todo_from_input(item: dict, now: str) -> TodoItem:
+    """Validate a create_many item (title, details, priority, owner) into a TodoItem.
+
+    Unlike create_todo, an unknown priority is an error rather than MID.
+    """
+    _check_fields(item, NEW_TODO_FIELDS)
+    return TodoItem(
+        title=_text(item, "title", required=True),
+        details=_text(item, "details"),
+        priority=enum_member(Priority, item.get("priority", "MID")),
+        owner=_text(item, "owner", required=True),
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def validate_changes(changes: dict) -> dict:
+    """Validate update_many field changes, raising ValueError for bad input."""
+    _check_fields(changes, CHANGEABLE_FIELDS)
+    for key in ("title", "details"):
+        if key in changes:
+            _text(changes, key, required=key == "title")
+    for key, enum_cls in (("priority", Priority), ("status", Status)):
+        if key in changes:
+            enum_member(enum_cls, changes[key])
+    return changes
@@ -0,0 +1,522 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+from clock import as_micros, now_iso, us_from_iso
+from indexes import SHORT_ID_LENGTH, TrigramIndex, common_prefix_length, tokenize
+from models import (
+    AmbiguousIdError,
+    BatchResult,
+    TodoItem,
+    Priority,
+    Status,
+    VersionConflictError,
+    enum_member,
+    enum_member_or,
+    new_todo_from_input,
+    validate_changes,
+)
+
+TODO_COLUMNS = ("id", "title", "details", "priority", "status", "owner", "created_at", "updated_at", "version")
+# Integer copies of priority and the timestamps, written with every row so
+# the sort-heavy queries can use plain indexes; timestamps that do not parse
+# are stored as 0.
+DERIVED_COLUMNS = ("priority_rank", "created_us", "updated_us")
+ROW_COLUMNS = TODO_COLUMNS + DERIVED_COLUMNS
+INSERT_TODO_SQL = f"INSERT INTO todos ({', '.join(ROW_COLUMNS)}) VALUES ({', '.join('?' * len(ROW_COLUMNS))})"
+
+# ORDER BY templates for query(); ties break the way TodoManager's are:
+# by creation order for a sorted field, by id for the time index.
+ORDER_BY_SQL = {
+    "created_at": "seq {dir}",
+    "updated_at": "updated_us {dir}, id {dir}",
+    "priority": "priority_rank {dir}, seq",
+    "title": "title COLLATE NOCASE {dir}, seq",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    details TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'MID',
+    status TEXT NOT NULL DEFAULT 'PENDING',
+    owner TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 1,
+    priority_rank INTEGER NOT NULL DEFAULT 0,
+    created_us INTEGER NOT NULL DEFAULT 0,
+    updated_us INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_todos_id ON todos(id);
+CREATE INDEX IF NOT EXISTS idx_todos_owner_status ON todos(owner, status);
+CREATE INDEX IF NOT EXISTS idx_todos_owner_id ON todos(owner, id);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL DEFAULT ''
+);
+"""
+
+# Full-text index over title and details, kept in step with todos by triggers.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+    title, details, content='todos', content_rowid='seq'
+);
+CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+    INSERT INTO todos_fts(rowid, title, details) VALUES (new.seq, new.title, new.details);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+    INSERT INTO todos_fts(todos_fts, rowid, title, details) VALUES ('delete', old.seq, old.title, old.details);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, details ON todos BEGIN
+    INSERT INTO todos_fts(todos_fts, rowid, title, details) VALUES ('delete', old.seq, old.title, old.details);
+    INSERT INTO todos_fts(rowid, title, details) VALUES (new.seq, new.title, new.details);
+END;
+"""
+# PRAGMA user_version once DERIVED_COLUMNS have been added and filled in.
+DERIVED_COLUMNS_VERSION = 1
+# Created after any missing derived columns have been added and filled in.
+DERIVED_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_todos_next ON todos(owner, status, priority_rank, created_us, id);
+CREATE INDEX IF NOT EXISTS idx_todos_owner_created_us ON todos(owner, created_us, id);
+CREATE INDEX IF NOT EXISTS idx_todos_owner_updated_us ON todos(owner, updated_us, id);
+DROP INDEX IF EXISTS idx_todos_owner_updated;
+"""
+# Epoch-micros column behind each timestamp field.
+TIME_SQL = {"created_at": "created_us", "updated_at": "updated_us"}
+# Same weighting as indexes.TITLE_WEIGHT.
+SEARCH_RANK_SQL = "bm25(todos_fts, 3.0, 1.0)"
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Makes INSERT OR REPLACE fire the delete trigger for the replaced row.
+    conn.execute("PRAGMA recursive_triggers=ON")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(todos)")}
+    if "version" not in columns:
+        conn.execute("ALTER TABLE todos ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < DERIVED_COLUMNS_VERSION:
+        _add_derived_columns(conn)
+    conn.executescript(DERIVED_INDEXES)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'todos_fts'").fetchone():
+        with conn:
+            conn.executescript(FTS_SCHEMA)
+            conn.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+    return conn
+
+
+def _add_derived_columns(conn: sqlite3.Connection) -> None:
+    """Add any missing DERIVED_COLUMNS and fill them in, all in one transaction.
+
+    sqlite3 would run the ALTERs outside any transaction, so BEGIN is
+    explicit; an interrupted migration leaves user_version unset and runs
+    again on the next connect.
+    """
+    conn.create_function("todo_micros", 1, us_from_iso, deterministic=True)
+    rank_sql = "CASE priority " + " ".join(f"WHEN '{p.value}' THEN {p.rank}" for p in Priority) + " ELSE 0 END"
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-checked under the write lock, in case another process just migrated.
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= DERIVED_COLUMNS_VERSION:
+            conn.rollback()
+            return
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(todos)")}
+        for column in DERIVED_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE todos ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"UPDATE todos SET priority_rank = {rank_sql}, "
+                     "created_us = COALESCE(todo_micros(created_at), 0), "
+                     "updated_us = COALESCE(todo_micros(updated_at), 0)")
+        conn.execute(f"PRAGMA user_version = {DERIVED_COLUMNS_VERSION}")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _todo_row(todo: TodoItem) -> list:
+    """Values for ROW_COLUMNS."""
+    record = todo.to_dict()
+    return [record[col] for col in TODO_COLUMNS] + [todo.priority.rank, todo.created_us or 0, todo.updated_us or 0]
+
+
+def _row_to_todo(row: sqlite3.Row) -> TodoItem:
+    return TodoItem.from_dict({col: row[col] for col in TODO_COLUMNS})
+
+
+class SqliteTodoManager:
+    """TodoManager backed by an SQLite database in WAL mode.
+
+    Offers the same methods as ``main.TodoManager`` but every call is a single
+    indexed statement, so nothing is loaded into memory up front.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.conn = connect(self.db_path)
+        self._savepoints = 0
+
+    def flush(self) -> None:
+        """Every method commits its own statement, so there is nothing to flush."""
+
+    @contextmanager
+    def _writing(self):
+        """Commit on exit, unless a transaction() is open to commit it later."""
+        if self._savepoints:
+            yield
+            return
+        with self.conn:
+            yield
+
+    @contextmanager
+    def transaction(self):
+        """Run the block as one SQLite transaction; see TodoManager.transaction.
+
+        Nested blocks are savepoints, so a failing inner block is rolled back
+        on its own.
+        """
+        self._savepoints += 1
+        name = f"todo_tx_{self._savepoints}"
+        self.conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO {name}")
+            self.conn.execute(f"RELEASE {name}")
+            raise
+        else:
+            self.conn.execute(f"RELEASE {name}")
+        finally:
+            self._savepoints -= 1
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def create_todo(self, title: str, details: str, priority: str, owner: str) -> TodoItem:
+        """Create a new todo item."""
+        priority_obj = Priority[priority.upper()] if priority.upper() in Priority.__members__ else Priority.MID
+        now = now_iso()
+        todo = TodoItem(
+            title=title,
+            details=details,
+            priority=priority_obj,
+            owner=owner,
+            created_at=now,
+            updated_at=now,
+        )
+        with self._writing():
+            self.conn.execute(INSERT_TODO_SQL, _todo_row(todo))
+        return todo
+
+    def create_many(self, items) -> list:
+        """Create todos from dicts in one transaction; see TodoManager.create_many."""
+        now = now_iso()
+        results, rows = [], []
+        for item in items:
+            try:
+                todo = new_todo_from_input(item, now)
+            except ValueError as e:
+                results.append(BatchResult(None, error=e))
+                continue
+            rows.append(_todo_row(todo))
+            results.append(BatchResult(todo.id, todo))
+        with self._writing():
+            self.conn.executemany(INSERT_TODO_SQL, rows)
+        return results
+
+    def import_many(self, records, overwrite: bool = False) -> list:
+        """Add complete todo records in one transaction; see TodoManager.import_many."""
+        results = []
+        with self._writing():
+            for record in records:
+                try:
+                    todo = TodoItem.from_dict(record)
+                except (ValueError, TypeError, AttributeError) as e:
+                    results.append(BatchResult(None, error=ValueError(f"Invalid record: {e}")))
+                    continue
+                row = _todo_row(todo)
+                if overwrite:
+                    assignments = ", ".join(f"{col} = ?" for col in ROW_COLUMNS[1:])
+                    cur = self.conn.execute(f"UPDATE todos SET {assignments} WHERE id = ?", row[1:] + [todo.id])
+                    if cur.rowcount:
+                        results.append(BatchResult(todo.id, todo))
+                        continue
+                try:
+                    self.conn.execute(INSERT_TODO_SQL, row)
+                except sqlite3.IntegrityError:
+                    results.append(BatchResult(todo.id, error=ValueError(f"Duplicate id {todo.id}")))
+                    continue
+                results.append(BatchResult(todo.id, todo))
+        return results
+
+    def iter_records(self, owner: str | None = None):
+        """Yield stored records as dicts in creation order without loading them all."""
+        sql, params = f"SELECT {', '.join(TODO_COLUMNS)} FROM todos", []
+        if owner is not None:
+            sql, params = sql + " WHERE owner = ?", [owner]
+        for row in self.conn.execute(sql + " ORDER BY seq", params):
+            yield dict(row)
+
+    def get_todos_by_owner(self, owner: str) -> list:
+        """Get all todos for a specific owner."""
+        rows = self.conn.execute("SELECT * FROM todos WHERE owner = ? ORDER BY seq", (owner,))
+        return [_row_to_todo(row) for row in rows]
+
+    def query(self, owner: str, status: str | None = None, priority: str | None = None,
+              order_by: str = "created_at", limit: int | None = None, offset: int = 0) -> list:
+        """Get an owner's todos filtered by status/priority, sorted and paged."""
+        where, params = ["owner = ?"], [owner]
+        if status is not None:
+            where.append("status = ?")
+            params.append(enum_member(Status, status).value)
+        if priority is not None:
+            where.append("priority = ?")
+            params.append(enum_member(Priority, priority).value)
+        field = order_by.lstrip("-")
+        if field not in ORDER_BY_SQL:
+            raise ValueError(f"Cannot order by {order_by!r}")
+        direction = "DESC" if order_by.startswith("-") else "ASC"
+        sql = f"SELECT * FROM todos WHERE {' AND '.join(where)} ORDER BY {ORDER_BY_SQL[field].format(dir=direction)}"
+        sql += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return [_row_to_todo(row) for row in self.conn.execute(sql, params)]
+
+    def search(self, owner: str, query: str, limit: int | None = 20) -> list:
+        """Get owner's todos containing every word of query; see TodoManager.search."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        match = " AND ".join(f'"{term}"' for term in terms)
+        sql = (f"SELECT todos.* FROM todos_fts JOIN todos ON todos.seq = todos_fts.rowid "
+               f"WHERE todos_fts MATCH ? AND todos.owner = ? ORDER BY {SEARCH_RANK_SQL}, todos.seq LIMIT ?")
+        rows = self.conn.execute(sql, (match, owner, -1 if limit is None else limit))
+        return [_row_to_todo(row) for row in rows]
+
+    def fuzzy_search(self, owner: str, query: str, limit: int = 10) -> list:
+        """Get owner's todos whose titles best match query; see TodoManager.fuzzy_search.
+
+        SQLite has no trigram index, so one is built from the owner's titles
+        for each call.
+        """
+        todos = {t.id: t for t in self.get_todos_by_owner(owner)}
+        index = TrigramIndex()
+        for todo_id, t in todos.items():
+            index.add(todo_id, t)
+        return [todos[todo_id] for _, todo_id in index.search(owner, query, limit)]
+
+    def resolve_id(self, owner: str, prefix: str) -> TodoItem | None:
+        """Get owner's todo whose id starts with prefix; see TodoManager.resolve_id.
+
+        A range scan on the id index, so it costs the same as a lookup by id.
+        """
+        sql, params = "SELECT * FROM todos WHERE owner = ?", [owner]
+        if prefix:
+            sql += " AND id >= ? AND id < ?"
+            params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+        rows = self.conn.execute(sql + " LIMIT 2", params).fetchall()
+        if len(rows) > 1:
+            count = self.conn.execute(sql.replace("*", "COUNT(*)", 1), params).fetchone()[0]
+            raise AmbiguousIdError(prefix, count)
+        return _row_to_todo(rows[0]) if rows else None
+
+    def short_id(self, todo: TodoItem) -> str:
+        """Shortest unique prefix of todo's id; see TodoManager.short_id.
+
+        The nearest ids either side come from the owner/id index.
+        """
+        row = self.conn.execute(
+            "SELECT (SELECT MAX(id) FROM todos WHERE owner = ? AND id < ?),"
+            " (SELECT MIN(id) FROM todos WHERE owner = ? AND id > ?)",
+            (todo.owner, todo.id, todo.owner, todo.id),
+        ).fetchone()
+        shared = max((common_prefix_length(todo.id, other) for other in row if other is not None), default=0)
+        return todo.id[:max(SHORT_ID_LENGTH, shared + 1)]
+
+    def _time_range(self, owner: str, field: str, since, until=None,
+                    descending: bool = False, limit: int | None = None) -> list:
+        where, params = ["owner = ?"], [owner]
+        if since is not None:
+            where.append(f"{TIME_SQL[field]} >= ?")
+            params.append(as_micros(since))
+        if until is not None:
+            where.append(f"{TIME_SQL[field]} < ?")
+            params.append(as_micros(until))
+        direction = "DESC" if descending else "ASC"
+        sql = (f"SELECT * FROM todos WHERE {' AND '.join(where)} "
+               f"ORDER BY {TIME_SQL[field]} {direction}, id {direction} LIMIT ?")
+        params.append(-1 if limit is None else limit)
+        return [_row_to_todo(row) for row in self.conn.execute(sql, params)]
+
+    def changed_since(self, owner: str, since, limit: int | None = None) -> list:
+        """See TodoManager.changed_since."""
+        return self._time_range(owner, "updated_at", since, limit=limit)
+
+    def created_between(self, owner: str, start=None, end=None) -> list:
+        """See TodoManager.created_between."""
+        return self._time_range(owner, "created_at", start, end)
+
+    def recently_updated(self, owner: str, limit: int = 10) -> list:
+        """See TodoManager.recently_updated."""
+        return self._time_range(owner, "updated_at", None, descending=True, limit=limit)
+
+    def next_todos(self, owner: str, limit: int = 5) -> list:
+        """See TodoManager.next_todos."""
+        sql = ("SELECT * FROM todos WHERE owner = ? AND status = ? "
+               "ORDER BY priority_rank, created_us, id LIMIT ?")
+        rows = self.conn.execute(sql, (owner, Status.PENDING.value, limit))
+        return [_row_to_todo(row) for row in rows]
+
+    def get_todo_by_id(self, todo_id: str) -> TodoItem | None:
+        """Get a specific todo by ID."""
+        row = self.conn.execute("SELECT * FROM todos WHERE id = ?", (todo_id,)).fetchone()
+        return _row_to_todo(row) if row else None
+
+    def _check_conflict(self, todo_id: str, expected_version: int | None) -> None:
+        if expected_version is None:
+            return
+        row = self.conn.execute("SELECT version FROM todos WHERE id = ?", (todo_id,)).fetchone()
+        if row is not None:
+            raise VersionConflictError(todo_id, expected_version, row["version"])
+
+    def update_todo(self, todo_id: str, expected_version: int | None = None, **kwargs) -> bool:
+        """Update a todo item. Accepted kwargs: title, details, priority, status.
+
+        With expected_version, raise VersionConflictError instead of writing
+        if the todo has been changed since that version was read.
+        """
+        with self._writing():
+            return self._update(todo_id, expected_version, kwargs)
+
+    def _update(self, todo_id: str, expected_version: int | None, kwargs: dict) -> bool:
+        changes = {}
+        if "title" in kwargs:
+            changes["title"] = kwargs["title"]
+        if "details" in kwargs:
+            changes["details"] = kwargs["details"]
+        if "priority" in kwargs:
+            priority_obj = enum_member_or(Priority, kwargs["priority"], Priority.MID)
+            changes["priority"] = priority_obj.value
+            changes["priority_rank"] = priority_obj.rank
+        if "status" in kwargs:
+            changes["status"] = enum_member_or(Status, kwargs["status"], Status.PENDING).value
+        changes["updated_at"] = now_iso()
+        changes["updated_us"] = us_from_iso(changes["updated_at"])
+        assignments = ", ".join(f"{col} = ?" for col in changes)
+        sql = f"UPDATE todos SET {assignments}, version = version + 1 WHERE id = ?"
+        params = [*changes.values(), todo_id]
+        if expected_version is not None:
+            sql += " AND version = ?"
+            params.append(expected_version)
+        cur = self.conn.execute(sql, params)
+        if cur.rowcount == 0:
+            self._check_conflict(todo_id, expected_version)
+        return cur.rowcount > 0
+
+    def update_many(self, updates) -> list:
+        """Apply update dicts in one transaction; see TodoManager.update_many."""
+        results = []
+        with self._writing():
+            for update in updates:
+                changes = dict(update)
+                todo_id = changes.pop("id", None)
+                expected_version = changes.pop("expected_version", None)
+                try:
+                    validate_changes(changes)
+                    if not self._update(todo_id, expected_version, changes):
+                        raise KeyError(todo_id)
+                except (ValueError, KeyError, VersionConflictError) as e:
+                    results.append(BatchResult(todo_id, error=e))
+                    continue
+                results.append(BatchResult(todo_id, self.get_todo_by_id(todo_id)))
+        return results
+
+    def delete_todo(self, todo_id: str, expected_version: int | None = None) -> bool:
+        """Delete a todo item by ID, optionally only if still at expected_version."""
+        with self._writing():
+            return self._delete(todo_id, expected_version)
+
+    def _delete(self, todo_id: str, expected_version: int | None) -> bool:
+        sql, params = "DELETE FROM todos WHERE id = ?", [todo_id]
+        if expected_version is not None:
+            sql += " AND version = ?"
+            params.append(expected_version)
+        cur = self.conn.execute(sql, params)
+        if cur.rowcount == 0:
+            self._check_conflict(todo_id, expected_version)
+        return cur.rowcount > 0
+
+    def delete_many(self, todo_ids, expected_versions: dict | None = None) -> list:
+        """Delete ids in one transaction; see TodoManager.delete_many."""
+        expected_versions = expected_versions or {}
+        results = []
+        with self._writing():
+            for todo_id in todo_ids:
+                try:
+                    if not self._delete(todo_id, expected_versions.get(todo_id)):
+                        raise KeyError(todo_id)
+                except (KeyError, VersionConflictError) as e:
+                    results.append(BatchResult(todo_id, error=e))
+                    continue
+                results.append(BatchResult(todo_id))
+        return results
+
+
+def load_users(db_path: Path) -> list:
+    conn = connect(db_path)
+    try:
+        return [dict(row) for row in conn.execute("SELECT username, password FROM users")]
+    finally:
+        conn.close()
+
+
+def save_users(db_path: Path, users: list) -> None:
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)",
+                [(u.get("username", ""), u.get("password", "")) for u in users],
+            )
+    finally:
+        conn.close()
+
+
+def _read_json_list(path: Path) -> list:
+    if not path.exists():
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return []
+
+
+def migrate_from_json(todos_path: Path, users_path: Path, db_path: Path) -> tuple[int, int]:
+    """Copy todos.json and users.json into the database.
+
+    Existing rows with the same id/username are replaced, so running the
+    migration twice is harmless. Returns ``(todo_count, user_count)``.
+    """
+    todos = _read_json_list(Path(todos_path))
+    users = _read_json_list(Path(users_path))
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                INSERT_TODO_SQL.replace("INSERT", "INSERT OR REPLACE", 1),
+                [_todo_row(TodoItem.from_dict(t)) for t in todos],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)",
+                [(u.get("username", ""), u.get("password", "")) for u in users],
+            )
+    finally:
+        conn.close()
+    return len(todos), len(users)
@@ -0,0 +1,81 @@
+"""Cold-start profiling: ``python src/main.py --startup-profile [command ...]``.
+
+The command is re-run in a fresh interpreter under ``python -X importtime``,
+so the numbers cover a real cold start rather than this already-warm
+process. Its output is passed through and a breakdown of where start-up
+time went is printed to stderr.
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent
+MAIN = SRC_DIR / "main.py"
+PROFILE_FLAG = "--startup-profile"
+TOP_MODULES = 15
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """Split ``-X importtime`` output into ``(rows, other_lines)``.
+
+    Each row is ``(module, self_us, cumulative_us, depth)``; depth 0 means
+    the module was imported directly by the program rather than by another
+    module.
+    """
+    rows, other = [], []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        rows.append((module, int(fields[0]), int(fields[1]), depth))
+    return rows, other
+
+
+def run_cold(argv: list, env: dict | None = None) -> tuple:
+    """Run main.py with ``argv`` in a new interpreter; returns ``(wall_seconds, completed_process)``.
+
+    With no arguments only ``import main`` is timed, since the menu would
+    wait for input.
+    """
+    if argv:
+        cmd = [sys.executable, "-X", "importtime", str(MAIN), *argv]
+    else:
+        cmd = [sys.executable, "-X", "importtime", "-c", "import main"]
+    env = dict(os.environ if env is None else env)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (str(SRC_DIR), env.get("PYTHONPATH")) if p)
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    return time.perf_counter() - start, proc
+
+
+def format_report(wall: float, rows: list, top: int = TOP_MODULES) -> str:
+    roots = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)
+    total_us = sum(r[2] for r in roots)
+    lines = [
+        f"Startup profile: {wall * 1000:.1f} ms wall, {total_us / 1000:.1f} ms importing {len(rows)} modules",
+        f"{'cumulative':>12} {'self':>9}  module (imported directly, slowest first)",
+    ]
+    for module, self_us, cumulative_us, _depth in roots[:top]:
+        lines.append(f"{cumulative_us / 1000:>9.1f} ms {self_us / 1000:>6.1f} ms  {module}")
+    if len(roots) > top:
+        rest = sum(r[2] for r in roots[top:])
+        lines.append(f"{rest / 1000:>9.1f} ms {'':>9}  ({len(roots) - top} more)")
+    return "\n".join(lines)
+
+
+def profile_startup(argv: list) -> int:
+    wall, proc = run_cold(argv)
+    rows, other = parse_importtime(proc.stderr)
+    sys.stdout.write(proc.stdout)
+    for line in other:
+        print(line, file=sys.stderr)
+    print(format_report(wall, rows), file=sys.stderr)
+    return proc.returncode
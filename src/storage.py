@@ -0,0 +1,560 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from filelock import FileLock, file_signature
+from streaming import is_jsonl, iter_raw_records, iter_records
+
+STORAGE_ENV = "TODO_STORAGE"
+JOURNAL_MAX_BYTES_ENV = "TODO_JOURNAL_MAX_BYTES"
+DEFAULT_JOURNAL_MAX_BYTES = 1024 * 1024
+BINARY_SUFFIX = ".bin"
+
+
+class JsonStore:
+    """Keeps every todo in a single JSON array that is rewritten on each save.
+
+    A ``.jsonl`` path switches to one record per line. With ``owner`` set,
+    only that owner's records are loaded, and saving merges them back into
+    the file in place of the owner's previous records; other owners'
+    records are copied over as stored, without being re-encoded.
+
+    An owner-scoped ``load()`` and ``stream()`` always read record by
+    record, so memory grows with the owner's records rather than the file.
+    An unscoped ``load()`` keeps everything anyway, so for files smaller
+    than ``STREAM_MIN_BYTES`` it parses the text in one go with the C json
+    decoder, trading a transient copy of the file for a faster load.
+    """
+
+    STREAM_MIN_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, path: Path, owner: str | None = None):
+        self.path = Path(path)
+        self.owner = owner
+        self.file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+
+    def lock(self, shared: bool = False):
+        """Advisory lock shared by every process using this data file."""
+        return self.file_lock.hold(shared=shared)
+
+    def signature(self):
+        """Changes whenever the data on disk changes."""
+        return file_signature(self.path)
+
+    def load(self) -> list:
+        if not self.path.exists():
+            return []
+        try:
+            with self.lock(shared=True):
+                if self.owner is None:
+                    return list(self.read_file())
+                return [t for t in self.iter_file() if t.get("owner", "") == self.owner]
+        except ValueError:
+            return []
+
+    def iter_file(self) -> Iterator[dict]:
+        """Yield the file's records one at a time."""
+        return iter_records(self.path)
+
+    def read_file(self) -> Iterable[dict]:
+        """Every record in the file, in one json.loads call unless the file is large."""
+        if is_jsonl(self.path) or self.path.stat().st_size >= self.STREAM_MIN_BYTES:
+            return self.iter_file()
+        with open(self.path, "r", encoding="utf-8") as f:
+            text = f.read()
+        if not text.strip():
+            return []
+        todos = json.loads(text)
+        if not isinstance(todos, list):
+            raise ValueError(f"{self.path} does not hold a JSON array")
+        return todos
+
+    def iter_file_stored(self) -> Iterator[tuple]:
+        """Yield ``(record, stored)``, where ``write_file`` writes ``stored`` back unchanged."""
+        for record, text in iter_raw_records(self.path):
+            yield record, EncodedRecord(text)
+
+    def stream(self, owner: str | None = None) -> Iterator[dict]:
+        """Yield records one at a time (optionally one owner's) under a shared lock."""
+        owner = self.owner if owner is None else owner
+        if not self.path.exists():
+            return
+        with self.lock(shared=True):
+            for t in self.iter_file():
+                if owner is None or t.get("owner", "") == owner:
+                    yield t
+
+    def write_file(self, path: Path, todos: Iterable[dict]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            write_records(f, todos, jsonl=is_jsonl(self.path))
+            fsync(f)
+
+    def save(self, todos: Iterable[dict]) -> None:
+        """Atomically replace the file: write a temp file, fsync, rename."""
+        with self.lock():
+            if self.owner is not None and self.path.exists():
+                todos = self._merge_into_file(todos)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            self.write_file(tmp, todos)
+            os.replace(tmp, self.path)
+
+    def _merge_into_file(self, todos: Iterable[dict]) -> Iterator[dict]:
+        ours = {t.get("id"): t for t in todos}
+        try:
+            for record, stored in self.iter_file_stored():
+                todo_id = record.get("id")
+                if todo_id in ours:
+                    yield ours.pop(todo_id)
+                elif record.get("owner", "") != self.owner:
+                    yield stored
+        except ValueError:
+            pass
+        yield from ours.values()
+
+    def record_create(self, todos: Iterable[dict], todo: dict) -> None:
+        self.save(todos)
+
+    def record_update(self, todos: Iterable[dict], todo: dict, changes: dict) -> None:
+        self.save(todos)
+
+    def record_delete(self, todos: Iterable[dict], todo: dict) -> None:
+        self.save(todos)
+
+
+class BinaryStore(JsonStore):
+    """JsonStore with the same behaviour, in the compact format from binfmt.
+
+    When the binary file does not exist yet but ``legacy_path`` (a JSON
+    todos file) does, it is converted on first load.
+    """
+
+    def __init__(self, path: Path, owner: str | None = None, legacy_path: Path | None = None):
+        super().__init__(path, owner=owner)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+
+    def load(self) -> list:
+        if not self.path.exists() and self.legacy_path is not None:
+            with self.lock():
+                # Re-checked under the lock: another process may have converted it.
+                if not self.path.exists() and self.legacy_path.exists():
+                    copy_records(JsonStore(self.legacy_path), self)
+        return super().load()
+
+    def iter_file(self) -> Iterator[dict]:
+        with open(self.path, "rb") as f:
+            import binfmt
+
+            yield from binfmt.iter_records(f)
+
+    def read_file(self) -> Iterable[dict]:
+        return self.iter_file()
+
+    def iter_file_stored(self) -> Iterator[tuple]:
+        for record in self.iter_file():
+            yield record, record
+
+    def write_file(self, path: Path, todos: Iterable[dict]) -> None:
+        with open(path, "wb") as f:
+            import binfmt
+
+            binfmt.write_records(f, todos)
+            fsync(f)
+
+
+class JournalStore(JsonStore):
+    """Snapshot file plus an append-only journal of create/patch/delete records.
+
+    Each mutation appends one JSON line to the journal instead of rewriting the
+    snapshot. Once the journal grows past ``max_journal_bytes`` it is folded
+    back into the snapshot. Replaying a record twice gives the same result, so
+    a crash between writing the snapshot and truncating the journal is safe;
+    a line torn by a crash mid-append is ignored on load and cut off before
+    the next append.
+    """
+
+    def __init__(self, path: Path, journal_path: Path | None = None,
+                 max_journal_bytes: int = DEFAULT_JOURNAL_MAX_BYTES):
+        super().__init__(path)
+        self.journal_path = Path(journal_path) if journal_path else self.path.with_suffix(".journal")
+        self.max_journal_bytes = max_journal_bytes
+
+    def signature(self):
+        return (file_signature(self.path), file_signature(self.journal_path))
+
+    def load(self) -> list:
+        with self.lock(shared=True):
+            by_id = {t.get("id"): t for t in super().load()}
+            for entry in self._read_journal():
+                apply_journal_entry(by_id, entry)
+        return list(by_id.values())
+
+    def stream(self, owner: str | None = None) -> Iterator[dict]:
+        if not self.journal_size():
+            yield from super().stream(owner)
+            return
+        # Journal entries can touch any record, so replay needs everything.
+        for t in self.load():
+            if owner is None or t.get("owner", "") == owner:
+                yield t
+
+    def _read_journal(self):
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # A torn final line from an interrupted append.
+                    return
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _drop_torn_tail(self) -> None:
+        """Cut the journal back to its last complete line before appending.
+
+        Otherwise the next record would be glued onto the torn fragment and
+        the reader would skip both.
+        """
+        try:
+            f = open(self.journal_path, "rb+")
+        except FileNotFoundError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 4096)
+                f.seek(start)
+                chunk = f.read(pos - start)
+                newline = chunk.rfind(b"\n")
+                if newline != -1:
+                    pos = start + newline + 1
+                    break
+                pos = start
+            if pos != end:
+                f.truncate(pos)
+
+    def journal_size(self) -> int:
+        try:
+            return self.journal_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _append(self, todos: Iterable[dict], entry: dict) -> None:
+        with self.lock():
+            self._drop_torn_tail()
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            if self.journal_size() > self.max_journal_bytes:
+                self.compact(todos)
+
+    def save(self, todos: Iterable[dict]) -> None:
+        self.compact(todos)
+
+    def compact(self, todos: Iterable[dict]) -> None:
+        """Fold the journal into a fresh snapshot and truncate it."""
+        with self.lock():
+            super().save(todos)
+            if self.journal_path.exists():
+                open(self.journal_path, "w").close()
+
+    def record_create(self, todos: Iterable[dict], todo: dict) -> None:
+        self._append(todos, {"op": "create", "todo": todo})
+
+    def record_update(self, todos: Iterable[dict], todo: dict, changes: dict) -> None:
+        self._append(todos, {"op": "patch", "id": todo.get("id"), "fields": changes})
+
+    def record_delete(self, todos: Iterable[dict], todo: dict) -> None:
+        self._append(todos, {"op": "delete", "id": todo.get("id")})
+
+
+class ShardedStore:
+    """One JSON file per owner plus a manifest, under ``root``.
+
+    A store opened with ``owner`` only ever reads and writes that owner's
+    shard, so logging in costs time proportional to the user's own data.
+    Opened without an owner it sees every shard (used by admin tools).
+    Shards live in a ``shards/`` subdirectory so no owner name can collide
+    with the manifest.
+    If the manifest is missing and ``legacy_path`` holds a single-file
+    ``todos.json``, it is split into shards on first use; the legacy file
+    itself is left untouched.
+    """
+
+    MANIFEST = "manifest.json"
+    SHARD_DIR = "shards"
+    FORMAT = "sharded-v1"
+
+    def __init__(self, root: Path, owner: str | None = None, legacy_path: Path | None = None):
+        self.root = Path(root)
+        self.owner = owner
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.file_lock = FileLock(self.root.with_name(self.root.name + ".lock"))
+        with self.lock():
+            self.manifest = self._load_manifest()
+
+    def lock(self, shared: bool = False):
+        """One advisory lock for the whole shard directory."""
+        return self.file_lock.hold(shared=shared)
+
+    def signature(self):
+        owners = [self.owner] if self.owner is not None else self.owners()
+        return (file_signature(self.manifest_path),
+                tuple(file_signature(self.shard_path(o)) for o in owners))
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / self.MANIFEST
+
+    def _load_manifest(self) -> dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        manifest = {"format": self.FORMAT, "shards": {}}
+        if self.legacy_path is not None and self.legacy_path.exists():
+            self.manifest = manifest
+            self._write_all(JsonStore(self.legacy_path).load())
+            manifest["migrated_from"] = self.legacy_path.name
+            self._save_manifest()
+        return manifest
+
+    def _save_manifest(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.manifest_path, self.manifest)
+
+    def shard_path(self, owner: str) -> Path:
+        name = self.manifest["shards"].get(owner)
+        if name is None:
+            name = shard_file_name(owner)
+        return self.root / name
+
+    def owners(self) -> list:
+        return list(self.manifest["shards"])
+
+    def load_shard(self, owner: str) -> list:
+        if owner not in self.manifest["shards"]:
+            return []
+        return JsonStore(self.shard_path(owner)).load()
+
+    def write_shard(self, owner: str, todos: list, save_manifest: bool = True) -> None:
+        shards = self.manifest["shards"]
+        if not todos:
+            if owner in shards:
+                self.shard_path(owner).unlink(missing_ok=True)
+                del shards[owner]
+                if save_manifest:
+                    self._save_manifest()
+            return
+        path = self.shard_path(owner)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(path, todos, indent=2)
+        if owner not in shards:
+            shards[owner] = shard_file_name(owner)
+            if save_manifest:
+                self._save_manifest()
+
+    def load(self) -> list:
+        with self.lock(shared=True):
+            self.manifest = self._load_manifest()
+            if self.owner is not None:
+                return self.load_shard(self.owner)
+            todos = []
+            for owner in self.owners():
+                todos.extend(self.load_shard(owner))
+            return todos
+
+    def stream(self, owner: str | None = None) -> Iterator[dict]:
+        owner = self.owner if owner is None else owner
+        with self.lock(shared=True):
+            self.manifest = self._load_manifest()
+            for shard_owner in self.owners():
+                if owner is None or shard_owner == owner:
+                    yield from JsonStore(self.shard_path(shard_owner)).stream()
+
+    def save(self, todos: Iterable[dict]) -> None:
+        with self.lock():
+            self._write_all(todos)
+
+    def _write_all(self, todos: Iterable[dict]) -> None:
+        groups = group_by_owner(todos)
+        if self.owner is not None:
+            groups.setdefault(self.owner, [])
+            stale = []
+        else:
+            stale = [o for o in self.owners() if o not in groups]
+        for owner, owner_todos in groups.items():
+            self.write_shard(owner, owner_todos, save_manifest=False)
+        for owner in stale:
+            self.write_shard(owner, [], save_manifest=False)
+        self._save_manifest()
+
+    def _rewrite_owner(self, todos: Iterable[dict], owner: str) -> None:
+        with self.lock():
+            self.write_shard(owner, [t for t in todos if t.get("owner", "") == owner])
+
+    def record_create(self, todos: Iterable[dict], todo: dict) -> None:
+        self._rewrite_owner(todos, todo.get("owner", ""))
+
+    def record_update(self, todos: Iterable[dict], todo: dict, changes: dict) -> None:
+        self._rewrite_owner(todos, todo.get("owner", ""))
+
+    def record_delete(self, todos: Iterable[dict], todo: dict) -> None:
+        self._rewrite_owner(todos, todo.get("owner", ""))
+
+
+def shard_file_name(owner: str) -> str:
+    from urllib.parse import quote
+
+    return f"{ShardedStore.SHARD_DIR}/" + (quote(owner, safe="") or "_") + ".json"
+
+
+def group_by_owner(todos: Iterable[dict]) -> dict:
+    groups = {}
+    for t in todos:
+        groups.setdefault(t.get("owner", ""), []).append(t)
+    return groups
+
+
+def reshard(root: Path) -> dict:
+    """Rewrite every shard from its records and rebuild the manifest.
+
+    Records stored in the wrong owner's shard are moved, duplicate ids are
+    collapsed, and empty shards or files the manifest does not reference are
+    picked up and removed. Runs under the store's lock, so writers in other
+    processes wait for it. Returns a mapping of owner -> todo count.
+    """
+    root = Path(root)
+    store = ShardedStore(root)
+    with store.lock():
+        # Shards written before SHARD_DIR existed sit next to the manifest; they
+        # are read here and rewritten into SHARD_DIR.
+        files = [p for p in root.glob("*.json") if p.name != ShardedStore.MANIFEST]
+        files += root.glob(f"{ShardedStore.SHARD_DIR}/*.json")
+        by_id = {}
+        for path in files:
+            for t in JsonStore(path).load():
+                by_id[t.get("id")] = t
+        groups = group_by_owner(by_id.values())
+        store.manifest = {"format": ShardedStore.FORMAT, "shards": {}}
+        for owner, owner_todos in groups.items():
+            store.write_shard(owner, owner_todos, save_manifest=False)
+        store._save_manifest()
+        keep = {store.shard_path(owner) for owner in groups}
+        for path in files:
+            if path not in keep:
+                path.unlink()
+    return {owner: len(owner_todos) for owner, owner_todos in groups.items()}
+
+
+def convert_file(src: Path, dst: Path) -> int:
+    """Convert a todos file between JSON/JSONL and binary, judged by content and suffix.
+
+    The source format is detected from its header; the destination is binary
+    when it ends in ``.bin`` and JSON (or JSONL) otherwise. Returns the number
+    of records written.
+    """
+    import binfmt
+
+    src, dst = Path(src), Path(dst)
+    reader = BinaryStore(src) if binfmt.is_binary_file(src) else JsonStore(src)
+    writer = BinaryStore(dst) if dst.suffix == BINARY_SUFFIX else JsonStore(dst)
+    return copy_records(reader, writer)
+
+
+def copy_records(reader: JsonStore, writer: JsonStore) -> int:
+    """Replace ``writer``'s file with every record of ``reader``'s; returns the count.
+
+    Holds both stores' locks, so no process writes either file meanwhile.
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for t in reader.iter_file():
+            count += 1
+            yield t
+
+    with reader.lock(shared=True), writer.lock():
+        writer.save(counted())
+    return count
+
+
+class EncodedRecord(str):
+    """A record that is already JSON text, written out by ``write_records`` as is."""
+
+
+_encode_line = json.JSONEncoder(separators=(",", ":")).encode
+# indent= switches json to its pure-Python encoder, so records are encoded
+# by the C one with the indentation folded into the item separator instead.
+_encode_fields = json.JSONEncoder(separators=(",\n    ", ": ")).encode
+
+
+def encode_indented(todo: dict) -> str:
+    """``json.dumps(todo, indent=2)`` as it appears one level into an array.
+
+    The output is identical for flat records; nested values are still valid
+    JSON, just not pretty-printed.
+    """
+    text = _encode_fields(todo)
+    return "{\n    " + text[1:-1] + "\n  }" if todo else text
+
+
+def write_records(f, todos: Iterable[dict], jsonl: bool = False) -> None:
+    """Stream records to ``f`` as an indented JSON array, or as JSON Lines."""
+    if jsonl:
+        for t in todos:
+            f.write((t if isinstance(t, EncodedRecord) else _encode_line(t)) + "\n")
+        return
+    first = True
+    for t in todos:
+        f.write(("[\n  " if first else ",\n  ") + (t if isinstance(t, EncodedRecord) else encode_indented(t)))
+        first = False
+    f.write("[]" if first else "\n]")
+
+
+def atomic_write_json(path: Path, data, indent: int | None = None) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent)
+        fsync(f)
+    os.replace(tmp, path)
+
+
+def fsync(f) -> None:
+    """Push ``f`` to disk so a following rename cannot expose a partial file."""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def apply_journal_entry(by_id: dict, entry: dict) -> None:
+    op = entry.get("op")
+    if op == "create":
+        todo = entry["todo"]
+        by_id[todo.get("id")] = todo
+    elif op == "patch":
+        todo = by_id.get(entry.get("id"))
+        if todo is not None:
+            todo.update(entry.get("fields", {}))
+    elif op == "delete":
+        by_id.pop(entry.get("id"), None)
+
+
+def open_store(path: Path, owner: str | None = None):
+    """Pick a store for ``path`` based on the TODO_STORAGE environment variable.
+
+    ``owner`` limits the JSON and sharded stores to that user's records; the
+    journal store always loads everything.
+    """
+    kind = os.environ.get(STORAGE_ENV, "json").lower()
+    if kind == "binary":
+        return BinaryStore(path.with_suffix(BINARY_SUFFIX), owner=owner, legacy_path=path)
+    if kind == "sharded":
+        return ShardedStore(path.with_suffix(""), owner=owner, legacy_path=path)
+    if kind == "journal":
+        max_bytes = int(os.environ.get(JOURNAL_MAX_BYTES_ENV, DEFAULT_JOURNAL_MAX_BYTES))
+        return JournalStore(path, max_journal_bytes=max_bytes)
+    if kind == "json":
+        return JsonStore(path, owner=owner)
+    raise ValueError(f"Unknown {STORAGE_ENV} value: {kind!r}")
@@ -0,0 +1,213 @@
+"""Incremental readers for todos.json (JSON array) and todos.jsonl files.
+
+Records are decoded one at a time, so memory stays bounded by the largest
+record rather than the whole file, and callers can filter while reading.
+Each reader also reports the byte offset and length of every record, which
+is what the on-disk offset index is built from.
+"""
+import codecs
+import json
+import os
+import re
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+_OPEN = re.compile(r"[ \t\r\n]*\[[ \t\r\n]*(\]?)").match
+_NEXT = re.compile(r"[ \t\r\n]*([,\]])[ \t\r\n]*").match
+
+
+def iter_json_array(f, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """Yield ``(record, offset, length)`` for each element of a JSON array.
+
+    ``f`` must be opened in binary mode; offsets are byte positions.
+    """
+    for record, offset, length, _text in _scan_json_array(f, chunk_size):
+        yield record, offset, length
+
+
+def _scan_json_array(f, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """``iter_json_array`` plus each record's source text as a fourth item."""
+    decode = json.JSONDecoder().raw_decode
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0  # read position in buf
+    offset = 0  # byte offset of buf[pos] in the file
+    ascii_only = True
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, ascii_only, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+        ascii_only = buf.isascii()
+        return not eof
+
+    def width(end: int) -> int:
+        return end - pos if ascii_only else len(buf[pos:end].encode("utf-8"))
+
+    # Opening bracket, then either "]" or the first record.
+    while (m := _OPEN(buf, pos)) is None or m.end() == len(buf):
+        if not fill():
+            break
+    if m is None:
+        if buf[pos:].strip(_WHITESPACE):
+            raise json.JSONDecodeError("Expected '['", buf, pos)
+        return
+    if m.group(1) == "]":
+        return
+    offset += width(m.end())
+    pos = m.end()
+    while True:
+        while True:
+            try:
+                record, end = decode(buf, pos)
+            except json.JSONDecodeError:
+                if fill():
+                    continue
+                raise
+            # A value that runs to the end of the buffer may be a truncated
+            # number or literal; read on until something follows it.
+            if end == len(buf) and fill():
+                continue
+            break
+        length = width(end)
+        yield record, offset, length, buf[pos:end]
+        offset += length
+        pos = end
+        # A comma and the next record, or the closing bracket.
+        while (m := _NEXT(buf, pos)) is None or (m.group(1) == "," and m.end() == len(buf)):
+            if not fill():
+                break
+        if m is None:
+            if buf[pos:].strip(_WHITESPACE):
+                raise json.JSONDecodeError("Expected ',' or ']'", buf, pos)
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        if m.group(1) == "]":
+            return
+        if m.end() == len(buf):
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        offset += width(m.end())
+        pos = m.end()
+
+
+def iter_jsonl(f) -> Iterator[tuple]:
+    """Yield ``(record, offset, length)`` for each line of a JSON Lines file."""
+    offset = f.tell()
+    for line in f:
+        if line.strip():
+            yield json.loads(line), offset, len(line.rstrip(b"\r\n"))
+        offset += len(line)
+
+
+def is_jsonl(path: Path) -> bool:
+    return Path(path).suffix == ".jsonl"
+
+
+def iter_records_with_offsets(path: Path) -> Iterator[tuple]:
+    with open(path, "rb") as f:
+        if is_jsonl(path):
+            yield from iter_jsonl(f)
+        else:
+            yield from iter_json_array(f)
+
+
+def iter_raw_records(path: Path) -> Iterator[tuple]:
+    """Yield ``(record, text)`` pairs, ``text`` being the record's JSON as stored.
+
+    Lets a writer copy records it does not change without re-encoding them.
+    """
+    if is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line), line.rstrip("\r\n")
+        return
+    with open(path, "rb") as f:
+        for record, _offset, _length, text in _scan_json_array(f):
+            yield record, text
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """Yield every record of a .json array or .jsonl file."""
+    for record, _offset, _length in iter_records_with_offsets(path):
+        yield record
+
+
+def iter_todos(path: Path, owner: str | None = None, status: str | None = None,
+               where: Callable[[dict], bool] | None = None) -> Iterator[dict]:
+    """Yield records matching ``owner``/``status``/``where`` without keeping the rest."""
+    for record in iter_records(path):
+        if owner is not None and record.get("owner", "") != owner:
+            continue
+        if status is not None and record.get("status", "PENDING") != status:
+            continue
+        if where is not None and not where(record):
+            continue
+        yield record
+
+
+class OffsetIndex:
+    """id -> (offset, length) for one data file, persisted next to it as ``<file>.idx``.
+
+    The index remembers the size and mtime of the file it was built from and
+    is rebuilt automatically when they no longer match.
+    """
+
+    def __init__(self, path: Path, offsets: dict):
+        self.path = Path(path)
+        self.offsets = offsets
+
+    @staticmethod
+    def index_path(path: Path) -> Path:
+        path = Path(path)
+        return path.with_name(path.name + ".idx")
+
+    @staticmethod
+    def _signature(path: Path) -> list:
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+
+    @classmethod
+    def build(cls, path: Path) -> "OffsetIndex":
+        offsets = {
+            record.get("id"): [offset, length]
+            for record, offset, length in iter_records_with_offsets(path)
+        }
+        index = cls(path, offsets)
+        with open(cls.index_path(path), "w", encoding="utf-8") as f:
+            json.dump({"source": cls._signature(path), "offsets": offsets}, f, separators=(",", ":"))
+        return index
+
+    @classmethod
+    def open(cls, path: Path) -> "OffsetIndex":
+        """Load the saved index for ``path``, rebuilding it if it is stale."""
+        try:
+            with open(cls.index_path(path), "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("source") == cls._signature(path):
+                return cls(path, saved["offsets"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        return cls.build(path)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, todo_id: str) -> bool:
+        return todo_id in self.offsets
+
+    def get(self, todo_id: str) -> dict | None:
+        """Read one record straight from its offset in the data file."""
+        entry = self.offsets.get(todo_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
@@ -0,0 +1,119 @@
+"""Streaming JSON Lines export and import of todos.
+
+Export writes one record per line as it reads them, and import parses the
+input in byte ranges split on line boundaries, optionally across a process
+pool, so neither side holds more than a few chunks of input at once.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from clock import us_from_iso
+
+CHUNK_BYTES = 4 * 1024 * 1024
+DATE_FIELDS = ("created_at", "updated_at")
+
+
+@dataclass(frozen=True)
+class RecordFilter:
+    """Which records to move. ``since``/``until`` are epoch microseconds on ``date_field``."""
+
+    owner: str | None = None
+    status: str | None = None
+    priority: str | None = None
+    since: int | None = None
+    until: int | None = None
+    date_field: str = "created_at"
+
+    def matches(self, record: dict) -> bool:
+        if self.owner is not None and record.get("owner", "") != self.owner:
+            return False
+        if self.status is not None and record.get("status", "PENDING") != self.status:
+            return False
+        if self.priority is not None and record.get("priority", "MID") != self.priority:
+            return False
+        if self.since is not None or self.until is not None:
+            stamp = us_from_iso(record.get(self.date_field, ""))
+            if stamp is None:
+                return False
+            if self.since is not None and stamp < self.since:
+                return False
+            if self.until is not None and stamp >= self.until:
+                return False
+        return True
+
+
+def export_jsonl(records: Iterable[dict], out: TextIO, record_filter: RecordFilter = RecordFilter()) -> int:
+    """Write matching records to ``out`` as JSON Lines; returns how many were written."""
+    count = 0
+    for record in records:
+        if record_filter.matches(record):
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def chunk_ranges(path: Path, chunk_bytes: int = CHUNK_BYTES) -> list:
+    """``(start, end)`` byte ranges covering ``path``, each ending after a newline."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(path: Path, start: int, end: int, record_filter: RecordFilter) -> tuple:
+    """Parse the lines in ``[start, end)``; returns ``(records, errors)``.
+
+    Errors are ``"byte <offset>: <message>"`` strings for lines that are not
+    JSON objects.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    records, errors = [], []
+    offset = start
+    for line in data.splitlines(keepends=True):
+        if line.strip():
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("not a JSON object")
+            except ValueError as e:
+                errors.append(f"byte {offset}: {e}")
+            else:
+                if record_filter.matches(record):
+                    records.append(record)
+        offset += len(line)
+    return records, errors
+
+
+def iter_jsonl_chunks(path: Path, record_filter: RecordFilter = RecordFilter(),
+                      workers: int = 1, chunk_bytes: int = CHUNK_BYTES) -> Iterator[tuple]:
+    """Yield ``(records, errors)`` per chunk of a JSON Lines file, in file order.
+
+    With more than one worker, chunks are parsed in a process pool with at
+    most two chunks per worker in flight.
+    """
+    ranges = chunk_ranges(path, chunk_bytes)
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield parse_chunk(path, start, end, record_filter)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for start, end in ranges:
+            pending.append(pool.submit(parse_chunk, path, start, end, record_filter))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
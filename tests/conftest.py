@@ -0,0 +1,82 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# main.py imports its siblings as top-level modules (``from models import ...``),
+# so make src/ importable the same way it is when running ``python src/main.py``.
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import clock  # noqa: E402
+from main import TodoManager  # noqa: E402
+from sqlite_backend import SqliteTodoManager  # noqa: E402
+from storage import JsonStore  # noqa: E402
+
+T0 = 1_704_067_200_000_000  # 2024-01-01T00:00:00+00:00
+SECOND = 1_000_000
+
+
+class StepClock:
+    """Stand-in for clock.now_us: advances ``step`` microseconds on every reading."""
+
+    def __init__(self, now: int = T0, step: int = SECOND):
+        self.now = now
+        self.step = step
+
+    def __call__(self) -> int:
+        self.now += self.step
+        return self.now
+
+
+class CountingStore(JsonStore):
+    """A JsonStore that counts its whole-file writes."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.writes = 0
+
+    def save(self, todos):
+        super().save(todos)
+        self.writes += 1
+
+
+def titles(todos) -> list:
+    return [t.title for t in todos]
+
+
+def lock_is_held(lock_path: Path) -> bool:
+    """Whether anyone holds the advisory lock on ``lock_path`` (FileLock uses flock)."""
+    fcntl = pytest.importorskip("fcntl")
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return True
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    finally:
+        os.close(fd)
+
+
+@pytest.fixture
+def step_clock():
+    """Installs a StepClock, so each timestamp is one second after the last."""
+    fake = StepClock()
+    previous = clock.set_clock(fake)
+    yield fake
+    clock.set_clock(previous)
+
+
+@pytest.fixture(params=["objects", "columnar", "sqlite"])
+def manager(request, tmp_path):
+    """An empty manager for each backend: both in-memory layouts and SQLite."""
+    if request.param == "sqlite":
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+    else:
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"), layout=request.param)
+    yield manager
+    manager.close()
@@ -0,0 +1,173 @@
+"""
+Tests for the compact binary todo format and the JSON <-> binary converter.
+"""
+
+import io
+import json
+import struct
+import uuid
+
+import pytest
+
+import binfmt
+import clock
+from main import TodoManager
+from models import TodoItem
+from storage import BinaryStore, JsonStore, convert_file
+from tests.conftest import lock_is_held
+
+
+AWARE = TodoItem(title="Aware", owner="alice").to_dict()
+
+
+def legacy_body(record, file_version):
+    """A format 1 or 2 body for a MID, PENDING record with a UUID id and aware timestamps."""
+    body = struct.pack("<BBB", binfmt.FLAG_UUID_ID, 1, 0)
+    if file_version == 2:
+        body += struct.pack("<I", record["version"])
+    body += uuid.UUID(record["id"]).bytes
+    body += struct.pack("<qq", clock.us_from_iso(record["created_at"]), clock.us_from_iso(record["updated_at"]))
+    for value in (record["title"], record["details"], record["owner"], ""):
+        body += struct.pack("<I", len(value.encode("utf-8"))) + value.encode("utf-8")
+    return body
+
+
+def sample_records():
+    return [
+        dict(AWARE),
+        {
+            "id": "not-a-uuid",
+            "title": "Naive ไทย",
+            "details": "multi\nline",
+            "priority": "HIGH",
+            "status": "COMPLETED",
+            "owner": "bob",
+            "created_at": "2024-01-01T10:00:00",
+            "updated_at": "2024-01-02T10:00:00.123456",
+            "version": 2,
+        },
+        {
+            "id": "6f1c2d3e-0000-4000-8000-000000000001",
+            "title": "Odd timestamps",
+            "details": "",
+            "priority": "LOW",
+            "status": "PENDING",
+            "owner": "",
+            "created_at": "2024-01-01T17:00:00+07:00",
+            "updated_at": "yesterday",
+            "version": 3,
+            "tags": ["extra"],
+        },
+    ]
+
+
+class TestRecordEncoding:
+    """Test cases for single-record encoding."""
+
+    def test_round_trip_preserves_every_field(self):
+        for record in sample_records():
+            encoded = binfmt.encode_record(record)
+            assert binfmt.decode_record(encoded[4:]) == record
+
+    def test_uuid_id_and_timestamps_are_packed(self):
+        record = TodoItem(title="", owner="").to_dict()
+        # Length, 7 fixed bytes, two int64 timestamps, 16-byte id, seven string lengths.
+        assert len(binfmt.encode_record(record)) == 4 + 7 + 8 + 8 + 16 + 7 * 4
+
+    def test_uppercase_uuid_is_kept_as_string(self):
+        record = dict(sample_records()[0], id=sample_records()[0]["id"].upper())
+        assert binfmt.decode_record(binfmt.encode_record(record)[4:])["id"] == record["id"]
+
+
+class TestBinaryFile:
+    """Test cases for whole-file reading and writing."""
+
+    def test_write_then_read(self):
+        buf = io.BytesIO()
+        binfmt.write_records(buf, sample_records())
+        assert buf.getvalue().startswith(b"TODB\x03")
+        buf.seek(0)
+        assert list(binfmt.iter_records(buf)) == sample_records()
+
+    def test_rejects_foreign_or_truncated_data(self):
+        with pytest.raises(binfmt.BinaryFormatError):
+            list(binfmt.iter_records(io.BytesIO(b"[{}]  ")))
+        buf = io.BytesIO()
+        binfmt.write_records(buf, sample_records())
+        with pytest.raises(binfmt.BinaryFormatError):
+            list(binfmt.iter_records(io.BytesIO(buf.getvalue()[:-3])))
+
+    @pytest.mark.parametrize("file_version", [1, 2])
+    def test_reads_older_versions(self, file_version):
+        record = dict(AWARE)
+        body = legacy_body(record, file_version)
+        data = b"TODB" + bytes([file_version]) + len(body).to_bytes(4, "little") + body
+        if file_version == 1:
+            del record["version"]
+        assert list(binfmt.iter_records(io.BytesIO(data))) == [record]
+
+    def test_unsupported_version(self):
+        with pytest.raises(binfmt.BinaryFormatError):
+            list(binfmt.iter_records(io.BytesIO(b"TODB\x09")))
+
+
+class TestBinaryStore:
+    """Test cases for using the binary format behind TodoManager."""
+
+    def test_manager_round_trip(self, tmp_path):
+        manager = TodoManager(store=BinaryStore(tmp_path / "todos.bin"))
+        todo = manager.create_todo("Packed", "details", "HIGH", "alice")
+        manager.update_todo(todo.id, status="COMPLETED")
+
+        reloaded = TodoManager(store=BinaryStore(tmp_path / "todos.bin"))
+        assert reloaded.get_todo_by_id(todo.id) == manager.get_todo_by_id(todo.id)
+
+    def test_owner_scoped_store_merges(self, tmp_path):
+        path = tmp_path / "todos.bin"
+        BinaryStore(path).save(sample_records())
+        manager = TodoManager(store=BinaryStore(path, owner="bob"))
+        manager.update_todo("not-a-uuid", title="Renamed")
+
+        titles = [t["title"] for t in BinaryStore(path).load()]
+        assert titles == ["Aware", "Renamed", "Odd timestamps"]
+
+    def test_legacy_json_is_converted_on_first_load(self, tmp_path):
+        legacy = tmp_path / "todos.json"
+        legacy.write_text(json.dumps(sample_records()), encoding="utf-8")
+
+        store = BinaryStore(tmp_path / "todos.bin", legacy_path=legacy)
+        assert store.load() == sample_records()
+        assert binfmt.is_binary_file(tmp_path / "todos.bin")
+
+    def test_legacy_conversion_holds_both_locks(self, tmp_path, monkeypatch):
+        legacy = tmp_path / "todos.json"
+        legacy.write_text(json.dumps(sample_records()), encoding="utf-8")
+        held = []
+        iter_file = JsonStore.iter_file
+
+        def checked_iter_file(self):
+            held.append((lock_is_held(tmp_path / "todos.json.lock"), lock_is_held(tmp_path / "todos.bin.lock")))
+            return iter_file(self)
+
+        monkeypatch.setattr(JsonStore, "iter_file", checked_iter_file)
+        assert BinaryStore(tmp_path / "todos.bin", legacy_path=legacy).load() == sample_records()
+        assert held == [(True, True)]
+
+
+class TestConvertFile:
+    """Test cases for the JSON <-> binary converter."""
+
+    def test_json_to_binary_and_back(self, tmp_path):
+        src = tmp_path / "todos.json"
+        src.write_text(json.dumps(sample_records()), encoding="utf-8")
+
+        assert convert_file(src, tmp_path / "todos.bin") == 3
+        assert convert_file(tmp_path / "todos.bin", tmp_path / "back.json") == 3
+        assert json.loads((tmp_path / "back.json").read_text(encoding="utf-8")) == sample_records()
+
+    def test_binary_to_jsonl(self, tmp_path):
+        BinaryStore(tmp_path / "todos.bin").save(sample_records())
+        convert_file(tmp_path / "todos.bin", tmp_path / "todos.jsonl")
+
+        lines = (tmp_path / "todos.jsonl").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == sample_records()
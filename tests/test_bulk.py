@@ -0,0 +1,92 @@
+"""
+Tests for create_many, update_many and delete_many.
+"""
+
+from main import TodoManager
+from models import Priority, Status, VersionConflictError
+from storage import JsonStore, JournalStore
+
+from tests.conftest import CountingStore
+
+
+class TestBulkOperations:
+    """Test cases shared by every backend."""
+
+    def test_create_many_reports_each_item(self, manager):
+        results = manager.create_many([
+            {"title": "One", "owner": "alice", "priority": "high"},
+            {"title": "", "owner": "alice"},
+            {"title": "Two", "owner": "alice", "colour": "red"},
+            {"title": "Three", "owner": "alice", "priority": "urgent"},
+            {"title": "Four", "details": "d", "owner": "alice"},
+        ])
+        assert [r.ok for r in results] == [True, False, False, False, True]
+        assert all(isinstance(r.error, ValueError) for r in results if not r.ok)
+        assert results[0].todo.priority == Priority.HIGH
+        assert [t.title for t in manager.get_todos_by_owner("alice")] == ["One", "Four"]
+
+    def test_update_many_reports_each_item(self, manager):
+        a, b, c = (r.todo for r in manager.create_many(
+            [{"title": t, "owner": "alice"} for t in "abc"]))
+        results = manager.update_many([
+            {"id": a.id, "status": "completed"},
+            {"id": "missing", "title": "x"},
+            {"id": b.id, "expected_version": 7, "title": "stale"},
+            {"id": c.id, "priority": "bogus"},
+            {"id": c.id, "expected_version": 1, "title": "C"},
+        ])
+        assert [r.ok for r in results] == [True, False, False, False, True]
+        assert isinstance(results[1].error, KeyError)
+        assert isinstance(results[2].error, VersionConflictError)
+        assert isinstance(results[3].error, ValueError)
+        assert results[0].todo.status == Status.COMPLETED
+        assert manager.get_todo_by_id(c.id).title == "C"
+        assert manager.get_todo_by_id(b.id).version == 1
+
+    def test_update_many_accepts_enum_members(self, manager):
+        todo = manager.create_todo("Old", "", "LOW", "alice")
+        [result] = manager.update_many([
+            {"id": todo.id, "title": "New", "priority": Priority.HIGH, "status": Status.COMPLETED},
+        ])
+        assert result.ok, result.error
+        saved = manager.get_todo_by_id(todo.id)
+        assert (saved.title, saved.priority, saved.status, saved.version) == ("New", Priority.HIGH, Status.COMPLETED, 2)
+        assert [t.title for t in manager.search("alice", "new")] == ["New"]
+        assert [t.title for t in manager.next_todos("alice")] == []
+
+    def test_delete_many_reports_each_item(self, manager):
+        a, b, c = (r.todo for r in manager.create_many(
+            [{"title": t, "owner": "alice"} for t in "abc"]))
+        results = manager.delete_many([a.id, "missing", b.id, a.id], expected_versions={b.id: 2})
+        assert [r.ok for r in results] == [True, False, False, False]
+        assert isinstance(results[2].error, VersionConflictError)
+        assert [t.id for t in manager.get_todos_by_owner("alice")] == [b.id, c.id]
+
+
+class TestSingleWrite:
+    """Test cases for TodoManager writing each batch once."""
+
+    def test_each_batch_is_one_save(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store)
+        results = manager.create_many({"title": f"T{i}", "owner": "alice"} for i in range(50))
+        assert store.writes == 1
+        ids = [r.todo_id for r in results]
+        manager.update_many({"id": i, "status": "COMPLETED"} for i in ids)
+        manager.delete_many(ids[:10])
+        assert store.writes == 3
+
+        reloaded = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        assert [t.id for t in reloaded.query("alice", status="COMPLETED")] == ids[10:]
+
+    def test_failed_batch_does_not_write(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store)
+        manager.create_many([{"title": ""}])
+        assert store.writes == 0
+
+    def test_journal_store_batch(self, tmp_path):
+        manager = TodoManager(store=JournalStore(tmp_path / "todos.json"))
+        manager.create_many({"title": f"T{i}", "owner": "alice"} for i in range(5))
+        reloaded = TodoManager(store=JournalStore(tmp_path / "todos.json"))
+        assert len(reloaded.get_todos_by_owner("alice")) == 5
@@ -0,0 +1,144 @@
+"""
+Tests for the non-interactive commands in cli.py.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import cli
+import main
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "USERS_FILE", tmp_path / "users.json")
+    monkeypatch.setattr(main, "TODOS_FILE", tmp_path / "todos.json")
+    for name in ("TODO_STORAGE", cli.USER_ENV, cli.PASSWORD_ENV, cli.TOKEN_FILE_ENV):
+        monkeypatch.delenv(name, raising=False)
+    main.save_users([{"username": "alice", "password": "pw"}, {"username": "bob", "password": "pw2"}])
+    return tmp_path
+
+
+def run(capsys, *argv, user=("alice", "pw")):
+    auth = ["--user", user[0], "--password", user[1]] if user else []
+    code = cli.main([*auth, *argv])
+    out = capsys.readouterr()
+    return code, out.out, out.err
+
+
+class TestAuthentication:
+    """Test cases for the three ways of signing in."""
+
+    def test_arguments(self, capsys):
+        assert run(capsys, "list")[0] == cli.EXIT_OK
+        assert run(capsys, "list", user=("alice", "wrong"))[0] == cli.EXIT_AUTH
+
+    def test_environment(self, capsys, monkeypatch):
+        monkeypatch.setenv(cli.USER_ENV, "alice")
+        monkeypatch.setenv(cli.PASSWORD_ENV, "pw")
+        assert run(capsys, "list", user=None)[0] == cli.EXIT_OK
+
+    def test_token_file(self, capsys, tmp_path, monkeypatch):
+        token = tmp_path / "token"
+        token.write_text("bob:pw2\n", encoding="utf-8")
+        assert run(capsys, "--token-file", str(token), "add", "From token", user=None)[0] == cli.EXIT_OK
+        monkeypatch.setenv(cli.TOKEN_FILE_ENV, str(token))
+        code, out, _err = run(capsys, "list", user=None)
+        assert code == cli.EXIT_OK
+        assert "From token" in out
+
+    def test_missing_credentials(self, capsys):
+        code, _out, err = run(capsys, "list", user=None)
+        assert code == cli.EXIT_AUTH
+        assert "Not signed in" in err
+
+
+class TestCommands:
+    """Test cases for add, list, show, done and rm."""
+
+    def test_add_and_list_json(self, capsys):
+        code, out, _err = run(capsys, "add", "Buy milk", "--priority", "high", "--details", "2 litres")
+        assert code == cli.EXIT_OK
+        todo_id = out.strip()
+        run(capsys, "add", "Walk dog")
+        run(capsys, "add", "Bob's", user=("bob", "pw2"))
+
+        code, out, _err = run(capsys, "list", "--priority", "HIGH", "--json")
+        [todo] = json.loads(out)
+        assert (todo["id"], todo["details"], todo["priority"]) == (todo_id, "2 litres", "HIGH")
+        _code, out, _err = run(capsys, "list")
+        assert [line.split(None, 3)[3] for line in out.splitlines()] == ["Buy milk", "Walk dog"]
+
+    def test_done_and_rm_by_prefix(self, capsys):
+        first = run(capsys, "add", "First")[1].strip()
+        second = run(capsys, "add", "Second")[1].strip()
+        assert run(capsys, "done", first[:8])[0] == cli.EXIT_OK
+
+        _code, out, _err = run(capsys, "list", "--status", "pending", "--json")
+        assert [t["id"] for t in json.loads(out)] == [second]
+        assert run(capsys, "rm", second)[0] == cli.EXIT_OK
+        _code, out, _err = run(capsys, "show", first[:6], "--json")
+        assert json.loads(out)["status"] == "COMPLETED"
+        assert json.loads(run(capsys, "list", "--json")[1]) != []
+
+    def test_search(self, capsys):
+        run(capsys, "add", "Buy milk")
+        run(capsys, "add", "Walk dog", "--details", "buy treats")
+        run(capsys, "add", "Buy milk", user=("bob", "pw2"))
+
+        _code, out, _err = run(capsys, "search", "buy", "--json")
+        assert [t["title"] for t in json.loads(out)] == ["Buy milk", "Walk dog"]
+        _code, out, _err = run(capsys, "search", "dog", "treats")
+        assert out.split(None, 3)[3].strip() == "Walk dog"
+
+    def test_recent(self, capsys):
+        first = run(capsys, "add", "First")[1].strip()
+        run(capsys, "add", "Second")
+        run(capsys, "done", first)
+
+        _code, out, _err = run(capsys, "recent", "--json")
+        recent = json.loads(out)
+        assert [t["title"] for t in recent] == ["First", "Second"]
+        _code, out, _err = run(capsys, "recent", "--since", recent[0]["updated_at"], "--json")
+        assert [t["title"] for t in json.loads(out)] == ["First"]
+        code, _out, err = run(capsys, "recent", "--since", "soon")
+        assert code == cli.EXIT_NOT_FOUND
+        assert "Invalid timestamp" in err
+
+    def test_next(self, capsys):
+        run(capsys, "add", "Low", "--priority", "low")
+        run(capsys, "add", "High", "--priority", "high")
+        run(capsys, "add", "Mid")
+
+        _code, out, _err = run(capsys, "next", "--limit", "2", "--json")
+        assert [t["title"] for t in json.loads(out)] == ["High", "Mid"]
+
+    def test_unknown_and_ambiguous_prefix(self, capsys):
+        run(capsys, "add", "One")
+        run(capsys, "add", "Two")
+        code, _out, err = run(capsys, "done", "zzzz")
+        assert code == cli.EXIT_NOT_FOUND
+        assert "No to-do matches" in err
+        code, _out, err = run(capsys, "rm", "")
+        assert code == cli.EXIT_NOT_FOUND
+        assert "matches 2 to-dos" in err
+
+    def test_failed_items_are_reported(self, capsys, monkeypatch):
+        todo_id = run(capsys, "add", "Once")[1].strip()
+        code, out, err = run(capsys, "rm", todo_id, todo_id)
+        assert code == cli.EXIT_NOT_FOUND
+        assert out == f"Deleted {todo_id}\n"
+        assert err == f"{todo_id}: no such to-do\n"
+
+        # Deleted by another process between resolving the prefix and the update.
+        gone = run(capsys, "add", "Gone")[1].strip()
+        monkeypatch.setattr(cli, "resolve_id", lambda manager, username, prefix: SimpleNamespace(id="missing"))
+        code, out, err = run(capsys, "done", gone)
+        assert code == cli.EXIT_NOT_FOUND
+        assert (out, err) == ("", "missing: no such to-do\n")
+
+    def test_cannot_touch_other_users_todos(self, capsys):
+        bob_id = run(capsys, "add", "Bob's", user=("bob", "pw2"))[1].strip()
+        assert run(capsys, "rm", bob_id)[0] == cli.EXIT_NOT_FOUND
@@ -0,0 +1,73 @@
+"""
+Tests for the shared clock and integer timestamps.
+"""
+
+import pytest
+
+import clock
+from main import TodoManager
+from models import TodoItem
+from storage import JsonStore
+
+from tests.conftest import StepClock, T0
+
+
+@pytest.fixture
+def fake_clock():
+    """A clock that stands still until the test moves it."""
+    fake = StepClock(T0, step=0)
+    previous = clock.set_clock(fake)
+    yield fake
+    clock.set_clock(previous)
+
+
+class TestClock:
+    """Test cases for clock conversions."""
+
+    def test_iso_roundtrip(self):
+        assert clock.iso_from_us(T0 + 5) == "2024-01-01T00:00:00.000005+00:00"
+        assert clock.us_from_iso("2024-01-01T00:00:00.000005+00:00") == T0 + 5
+
+    def test_naive_strings_are_utc(self):
+        assert clock.us_from_iso("2024-01-01T00:00:00") == T0
+        assert clock.us_from_iso("2024-01-01T07:00:00+07:00") == T0
+
+    def test_unparseable(self):
+        assert clock.us_from_iso("yesterday") is None
+        assert TodoItem(created_at="yesterday").created_us is None
+
+    def test_set_clock_none_restores_system_clock(self, fake_clock):
+        clock.set_clock(None)
+        assert clock.now_us() > T0
+
+
+class TestManagerTimestamps:
+    """Test cases for TodoManager timestamps coming from the shared clock."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return TodoManager(store=JsonStore(tmp_path / "todos.json"))
+
+    def test_create_and_update_use_the_clock(self, manager, fake_clock):
+        todo = manager.create_todo("Timed", "", "MID", "alice")
+        assert todo.created_at == todo.updated_at == "2024-01-01T00:00:00+00:00"
+
+        fake_clock.now += 1_500_000
+        manager.update_todo(todo.id, title="Later")
+        assert todo.updated_at == "2024-01-01T00:00:01.500000+00:00"
+        assert todo.updated_us == T0 + 1_500_000
+        assert todo.created_us == T0
+
+    def test_updated_at_order_mixes_naive_and_aware(self, tmp_path, fake_clock):
+        records = [
+            {"id": "a", "owner": "alice", "updated_at": "2024-01-01T00:00:02"},
+            {"id": "b", "owner": "alice", "updated_at": "2024-01-01T00:00:01+00:00"},
+            {"id": "c", "owner": "alice", "updated_at": "2024-01-01T08:00:00+09:00"},
+        ]
+        JsonStore(tmp_path / "todos.json").save(records)
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        assert [t.id for t in manager.query("alice", order_by="updated_at")] == ["c", "b", "a"]
+
+        fake_clock.now += 10_000_000
+        manager.update_todo("c", title="Touched")
+        assert [t.id for t in manager.query("alice", order_by="-updated_at")] == ["c", "a", "b"]
@@ -0,0 +1,82 @@
+"""
+Tests for the columnar in-memory todo store.
+"""
+
+import pytest
+
+from columnar import ColumnarTodos
+from main import TodoManager
+from models import Priority, Status, TodoItem
+from storage import JsonStore
+
+
+def make_item(title, **kwargs):
+    return TodoItem(title=title, details=f"{title} details", owner=kwargs.pop("owner", "alice"), **kwargs)
+
+
+class TestColumnarTodos:
+    """Test cases for ColumnarTodos as an id -> TodoItem mapping."""
+
+    def test_roundtrips_every_field(self):
+        items = [
+            make_item("Aware", priority=Priority.HIGH, status=Status.COMPLETED, version=4),
+            make_item("Naive ✓", created_at="2024-01-01T00:00:00", updated_at="2024-01-02T03:04:05.000006"),
+            make_item("Odd", created_at="yesterday", updated_at="2024-01-01T00:00:00+07:00", owner="bob"),
+        ]
+        todos = ColumnarTodos(items)
+        assert list(todos.values()) == items
+        assert todos[items[2].id] == items[2]
+        assert todos.owners == ["alice", "bob"]
+
+    def test_keeps_insertion_order_across_updates_and_deletes(self):
+        items = [make_item(f"T{i}") for i in range(5)]
+        todos = ColumnarTodos(items)
+        items[1].title = "Renamed"
+        todos[items[1].id] = items[1]
+        del todos[items[3].id]
+
+        assert list(todos) == [items[0].id, items[1].id, items[2].id, items[4].id]
+        assert todos[items[1].id].title == "Renamed"
+        assert items[3].id not in todos
+        assert len(todos) == 4
+
+    def test_reads_are_copies(self):
+        item = make_item("Copy")
+        todos = ColumnarTodos([item])
+        view = todos[item.id]
+        view.title = "Changed"
+        assert todos[item.id].title == "Copy"
+
+    def test_compact_reclaims_garbage(self):
+        todos = ColumnarTodos(make_item(f"T{i}") for i in range(10))
+        for todo_id in list(todos)[:6]:
+            del todos[todo_id]
+        before = list(todos.values())
+        todos.compact()
+        assert len(todos.priority) == 4
+        assert list(todos.values()) == before
+
+
+class TestColumnarManager:
+    """Test cases for TodoManager with layout="columnar"."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return TodoManager(store=JsonStore(tmp_path / "todos.json"), layout="columnar")
+
+    def test_create_update_delete(self, manager, tmp_path):
+        a = manager.create_todo("A", "", "HIGH", "alice")
+        b = manager.create_todo("B", "", "LOW", "alice")
+        assert manager.update_todo(a.id, status="completed", expected_version=1) is True
+        assert manager.delete_todo(b.id) is True
+
+        assert isinstance(manager.todos, ColumnarTodos)
+        [todo] = manager.query("alice", status="COMPLETED")
+        assert (todo.id, todo.version) == (a.id, 2)
+
+        reloaded = TodoManager(store=JsonStore(tmp_path / "todos.json"), layout="columnar")
+        assert reloaded.get_todo_by_id(a.id) == todo
+
+    def test_unknown_layout(self, tmp_path):
+        with pytest.raises(ValueError):
+            TodoManager(store=JsonStore(tmp_path / "todos.json"), layout="rows")
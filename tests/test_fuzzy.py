@@ -0,0 +1,167 @@
+"""
+Tests for typo-tolerant title lookup with the trigram index.
+"""
+
+import json
+
+import pytest
+
+import main
+from indexes import TrigramIndex, load_trigram_index, trigrams
+from main import TodoManager
+from models import TodoItem
+from sqlite_backend import SqliteTodoManager
+from storage import JsonStore
+from tests.conftest import titles
+
+
+def open_manager(tmp_path, **kwargs):
+    return TodoManager(store=JsonStore(tmp_path / "todos.json"), **kwargs)
+
+
+class TestTrigramIndex:
+    """Test cases for the trigram index on its own."""
+
+    def index(self, *titles, owner="alice"):
+        index = TrigramIndex()
+        for i, title in enumerate(titles):
+            index.add(str(i), TodoItem(id=str(i), title=title, owner=owner))
+        return index
+
+    def test_trigrams_are_padded_per_word(self):
+        assert trigrams("Go") == {"  g", " go", "go "}
+        assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+
+    def test_misspellings_and_fragments_match(self):
+        index = self.index("Grocery run", "Pay rent", "Call grandma")
+
+        assert [i for _, i in index.search("alice", "grocry")] == ["0"]
+        assert [i for _, i in index.search("alice", "GROC")] == ["0"]
+        assert index.search("alice", "dentist") == []
+
+    def test_best_matches_first_and_limited(self):
+        index = self.index("Report draft", "Write the quarterly report for finance", "Report")
+
+        results = index.search("alice", "report", limit=2)
+        assert [i for _, i in results] == ["2", "0"]
+        assert results[0][0] == 1.0
+
+    def test_other_owners_are_not_searched(self):
+        index = self.index("Grocery run", owner="bob")
+        assert index.search("alice", "grocery") == []
+
+    def test_update_and_remove(self):
+        index = self.index("Grocery run")
+        before, after = TodoItem(id="0", title="Grocery run", owner="alice"), TodoItem(id="0", title="Gym", owner="alice")
+        index.update("0", before, after)
+        assert index.search("alice", "grocery") == []
+        index.remove("0", after)
+        assert index.postings == {} and index.sizes == {}
+
+    def test_json_round_trip(self):
+        index = self.index("Grocery run", "Pay rent")
+        copy = TrigramIndex.from_json(json.loads(json.dumps(index.to_json())))
+        assert copy.postings == index.postings
+        assert copy.sizes == index.sizes
+
+
+class TestManagerFuzzySearch:
+    """Test cases for TodoManager.fuzzy_search and the saved index."""
+
+    @pytest.mark.parametrize("layout", ["objects", "columnar"])
+    def test_index_follows_changes(self, tmp_path, layout):
+        manager = open_manager(tmp_path, layout=layout)
+        todo = manager.create_todo("Grocery run", "", "MID", "alice")
+        manager.create_todo("Grocery run", "", "MID", "bob")
+        assert titles(manager.fuzzy_search("alice", "grocry")) == ["Grocery run"]
+
+        manager.update_todo(todo.id, title="Gym session")
+        assert manager.fuzzy_search("alice", "grocry") == []
+        assert titles(manager.fuzzy_search("alice", "gym sesion")) == ["Gym session"]
+        manager.delete_todo(todo.id)
+        assert manager.fuzzy_search("alice", "gym") == []
+
+    def test_index_is_saved_on_close_and_reused(self, tmp_path):
+        manager = open_manager(tmp_path)
+        manager.create_todo("Grocery run", "", "MID", "alice")
+        manager.fuzzy_search("alice", "grocery")
+        manager.close()
+        assert (tmp_path / "todos.json.trgm").exists()
+
+        reopened = open_manager(tmp_path)
+        assert titles(reopened.fuzzy_search("alice", "grocry")) == ["Grocery run"]
+        assert reopened._trigram_changed is False  # loaded, not rebuilt
+
+    def test_saved_index_for_older_data_is_ignored(self, tmp_path):
+        manager = open_manager(tmp_path)
+        manager.create_todo("Grocery run", "", "MID", "alice")
+        manager.fuzzy_search("alice", "grocery")
+        manager.close()
+        # Another process changes the data without touching the index.
+        open_manager(tmp_path).create_todo("Pay rent", "", "MID", "alice")
+
+        reopened = open_manager(tmp_path)
+        assert load_trigram_index(tmp_path / "todos.json.trgm", None, reopened._signature) is None
+        assert titles(reopened.fuzzy_search("alice", "pay rnt")) == ["Pay rent"]
+
+    def test_owner_scoped_loads_keep_separate_sections(self, tmp_path):
+        store_path = tmp_path / "todos.json"
+        open_manager(tmp_path).create_many([{"title": "Grocery run", "owner": "alice"},
+                                            {"title": "Gym", "owner": "bob"}])
+        for owner in ("alice", "bob"):
+            scoped = TodoManager(store=JsonStore(store_path, owner=owner))
+            scoped.fuzzy_search(owner, "x")
+            scoped.close()
+
+        saved = json.loads((tmp_path / "todos.json.trgm").read_text())
+        assert sorted(s["scope"] for s in saved["sections"]) == ["alice", "bob"]
+        bob = TodoManager(store=JsonStore(store_path, owner="bob"))
+        assert titles(bob.fuzzy_search("bob", "gym")) == ["Gym"]
+        assert bob._trigram_changed is False
+
+    def test_sqlite_fuzzy_search(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        manager.create_todo("Grocery run", "", "MID", "alice")
+        manager.create_todo("Grocery run", "", "MID", "bob")
+        manager.create_todo("Pay rent", "", "MID", "alice")
+
+        results = manager.fuzzy_search("alice", "grocry")
+        assert [(t.title, t.owner) for t in results] == [("Grocery run", "alice")]
+
+
+class TestSelectTodo:
+    """Test cases for the selection screens' title search."""
+
+    def test_search_narrows_the_pick_list(self, tmp_path, monkeypatch, capsys):
+        manager = open_manager(tmp_path)
+        for title in ("Pay rent", "Grocery run", "Call mum"):
+            manager.create_todo(title, "", "MID", "alice")
+        answers = iter(["grocry", "1"])
+        monkeypatch.setattr("builtins.input", lambda _prompt="": next(answers))
+
+        todo = main._select_todo(manager, "alice", "Pick")
+        assert todo.title == "Grocery run"
+        assert "Pay rent" not in capsys.readouterr().out
+
+    def test_empty_search_lists_everything(self, tmp_path, monkeypatch):
+        manager = open_manager(tmp_path)
+        for title in ("Pay rent", "Grocery run"):
+            manager.create_todo(title, "", "MID", "alice")
+        answers = iter(["", "2"])
+        monkeypatch.setattr("builtins.input", lambda _prompt="": next(answers))
+
+        assert main._select_todo(manager, "alice", "Pick").title == "Grocery run"
+
+    def test_no_match_and_bad_choice(self, tmp_path, monkeypatch, capsys):
+        manager = open_manager(tmp_path)
+        manager.create_todo("Pay rent", "", "MID", "alice")
+        answers = iter(["dentist", "", "5", "", "x"])
+        monkeypatch.setattr("builtins.input", lambda _prompt="": next(answers))
+
+        assert main._select_todo(manager, "alice", "Pick") is None
+        assert main._select_todo(manager, "alice", "Pick") is None
+        assert main._select_todo(manager, "alice", "Pick") is None
+        out = capsys.readouterr().out
+        assert "No matching to-dos." in out
+        assert "Invalid selection." in out
+        assert "Invalid input." in out
@@ -0,0 +1,68 @@
+"""
+Tests for time-ordered todo ids.
+"""
+
+import uuid
+
+import pytest
+
+import ids
+from ids import _Uuid7Generator, id_generator, id_timestamp_ms
+from tests.conftest import StepClock
+
+MS = 1000
+T0_MS = 1_700_000_000_000
+
+
+class TestUuid7:
+    """Test cases for the uuid7 generator."""
+
+    def test_is_a_canonical_version_7_uuid(self):
+        value = ids.uuid7()
+        parsed = uuid.UUID(value)
+        assert str(parsed) == value
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+
+    def test_monotonic_within_one_millisecond(self):
+        generate = _Uuid7Generator(StepClock(T0_MS * MS, step=0))
+        values = [generate() for _ in range(10_000)]
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+
+    def test_monotonic_when_clock_steps_back(self):
+        clock = StepClock(T0_MS * MS, step=0)
+        generate = _Uuid7Generator(clock)
+        first = generate()
+        clock.now -= 5_000 * MS
+        assert generate() > first
+
+    def test_sorts_by_creation_time(self):
+        clock = StepClock(T0_MS * MS, step=0)
+        generate = _Uuid7Generator(clock)
+        values = []
+        for step in (0, 1, 250, 86_400_000):
+            clock.now += step * MS
+            values.append(generate())
+        assert values == sorted(values)
+        assert id_timestamp_ms(values[0]) == T0_MS
+
+    def test_timestamp_of_other_ids(self):
+        assert id_timestamp_ms(str(uuid.uuid4())) is None
+        assert id_timestamp_ms("legacy-id") is None
+
+
+class TestIdGenerator:
+    """Test cases for choosing the id scheme."""
+
+    def test_default_is_uuid4(self, monkeypatch):
+        monkeypatch.delenv(ids.ID_SCHEME_ENV, raising=False)
+        assert uuid.UUID(id_generator()()).version == 4
+
+    def test_env_selects_uuid7(self, monkeypatch):
+        monkeypatch.setenv(ids.ID_SCHEME_ENV, "UUID7")
+        assert id_generator() is ids.uuid7
+
+    def test_unknown_scheme(self):
+        with pytest.raises(ValueError):
+            id_generator("ulid")
@@ -4,6 +4,7 @@ Tests for TodoItem class, Priority and Status enums.
 """
 
 import pytest
+from dataclasses import asdict
 from datetime import datetime
 from uuid import UUID
 from src.models import TodoItem, Priority, Status, User
@@ -880,4 +881,48 @@ class TestEditTodoItem:
         assert todo.status == Status.COMPLETED
         
         assert todo.title == "Finish project"
-        assert todo.owner == "developer1"
\ No newline at end of file
+        assert todo.owner == "developer1"
+
+class TestTodoItemFastPath:
+    """Test cases for the slotted TodoItem and its fast from_dict path."""
+
+    def test_todo_item_has_no_instance_dict(self):
+        todo = TodoItem(title="Slotted")
+        assert not hasattr(todo, "__dict__")
+        with pytest.raises(AttributeError):
+            todo.unknown_field = 1
+
+    def test_from_dict_does_not_generate_defaults_for_present_fields(self, monkeypatch):
+        import src.models as models_module
+
+        def fail():
+            raise AssertionError("default generated for a present field")
+
+        monkeypatch.setattr(models_module, "_new_id", fail)
+        monkeypatch.setattr(models_module, "_now_iso", fail)
+        todo = TodoItem.from_dict({
+            "id": "x",
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-02T00:00:00",
+        })
+        assert todo.id == "x"
+
+    def test_from_dict_missing_timestamps_share_one_now(self):
+        todo = TodoItem.from_dict({"id": "x"})
+        assert todo.created_at == todo.updated_at
+
+    def test_from_dict_accepts_enum_members(self):
+        todo = TodoItem.from_dict({"priority": Priority.HIGH, "status": Status.COMPLETED})
+        assert todo.priority == Priority.HIGH
+        assert todo.status == Status.COMPLETED
+
+    def test_from_dict_invalid_status_raises(self):
+        with pytest.raises(ValueError):
+            TodoItem.from_dict({"status": "DONE"})
+
+    def test_to_dict_matches_asdict_output(self):
+        todo = TodoItem(title="Same", priority=Priority.LOW, owner="alice")
+        expected = asdict(todo)
+        expected["priority"] = "LOW"
+        expected["status"] = "PENDING"
+        assert todo.to_dict() == expected
@@ -0,0 +1,192 @@
+"""
+Tests for sharing one data file between several TodoManagers and processes.
+"""
+
+import json
+import multiprocessing
+import sys
+
+import pytest
+
+import cli
+import flusher
+import main
+from filelock import FileLock, file_signature
+from main import TodoManager
+from models import VersionConflictError
+from storage import JournalStore, JsonStore, ShardedStore
+
+
+def create_many(path: str, owner: str, count: int) -> None:
+    manager = TodoManager(store=JsonStore(path))
+    for i in range(count):
+        manager.create_todo(f"{owner}-{i}", "", "MID", owner)
+
+
+class TestReloadOnChange:
+    """Test cases for change detection between managers."""
+
+    def test_second_manager_sees_first_managers_writes(self, tmp_path):
+        first = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        second = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+
+        todo = first.create_todo("From first", "", "MID", "alice")
+        assert second.get_todo_by_id(todo.id).title == "From first"
+
+    def test_interleaved_writes_are_not_lost(self, tmp_path):
+        first = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        second = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+
+        a = first.create_todo("A", "", "MID", "alice")
+        b = second.create_todo("B", "", "MID", "alice")
+        first.update_todo(b.id, title="B edited by first")
+        second.delete_todo(a.id)
+
+        saved = json.loads((tmp_path / "todos.json").read_text(encoding="utf-8"))
+        assert [(t["id"], t["title"]) for t in saved] == [(b.id, "B edited by first")]
+
+    def test_unchanged_file_is_not_reloaded(self, tmp_path):
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        manager.create_todo("A", "", "MID", "alice")
+        assert manager.refresh() is False
+
+    def test_journal_appends_are_detected(self, tmp_path):
+        first = TodoManager(store=JournalStore(tmp_path / "todos.json"))
+        second = TodoManager(store=JournalStore(tmp_path / "todos.json"))
+        todo = first.create_todo("Journaled", "", "MID", "alice")
+        assert second.get_todo_by_id(todo.id) is not None
+
+    def test_sharded_store_detects_new_shard(self, tmp_path):
+        admin = TodoManager(store=ShardedStore(tmp_path / "todos"))
+        TodoManager(store=ShardedStore(tmp_path / "todos", owner="bob")).create_todo("B", "", "MID", "bob")
+        assert [t.title for t in admin.get_todos_by_owner("bob")] == ["B"]
+
+    def test_batched_changes_merge_with_other_writers(self, tmp_path):
+        batched = TodoManager(store=JsonStore(tmp_path / "todos.json"), durability="batched", flush_interval=60)
+        strict = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+
+        mine = batched.create_todo("Mine", "", "MID", "alice")
+        theirs = strict.create_todo("Theirs", "", "MID", "bob")
+        batched.close()
+
+        saved = json.loads((tmp_path / "todos.json").read_text(encoding="utf-8"))
+        assert {t["id"] for t in saved} == {mine.id, theirs.id}
+
+
+class TestBatchedConflicts:
+    """Test cases for a batched and a strict writer changing the same record."""
+
+    def managers(self, tmp_path):
+        strict = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        todo = strict.create_todo("Original", "", "MID", "alice")
+        batched = TodoManager(store=JsonStore(tmp_path / "todos.json"), durability="batched", flush_interval=60)
+        return batched, strict, todo.id
+
+    def saved(self, tmp_path):
+        return {t["id"]: t for t in json.loads((tmp_path / "todos.json").read_text(encoding="utf-8"))}
+
+    def test_stale_expected_version_is_refused(self, tmp_path):
+        batched, strict, todo_id = self.managers(tmp_path)
+        batched.update_todo(todo_id, expected_version=1, title="Batched")
+        strict.update_todo(todo_id, expected_version=1, title="Strict")
+
+        with pytest.raises(VersionConflictError):
+            batched.update_todo(todo_id, expected_version=2, title="Batched again")
+        batched.close()
+        assert self.saved(tmp_path)[todo_id]["title"] == "Strict"
+        assert batched.get_todo_by_id(todo_id).title == "Strict"
+
+    def test_flush_reports_dropped_change(self, tmp_path):
+        batched, strict, todo_id = self.managers(tmp_path)
+        batched.update_todo(todo_id, title="Batched")
+        strict.update_todo(todo_id, title="Strict")
+
+        with pytest.raises(VersionConflictError) as excinfo:
+            batched.flush()
+        assert (excinfo.value.expected, excinfo.value.actual) == (1, 2)
+        assert self.saved(tmp_path)[todo_id]["title"] == "Strict"
+        batched.close()
+
+    def test_delete_does_not_win_over_newer_write(self, tmp_path):
+        batched, strict, todo_id = self.managers(tmp_path)
+        batched.delete_todo(todo_id)
+        strict.update_todo(todo_id, title="Strict")
+
+        with pytest.raises(VersionConflictError):
+            batched.flush()
+        assert todo_id in self.saved(tmp_path)
+        batched.close()
+
+    def conflicting(self, tmp_path):
+        batched, strict, todo_id = self.managers(tmp_path)
+        batched.update_todo(todo_id, title="Batched")
+        strict.update_todo(todo_id, title="Strict")
+        return batched, todo_id
+
+    def test_logout_reports_dropped_change(self, tmp_path, monkeypatch, capsys):
+        batched, todo_id = self.conflicting(tmp_path)
+        monkeypatch.setattr(main, "create_todo_manager", lambda username: batched)
+        monkeypatch.setattr("builtins.input", lambda _prompt="": "9")
+
+        main.post_login_menu("alice")
+        assert f"Your change to to-do {todo_id} was not saved" in capsys.readouterr().out
+
+    def test_cli_exits_with_conflict_code(self, tmp_path, monkeypatch, capsys):
+        batched, todo_id = self.conflicting(tmp_path)
+        monkeypatch.setattr(main, "USERS_FILE", tmp_path / "users.json")
+        main.save_users([{"username": "alice", "password": "pw"}])
+        monkeypatch.setattr(main, "create_todo_manager", lambda username: batched)
+
+        assert cli.main(["--user", "alice", "--password", "pw", "list"]) == cli.EXIT_CONFLICT
+        assert f"Your change to to-do {todo_id} was not saved" in capsys.readouterr().err
+
+    def test_exit_hook_prints_conflict(self, tmp_path, capsys):
+        batched, todo_id = self.conflicting(tmp_path)
+        flusher._flush_all_on_exit()
+        assert todo_id in capsys.readouterr().err
+        assert self.saved(tmp_path)[todo_id]["title"] == "Strict"
+
+    def test_refresh_before_expected_version_check(self, tmp_path):
+        batched, strict, todo_id = self.managers(tmp_path)
+        strict.update_todo(todo_id, title="Strict")
+
+        with pytest.raises(VersionConflictError):
+            batched.update_todo(todo_id, expected_version=1, title="Batched")
+        batched.update_todo(todo_id, expected_version=2, title="Batched")
+        batched.close()
+        assert self.saved(tmp_path)[todo_id]["title"] == "Batched"
+
+
+class TestFileLock:
+    """Test cases for the advisory lock helpers."""
+
+    def test_lock_is_reentrant(self, tmp_path):
+        lock = FileLock(tmp_path / "x.lock")
+        with lock.hold():
+            with lock.hold(shared=True):
+                pass
+        assert (tmp_path / "x.lock").exists()
+
+    def test_signature_changes_on_replace(self, tmp_path):
+        path = tmp_path / "todos.json"
+        assert file_signature(path) is None
+        JsonStore(path).save([])
+        before = file_signature(path)
+        JsonStore(path).save([])
+        assert file_signature(path) != before
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses fork")
+def test_concurrent_processes_do_not_lose_writes(tmp_path):
+    path = tmp_path / "todos.json"
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=create_many, args=(str(path), f"user{n}", 25)) for n in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert len(saved) == 100
+    assert len({t["id"] for t in saved}) == 100
@@ -0,0 +1,92 @@
+"""
+Tests for the "What should I do next?" view and priority ranks.
+"""
+
+from dataclasses import replace
+
+import pytest
+
+import main
+from indexes import PriorityIndex
+from main import TodoManager
+from models import Priority, Status, TodoItem
+from storage import JsonStore
+
+from tests.conftest import titles
+
+pytestmark = pytest.mark.usefixtures("step_clock")
+
+
+def test_priority_rank_follows_urgency():
+    assert [p.rank for p in (Priority.HIGH, Priority.MID, Priority.LOW)] == [0, 1, 2]
+    assert sorted([Priority.LOW, Priority.HIGH, Priority.MID], key=lambda p: p.rank)[0] is Priority.HIGH
+
+
+class TestPriorityIndex:
+    """Test cases for the pending-by-priority index on its own."""
+
+    def test_top_walks_priorities_then_age(self):
+        items = [
+            TodoItem(id="low-old", priority=Priority.LOW, owner="alice", created_at="2024-01-01T00:00:00"),
+            TodoItem(id="high-new", priority=Priority.HIGH, owner="alice", created_at="2024-03-01T00:00:00"),
+            TodoItem(id="high-old", priority=Priority.HIGH, owner="alice", created_at="2024-02-01T00:00:00"),
+            TodoItem(id="mid", priority=Priority.MID, owner="alice", created_at="2024-01-01T00:00:00"),
+            TodoItem(id="done", priority=Priority.HIGH, status=Status.COMPLETED, owner="alice"),
+            TodoItem(id="bob", priority=Priority.HIGH, owner="bob"),
+        ]
+        index = PriorityIndex.build((t.id, t) for t in items)
+
+        assert index.top("alice", 10) == ["high-old", "high-new", "mid", "low-old"]
+        assert index.top("alice", 3) == ["high-old", "high-new", "mid"]
+        assert index.top("alice", 0) == []
+
+    def test_completing_and_reprioritising(self):
+        index = PriorityIndex()
+        a = TodoItem(id="a", priority=Priority.LOW, owner="alice", created_at="2024-01-01T00:00:00")
+        b = TodoItem(id="b", priority=Priority.MID, owner="alice", created_at="2024-01-02T00:00:00")
+        index.add("a", a)
+        index.add("b", b)
+
+        urgent = replace(a, priority=Priority.HIGH)
+        index.update("a", a, urgent)
+        assert index.top("alice", 2) == ["a", "b"]
+
+        done = replace(urgent, status=Status.COMPLETED)
+        index.update("a", urgent, done)
+        assert index.top("alice", 2) == ["b"]
+        index.remove("a", done)
+        index.remove("b", b)
+        assert index.pending == {}
+
+
+class TestNextTodos:
+    """Test cases for TodoManager.next_todos."""
+
+    def test_priority_then_age(self, manager):
+        for title, priority in (("Low", "LOW"), ("Mid", "MID"), ("High 1", "HIGH"), ("High 2", "HIGH")):
+            manager.create_todo(title, "", priority, "alice")
+        manager.create_todo("Bob's", "", "HIGH", "bob")
+
+        assert titles(manager.next_todos("alice", 3)) == ["High 1", "High 2", "Mid"]
+
+    def test_follows_updates_and_deletes(self, manager):
+        low = manager.create_todo("Low", "", "LOW", "alice")
+        high = manager.create_todo("High", "", "HIGH", "alice")
+        manager.create_todo("Mid", "", "MID", "alice")
+        assert titles(manager.next_todos("alice")) == ["High", "Mid", "Low"]
+
+        manager.update_todo(high.id, status="COMPLETED")
+        manager.update_todo(low.id, priority="HIGH")
+        assert titles(manager.next_todos("alice")) == ["Low", "Mid"]
+        manager.delete_todo(low.id)
+        assert titles(manager.next_todos("alice")) == ["Mid"]
+
+
+def test_view_next_todos(tmp_path, capsys):
+    manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+    main.view_next_todos(manager, "alice")
+    assert "Nothing pending" in capsys.readouterr().out
+
+    manager.create_todo("Pay rent", "", "HIGH", "alice")
+    main.view_next_todos(manager, "alice")
+    assert "1) [" in capsys.readouterr().out
@@ -0,0 +1,134 @@
+"""
+Tests for resolving to-dos by a unique id prefix.
+"""
+
+import pytest
+
+import main
+from ids import uuid7
+from indexes import PrefixIndex
+from main import TodoManager
+from models import AmbiguousIdError, TodoItem
+from sqlite_backend import SqliteTodoManager
+from storage import JsonStore
+
+IDS = ("3f2a9c01", "3f2b7700", "77b1e2aa", "77b1e2ff")
+
+
+def item(todo_id, owner="alice"):
+    return TodoItem(id=todo_id, title=todo_id, owner=owner)
+
+
+class TestPrefixIndex:
+    """Test cases for the sorted-id index on its own."""
+
+    def index(self):
+        return PrefixIndex.build((i, item(i)) for i in reversed(IDS))
+
+    def test_ids_are_kept_sorted(self):
+        index = self.index()
+        index.add("00000000", item("00000000"))
+        assert index.by_owner["alice"] == ["00000000", *IDS]
+
+    def test_resolves_unique_prefixes(self):
+        index = self.index()
+        assert index.resolve("alice", "3f2a") == "3f2a9c01"
+        assert index.resolve("alice", "77b1e2f") == "77b1e2ff"
+        assert index.resolve("alice", "3f2b7700") == "3f2b7700"
+
+    def test_missing_and_ambiguous_prefixes(self):
+        index = self.index()
+        assert index.resolve("alice", "4") is None
+        assert index.resolve("alice", "3f2a9c01x") is None
+        assert index.resolve("bob", "3f2a") is None
+        with pytest.raises(AmbiguousIdError) as exc:
+            index.resolve("alice", "77b1")
+        assert exc.value.count == 2
+        with pytest.raises(AmbiguousIdError) as exc:
+            index.resolve("alice", "")
+        assert exc.value.count == 4
+
+    def test_remove_and_change_owner(self):
+        index = self.index()
+        index.remove("77b1e2aa", item("77b1e2aa"))
+        assert index.resolve("alice", "77b1") == "77b1e2ff"
+
+        index.update("77b1e2ff", item("77b1e2ff"), item("77b1e2ff", owner="bob"))
+        assert index.resolve("alice", "77") is None
+        assert index.resolve("bob", "77") == "77b1e2ff"
+
+    def test_shortest_unique_prefix(self):
+        index = PrefixIndex.build((i, item(i)) for i in ("3f2a9c01", "3f2a9c01aa", "77b1e2aa", "77b1e2ab"))
+        assert index.shortest_unique_prefix("alice", "77b1e2aa", min_length=4) == "77b1e2aa"
+        assert index.shortest_unique_prefix("alice", "3f2a9c01aa", min_length=4) == "3f2a9c01a"
+        assert index.shortest_unique_prefix("alice", "3f2a9c01", min_length=4) == "3f2a9c01"
+        assert index.shortest_unique_prefix("alice", "3f2a9c01", min_length=2) == "3f2a9c01"
+        assert index.shortest_unique_prefix("bob", "77b1e2aa", min_length=2) == "77"
+        assert index.shortest_unique_prefix("alice", "3f2a9c01aa") == "3f2a9c01a"
+
+
+class TestManagerResolveId:
+    """Test cases for TodoManager.resolve_id."""
+
+    def test_resolve_follows_creates_and_deletes(self, manager):
+        manager.import_many([item(i).to_dict() for i in IDS[:2]])
+        assert manager.resolve_id("alice", "3f2a").title == "3f2a9c01"
+
+        manager.import_many([item(i).to_dict() for i in IDS[2:]])
+        with pytest.raises(AmbiguousIdError):
+            manager.resolve_id("alice", "77b1")
+        manager.delete_todo("77b1e2aa")
+        assert manager.resolve_id("alice", "77b1").id == "77b1e2ff"
+
+    def test_other_owners_ids_do_not_resolve(self, manager):
+        bob = manager.create_todo("Bob's", "", "MID", "bob")
+        assert manager.resolve_id("alice", bob.id[:8]) is None
+        assert manager.resolve_id("bob", bob.id[:8]).id == bob.id
+
+    def test_sqlite_resolve_id(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        manager.import_many([item(i).to_dict() for i in IDS] + [item("3f2c0000", owner="bob").to_dict()])
+
+        assert manager.resolve_id("alice", "3f2a").id == "3f2a9c01"
+        assert manager.resolve_id("alice", "3f2c") is None
+        assert manager.resolve_id("alice", "zz") is None
+        with pytest.raises(AmbiguousIdError) as exc:
+            manager.resolve_id("alice", "3f2")
+        assert exc.value.count == 2
+
+
+class TestShortId:
+    """Test cases for the id prefixes shown in lists."""
+
+    @pytest.mark.parametrize("backend", ["objects", "columnar", "sqlite"])
+    def test_uuid7_ids_made_together_get_distinct_prefixes(self, backend, tmp_path):
+        if backend == "sqlite":
+            manager = SqliteTodoManager(tmp_path / "todos.db")
+        else:
+            manager = TodoManager(store=JsonStore(tmp_path / "todos.json"), layout=backend)
+        manager.import_many([item(uuid7()).to_dict() for _ in range(50)])
+        todos = manager.get_todos_by_owner("alice")
+        assert len({t.id[:8] for t in todos}) == 1
+
+        shown = [manager.short_id(t) for t in todos]
+        assert len(set(shown)) == len(todos)
+        assert all(len(prefix) > 8 for prefix in shown)
+        assert all(manager.resolve_id("alice", prefix).id == t.id for prefix, t in zip(shown, todos))
+
+    def test_uuid4_ids_show_eight_characters(self, manager):
+        todo = manager.create_todo("Random", "", "MID", "alice")
+        assert manager.short_id(todo) == todo.id[:8]
+
+
+def test_select_todo_by_id_prefix(tmp_path, monkeypatch, capsys):
+    manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+    manager.import_many([item(i).to_dict() for i in IDS])
+    answers = iter(["#3f2b", "#77b1", "#0"])
+    monkeypatch.setattr("builtins.input", lambda _prompt="": next(answers))
+
+    assert main._select_todo(manager, "alice", "Pick").id == "3f2b7700"
+    assert main._select_todo(manager, "alice", "Pick") is None
+    assert main._select_todo(manager, "alice", "Pick") is None
+    out = capsys.readouterr().out
+    assert "'77b1' matches 2 to-dos" in out
+    assert "No to-do has that id." in out
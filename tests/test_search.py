@@ -0,0 +1,133 @@
+"""
+Tests for full-text search over titles and details.
+"""
+
+import sqlite3
+
+import pytest
+
+from indexes import TextIndex, tokenize
+from main import TodoManager
+from models import TodoItem
+from sqlite_backend import SqliteTodoManager, connect
+from storage import JsonStore
+from tests.conftest import titles
+
+
+class TestTextIndex:
+    """Test cases for the inverted index on its own."""
+
+    def test_tokenize_ignores_case_and_punctuation(self):
+        assert tokenize("Buy MILK, eggs & bread!") == ["buy", "milk", "eggs", "bread"]
+
+    def test_every_word_must_match(self):
+        index = TextIndex()
+        index.add("a", TodoItem(id="a", title="Buy milk", owner="alice"))
+        index.add("b", TodoItem(id="b", title="Buy bread", owner="alice"))
+
+        assert index.search("alice", "buy") == ["a", "b"]
+        assert index.search("alice", "buy milk") == ["a"]
+        assert index.search("alice", "buy cheese") == []
+        assert index.search("alice", "  ") == []
+
+    def test_title_matches_rank_above_details_matches(self):
+        index = TextIndex()
+        index.add("d", TodoItem(id="d", title="Shopping", details="milk", owner="alice"))
+        index.add("t", TodoItem(id="t", title="Milk", owner="alice"))
+
+        assert index.search("alice", "milk") == ["t", "d"]
+
+    def test_limit_keeps_best_results(self):
+        index = TextIndex()
+        for i in range(10):
+            index.add(str(i), TodoItem(id=str(i), title="report", details="report " * (i % 3), owner="alice"))
+
+        assert index.search("alice", "report", limit=3) == ["2", "5", "8"]
+
+    def test_remove_drops_empty_postings(self):
+        index = TextIndex()
+        todo = TodoItem(id="a", title="Buy milk", owner="alice")
+        index.add("a", todo)
+        index.remove("a", todo)
+
+        assert index.postings == {}
+        assert index.doc_count == {}
+
+
+class TestManagerSearch:
+    """Test cases for TodoManager.search."""
+
+    def test_results_are_scoped_to_owner(self, manager):
+        manager.create_todo("Buy milk", "", "MID", "alice")
+        manager.create_todo("Buy milk", "", "MID", "bob")
+
+        results = manager.search("alice", "milk")
+        assert [t.owner for t in results] == ["alice"]
+
+    def test_matches_words_in_details(self, manager):
+        manager.create_todo("Shopping", "milk and eggs", "MID", "alice")
+        assert titles(manager.search("alice", "EGGS")) == ["Shopping"]
+
+    def test_index_follows_creates_updates_and_deletes(self, manager):
+        manager.search("alice", "anything")  # build the index first
+        todo = manager.create_todo("Buy milk", "", "MID", "alice")
+        assert titles(manager.search("alice", "milk")) == ["Buy milk"]
+
+        manager.update_todo(todo.id, title="Buy bread")
+        assert manager.search("alice", "milk") == []
+        assert titles(manager.search("alice", "bread")) == ["Buy bread"]
+
+        manager.delete_todo(todo.id)
+        assert manager.search("alice", "bread") == []
+
+    def test_bulk_and_rolled_back_changes_are_indexed(self, manager):
+        manager.search("alice", "anything")
+        manager.create_many([{"title": "Call mum", "owner": "alice"}, {"title": "Call dad", "owner": "alice"}])
+        assert titles(manager.search("alice", "call")) == ["Call mum", "Call dad"]
+
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.delete_many(t.id for t in manager.get_todos_by_owner("alice"))
+                manager.create_todo("Call plumber", "", "MID", "alice")
+                raise RuntimeError("abort")
+        assert titles(manager.search("alice", "call")) == ["Call mum", "Call dad"]
+
+    def test_index_is_built_from_loaded_todos(self, tmp_path):
+        TodoManager(store=JsonStore(tmp_path / "todos.json")).create_todo("Water plants", "", "MID", "alice")
+
+        reloaded = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        assert titles(reloaded.search("alice", "plants")) == ["Water plants"]
+
+
+class TestSqliteSearch:
+    """Test cases for SqliteTodoManager.search."""
+
+    def test_search_follows_changes(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        todo = manager.create_todo("Buy milk", "semi-skimmed", "MID", "alice")
+        manager.create_todo("Buy milk", "", "MID", "bob")
+        manager.create_todo("Milk", "", "MID", "alice")
+
+        assert titles(manager.search("alice", "milk")) == ["Milk", "Buy milk"]
+        assert titles(manager.search("alice", "skimmed buy")) == ["Buy milk"]
+
+        manager.update_todo(todo.id, title="Buy bread")
+        assert titles(manager.search("alice", "buy")) == ["Buy bread"]
+        manager.delete_todo(todo.id)
+        assert manager.search("alice", "buy") == []
+
+    def test_existing_database_is_indexed_on_open(self, tmp_path):
+        db = tmp_path / "todos.db"
+        conn = sqlite3.connect(db)
+        conn.executescript("""
+            CREATE TABLE todos (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL,
+                title TEXT NOT NULL DEFAULT '', details TEXT NOT NULL DEFAULT '',
+                priority TEXT NOT NULL DEFAULT 'MID', status TEXT NOT NULL DEFAULT 'PENDING',
+                owner TEXT NOT NULL DEFAULT '', created_at TEXT NOT NULL DEFAULT '',
+                updated_at TEXT NOT NULL DEFAULT '', version INTEGER NOT NULL DEFAULT 1);
+            INSERT INTO todos (id, title, owner) VALUES ('a1', 'Old todo', 'alice');
+        """)
+        conn.close()
+        connect(db).close()
+
+        assert titles(SqliteTodoManager(db).search("alice", "old")) == ["Old todo"]
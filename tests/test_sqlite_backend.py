@@ -0,0 +1,211 @@
+"""
+Tests for the SQLite-backed TodoManager and the JSON migrator.
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+import main
+import sqlite_backend
+from models import Status, VersionConflictError
+from sqlite_backend import SqliteTodoManager, connect, migrate_from_json, load_users
+
+
+class TestSqliteTodoManager:
+    """Test cases for SqliteTodoManager."""
+
+    def test_create_and_get_by_id(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        todo = manager.create_todo("Buy milk", "2 litres", "high", "alice")
+
+        found = manager.get_todo_by_id(todo.id)
+        assert found == todo
+
+    def test_get_todos_by_owner_keeps_creation_order(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        first = manager.create_todo("First", "", "LOW", "alice")
+        manager.create_todo("Other", "", "LOW", "bob")
+        second = manager.create_todo("Second", "", "LOW", "alice")
+
+        assert [t.id for t in manager.get_todos_by_owner("alice")] == [first.id, second.id]
+
+    def test_update_todo(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        todo = manager.create_todo("Old", "", "LOW", "alice")
+
+        assert manager.update_todo(todo.id, title="New", status="completed") is True
+        updated = manager.get_todo_by_id(todo.id)
+        assert updated.title == "New"
+        assert updated.status == Status.COMPLETED
+
+    def test_update_and_delete_missing_id(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        assert manager.update_todo("missing", title="x") is False
+        assert manager.delete_todo("missing") is False
+
+    def test_delete_todo(self, tmp_path):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        todo = manager.create_todo("Gone", "", "LOW", "alice")
+
+        assert manager.delete_todo(todo.id) is True
+        assert manager.get_todo_by_id(todo.id) is None
+
+    def test_database_uses_wal_and_indexes(self, tmp_path):
+        conn = connect(tmp_path / "todos.db")
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row["name"] for row in conn.execute("PRAGMA index_list(todos)")}
+        assert {"idx_todos_id", "idx_todos_owner_status", "idx_todos_next",
+                "idx_todos_owner_created_us", "idx_todos_owner_updated_us"} <= indexes
+
+    @pytest.mark.parametrize("call", [
+        lambda m: m.next_todos("alice"),
+        lambda m: m.changed_since("alice", 0),
+        lambda m: m.recently_updated("alice"),
+        lambda m: m.created_between("alice", 0, 10**16),
+    ])
+    def test_sorted_queries_read_an_index_in_order(self, tmp_path, call):
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        statements = []
+        manager.conn.set_trace_callback(statements.append)
+        call(manager)
+        manager.conn.set_trace_callback(None)
+        [sql] = [s for s in statements if s.startswith("SELECT")]
+        plan = " ".join(row[3] for row in manager.conn.execute("EXPLAIN QUERY PLAN " + sql))
+        assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, plan
+
+
+class TestMigrateFromJson:
+    """Test cases for the JSON to SQLite migrator."""
+
+    def test_migrates_todos_and_users(self, tmp_path):
+        todos = [
+            {"id": "a", "title": "A", "owner": "alice", "priority": "HIGH"},
+            {"id": "b", "title": "B", "owner": "bob", "status": "COMPLETED"},
+        ]
+        (tmp_path / "todos.json").write_text(json.dumps(todos), encoding="utf-8")
+        (tmp_path / "users.json").write_text(
+            json.dumps([{"username": "alice", "password": "pw"}]), encoding="utf-8"
+        )
+
+        counts = migrate_from_json(tmp_path / "todos.json", tmp_path / "users.json", tmp_path / "todos.db")
+        assert counts == (2, 1)
+
+        manager = SqliteTodoManager(tmp_path / "todos.db")
+        assert manager.get_todo_by_id("a").title == "A"
+        assert manager.get_todo_by_id("b").status == Status.COMPLETED
+        assert load_users(tmp_path / "todos.db") == [{"username": "alice", "password": "pw"}]
+
+    def test_migration_is_repeatable(self, tmp_path):
+        (tmp_path / "todos.json").write_text(json.dumps([{"id": "a", "title": "A"}]), encoding="utf-8")
+        for _ in range(2):
+            migrate_from_json(tmp_path / "todos.json", tmp_path / "users.json", tmp_path / "todos.db")
+
+        conn = connect(tmp_path / "todos.db")
+        assert conn.execute("SELECT COUNT(*) FROM todos").fetchone()[0] == 1
+
+
+def test_create_todo_manager_selects_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setenv("TODO_STORAGE", "sqlite")
+    monkeypatch.setattr(main, "DB_FILE", tmp_path / "todos.db")
+    assert isinstance(main.create_todo_manager(), SqliteTodoManager)
+
+
+def test_query_filters_and_orders(tmp_path):
+    manager = SqliteTodoManager(tmp_path / "todos.db")
+    low = manager.create_todo("Low", "", "LOW", "alice")
+    high = manager.create_todo("High", "", "HIGH", "alice")
+    done = manager.create_todo("Done", "", "MID", "alice")
+    manager.update_todo(done.id, status="COMPLETED")
+
+    assert [t.id for t in manager.query("alice", status="PENDING")] == [low.id, high.id]
+    assert [t.id for t in manager.query("alice", order_by="priority")] == [high.id, done.id, low.id]
+    assert [t.id for t in manager.query("alice", order_by="-created_at", limit=1)] == [done.id]
+    with pytest.raises(ValueError):
+        manager.query("alice", status="DONE")
+    with pytest.raises(ValueError):
+        manager.query("alice", priority="URGENT")
+
+
+def test_compare_and_swap(tmp_path):
+    manager = SqliteTodoManager(tmp_path / "todos.db")
+    todo = manager.create_todo("A", "", "MID", "alice")
+
+    assert manager.update_todo(todo.id, expected_version=1, title="B") is True
+    assert manager.get_todo_by_id(todo.id).version == 2
+    with pytest.raises(VersionConflictError):
+        manager.update_todo(todo.id, expected_version=1, title="Stale")
+    with pytest.raises(VersionConflictError):
+        manager.delete_todo(todo.id, expected_version=1)
+    assert manager.delete_todo(todo.id, expected_version=2) is True
+    assert manager.update_todo(todo.id, expected_version=2, title="Gone") is False
+
+
+def test_version_column_added_to_existing_database(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "todos.db"))
+    conn.execute("CREATE TABLE todos (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, "
+                 "title TEXT, details TEXT, priority TEXT, status TEXT, owner TEXT, "
+                 "created_at TEXT, updated_at TEXT)")
+    conn.execute("INSERT INTO todos (id, title, details, priority, status, owner, created_at, updated_at) "
+                 "VALUES ('old', 'Old', '', 'MID', 'PENDING', 'alice', '', '')")
+    conn.commit()
+    conn.close()
+
+    assert SqliteTodoManager(tmp_path / "todos.db").get_todo_by_id("old").version == 1
+
+
+LEGACY_ROWS = [
+    ("low", "Low", "LOW", "2024-01-01T00:00:00", "2024-01-03T00:00:00"),
+    ("high", "High", "HIGH", "2024-01-02T00:00:00", "2024-01-02T00:00:00"),
+    ("odd", "Odd", "MID", "not a time", "not a time"),
+]
+
+
+def legacy_database(path, extra_columns=""):
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE todos (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, "
+                 "title TEXT, details TEXT, priority TEXT, status TEXT, owner TEXT, "
+                 f"created_at TEXT, updated_at TEXT, version INTEGER NOT NULL DEFAULT 1{extra_columns})")
+    conn.executemany("INSERT INTO todos (id, title, details, priority, status, owner, created_at, updated_at) "
+                     "VALUES (?, ?, '', ?, 'PENDING', 'alice', ?, ?)", LEGACY_ROWS)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_derived_columns_added_to_existing_database(tmp_path):
+    manager = SqliteTodoManager(legacy_database(tmp_path / "todos.db"))
+    assert [t.id for t in manager.next_todos("alice")] == ["high", "odd", "low"]
+    assert [t.id for t in manager.recently_updated("alice")] == ["low", "high", "odd"]
+    assert [t.id for t in manager.created_between("alice", "2024-01-01T12:00:00")] == ["high"]
+    manager.update_todo("low", priority="HIGH")
+    assert [t.id for t in manager.next_todos("alice", limit=2)] == ["low", "high"]
+    assert manager.recently_updated("alice", limit=1)[0].id == "low"
+
+
+def test_interrupted_derived_column_migration_is_rolled_back(tmp_path, monkeypatch):
+    path = legacy_database(tmp_path / "todos.db")
+    calls = []
+
+    def failing_micros(value):
+        calls.append(value)
+        if len(calls) > 2:
+            raise RuntimeError("interrupted")
+        return 0
+
+    monkeypatch.setattr(sqlite_backend, "us_from_iso", failing_micros)
+    with pytest.raises(sqlite3.OperationalError):
+        connect(path)
+    columns = {row[1] for row in sqlite3.connect(str(path)).execute("PRAGMA table_info(todos)")}
+    assert "priority_rank" not in columns
+
+    monkeypatch.undo()
+    assert [t.id for t in SqliteTodoManager(path).next_todos("alice")] == ["high", "odd", "low"]
+
+
+def test_unfilled_derived_columns_are_back_filled(tmp_path):
+    # Columns added by a migration that never got to fill them in.
+    extra = ", priority_rank INTEGER NOT NULL DEFAULT 0, created_us INTEGER NOT NULL DEFAULT 0"
+    manager = SqliteTodoManager(legacy_database(tmp_path / "todos.db", extra))
+    assert [t.id for t in manager.next_todos("alice")] == ["high", "odd", "low"]
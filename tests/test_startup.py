@@ -0,0 +1,96 @@
+"""
+Cold-start regression tests: the command-line path must not pull in modules
+it does not use, and must start within a generous wall-clock budget.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+import startup
+
+# One `list` command in a fresh interpreter may take at most this many times
+# as long as `python -c pass` on the same machine. It measures about 5x: json,
+# dataclasses and pathlib are the bulk of it, and every data-touching command
+# needs them.
+COLD_START_FACTOR = 8
+
+# Modules only the menu, other storage backends or other layouts need.
+LAZY_MODULES = ("sqlite3", "sqlite_backend", "columnar", "flusher", "binfmt",
+                "getpass", "uuid", "typing", "textwrap", "startup")
+
+CHILD = """
+import json, sys
+sys.path.insert(0, {src!r})
+import main
+main.USERS_FILE = main.Path({users!r})
+main.TODOS_FILE = main.Path({todos!r})
+import cli
+code = cli.main(["--user", "alice", "--password", "pw", "list"])
+print(json.dumps(sorted(m for m in {lazy!r} if m in sys.modules)), file=sys.stderr)
+sys.exit(code)
+"""
+
+
+def time_bare_interpreter():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def run_list(tmp_path):
+    users, todos = tmp_path / "users.json", tmp_path / "todos.json"
+    users.write_text(json.dumps([{"username": "alice", "password": "pw"}]))
+    todos.write_text(json.dumps([{"id": "a1", "title": "Buy milk", "owner": "alice"}]))
+    code = CHILD.format(src=str(startup.SRC_DIR), users=str(users), todos=str(todos), lazy=LAZY_MODULES)
+    env = {k: v for k, v in os.environ.items() if not k.startswith("TODO_")}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    return time.perf_counter() - start, proc
+
+
+def test_list_does_not_import_lazy_modules(tmp_path):
+    _, proc = run_list(tmp_path)
+    assert proc.returncode == 0, proc.stderr
+    assert "Buy milk" in proc.stdout
+    assert json.loads(proc.stderr.splitlines()[-1]) == []
+
+
+def test_list_starts_within_budget(tmp_path):
+    bare = min(time_bare_interpreter() for _ in range(3))
+    best = min(run_list(tmp_path)[0] for _ in range(3))
+    budget = COLD_START_FACTOR * bare
+    assert best < budget, f"cold start took {best:.3f}s (budget {budget:.3f}s, bare interpreter {bare:.3f}s)"
+
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:        50 |         50 |     enum
+import time:       200 |        250 |   models
+import time:       900 |       1150 | main
+Traceback: not an import line
+"""
+
+
+def test_parse_importtime():
+    rows, other = startup.parse_importtime(SAMPLE)
+    assert rows == [
+        ("_io", 120, 120, 1),
+        ("io", 300, 420, 0),
+        ("enum", 50, 50, 2),
+        ("models", 200, 250, 1),
+        ("main", 900, 1150, 0),
+    ]
+    assert other == ["Traceback: not an import line"]
+
+
+def test_format_report_lists_direct_imports_slowest_first():
+    rows, _ = startup.parse_importtime(SAMPLE)
+    report = startup.format_report(0.05, rows, top=1).splitlines()
+    assert report[0] == "Startup profile: 50.0 ms wall, 1.6 ms importing 5 modules"
+    assert report[2].endswith("main")
+    assert report[3].endswith("(1 more)")
@@ -0,0 +1,224 @@
+"""
+Tests for the storage backends used by TodoManager.
+"""
+
+import json
+
+from main import TodoManager
+from storage import JsonStore, JournalStore, ShardedStore, open_store, reshard
+from tests.conftest import lock_is_held
+
+
+def make_manager(tmp_path, **kwargs):
+    return TodoManager(store=JournalStore(tmp_path / "todos.json", **kwargs))
+
+
+class TestJsonStore:
+    """Test cases for the single-file JSON store."""
+
+    def test_load_missing_file_returns_empty_list(self, tmp_path):
+        assert JsonStore(tmp_path / "todos.json").load() == []
+
+    def test_load_invalid_json_returns_empty_list(self, tmp_path):
+        path = tmp_path / "todos.json"
+        path.write_text("{not json", encoding="utf-8")
+        assert JsonStore(path).load() == []
+
+    def test_mutations_rewrite_the_file(self, tmp_path):
+        path = tmp_path / "todos.json"
+        manager = TodoManager(store=JsonStore(path))
+        todo = manager.create_todo("Buy milk", "", "HIGH", "alice")
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        assert [t["id"] for t in data] == [todo.id]
+
+
+class TestJournalStore:
+    """Test cases for the snapshot + append-only journal store."""
+
+    def test_create_appends_to_journal_not_snapshot(self, tmp_path):
+        manager = make_manager(tmp_path)
+        manager.create_todo("Buy milk", "", "HIGH", "alice")
+
+        assert not (tmp_path / "todos.json").exists()
+        lines = (tmp_path / "todos.journal").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["op"] == "create"
+
+    def test_update_and_delete_are_replayed_on_load(self, tmp_path):
+        manager = make_manager(tmp_path)
+        keep = manager.create_todo("Keep", "", "LOW", "alice")
+        drop = manager.create_todo("Drop", "", "LOW", "alice")
+        manager.update_todo(keep.id, title="Kept", status="COMPLETED")
+        manager.delete_todo(drop.id)
+
+        reloaded = make_manager(tmp_path)
+        todos = reloaded.get_todos_by_owner("alice")
+        assert [t.id for t in todos] == [keep.id]
+        assert todos[0].title == "Kept"
+        assert todos[0].status.value == "COMPLETED"
+
+    def test_journal_is_compacted_past_threshold(self, tmp_path):
+        manager = make_manager(tmp_path, max_journal_bytes=512)
+        for i in range(10):
+            manager.create_todo(f"Todo {i}", "x" * 20, "MID", "alice")
+
+        journal = tmp_path / "todos.journal"
+        assert journal.stat().st_size <= 512
+        snapshot = json.loads((tmp_path / "todos.json").read_text(encoding="utf-8"))
+        assert len(snapshot) + len(journal.read_text().splitlines()) >= 10
+        assert len(make_manager(tmp_path).todos) == 10
+
+    def test_replay_after_compaction_is_idempotent(self, tmp_path):
+        manager = make_manager(tmp_path)
+        todo = manager.create_todo("Once", "", "MID", "alice")
+        manager.update_todo(todo.id, title="Twice")
+        journal = (tmp_path / "todos.journal").read_text(encoding="utf-8")
+
+        # Simulate a crash after the snapshot was written but before the
+        # journal was truncated.
+        manager.store.compact(t.to_dict() for t in manager.todos.values())
+        (tmp_path / "todos.journal").write_text(journal, encoding="utf-8")
+
+        reloaded = make_manager(tmp_path)
+        assert len(reloaded.todos) == 1
+        assert [t.title for t in reloaded.todos.values()] == ["Twice"]
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        manager = make_manager(tmp_path)
+        manager.create_todo("Survivor", "", "MID", "alice")
+        with open(tmp_path / "todos.journal", "a", encoding="utf-8") as f:
+            f.write('{"op": "create", "todo": {"id"')
+
+        assert [t.title for t in make_manager(tmp_path).todos.values()] == ["Survivor"]
+
+    def test_append_after_torn_line_is_kept(self, tmp_path):
+        make_manager(tmp_path).create_todo("Before crash", "", "MID", "alice")
+        journal = tmp_path / "todos.journal"
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"op": "create", "todo": {"id"')
+
+        make_manager(tmp_path).create_todo("After crash", "", "MID", "alice")
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write("not json\n")
+        make_manager(tmp_path).create_todo("After garbage", "", "MID", "alice")
+
+        titles = [t.title for t in make_manager(tmp_path).todos.values()]
+        assert titles == ["Before crash", "After crash", "After garbage"]
+        assert journal.read_text(encoding="utf-8").endswith("\n")
+
+
+class TestOpenStore:
+    """Test cases for backend selection."""
+
+    def test_default_is_json(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("TODO_STORAGE", raising=False)
+        store = open_store(tmp_path / "todos.json")
+        assert type(store) is JsonStore
+
+    def test_journal_selected_by_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TODO_STORAGE", "journal")
+        monkeypatch.setenv("TODO_JOURNAL_MAX_BYTES", "2048")
+        store = open_store(tmp_path / "todos.json")
+        assert isinstance(store, JournalStore)
+        assert store.max_journal_bytes == 2048
+
+
+class TestShardedStore:
+    """Test cases for per-owner sharded storage."""
+
+    def test_owner_scoped_manager_only_loads_its_shard(self, tmp_path):
+        root = tmp_path / "todos"
+        TodoManager(store=ShardedStore(root, owner="alice")).create_todo("A", "", "MID", "alice")
+        TodoManager(store=ShardedStore(root, owner="bob")).create_todo("B", "", "MID", "bob")
+
+        alice = TodoManager(store=ShardedStore(root, owner="alice"))
+        assert [t.title for t in alice.todos.values()] == ["A"]
+        manifest = json.loads((root / "manifest.json").read_text(encoding="utf-8"))
+        assert set(manifest["shards"]) == {"alice", "bob"}
+
+    def test_write_only_touches_owner_shard(self, tmp_path):
+        root = tmp_path / "todos"
+        TodoManager(store=ShardedStore(root, owner="bob")).create_todo("B", "", "MID", "bob")
+        bob_mtime = (root / "shards" / "bob.json").stat().st_mtime_ns
+
+        alice = TodoManager(store=ShardedStore(root, owner="alice"))
+        todo = alice.create_todo("A", "", "MID", "alice")
+        alice.update_todo(todo.id, title="A2")
+
+        assert (root / "shards" / "bob.json").stat().st_mtime_ns == bob_mtime
+        assert json.loads((root / "shards" / "alice.json").read_text())[0]["title"] == "A2"
+
+    def test_deleting_last_todo_removes_shard(self, tmp_path):
+        root = tmp_path / "todos"
+        manager = TodoManager(store=ShardedStore(root, owner="alice"))
+        todo = manager.create_todo("A", "", "MID", "alice")
+        manager.delete_todo(todo.id)
+
+        assert not (root / "shards" / "alice.json").exists()
+        assert ShardedStore(root).owners() == []
+
+    def test_unsafe_owner_names_are_escaped(self, tmp_path):
+        root = tmp_path / "todos"
+        TodoManager(store=ShardedStore(root, owner="../evil")).create_todo("X", "", "MID", "../evil")
+
+        assert [p.name for p in root.glob("shards/*.json")] == ["..%2Fevil.json"]
+        assert len(ShardedStore(root, owner="../evil").load()) == 1
+
+    def test_owner_named_manifest_does_not_clobber_it(self, tmp_path):
+        root = tmp_path / "todos"
+        ShardedStore(root, owner="manifest").save([{"id": "1", "title": "M", "owner": "manifest"}])
+        ShardedStore(root, owner="alice").save([{"id": "2", "title": "A", "owner": "alice"}])
+
+        assert [t["id"] for t in ShardedStore(root, owner="manifest").load()] == ["1"]
+        assert reshard(root) == {"manifest": 1, "alice": 1}
+
+    def test_legacy_file_is_migrated_automatically(self, tmp_path):
+        legacy = tmp_path / "todos.json"
+        legacy.write_text(json.dumps([
+            {"id": "1", "title": "A", "owner": "alice"},
+            {"id": "2", "title": "B", "owner": "bob"},
+            {"id": "3", "title": "C", "owner": "alice"},
+        ]), encoding="utf-8")
+
+        store = ShardedStore(tmp_path / "todos", owner="alice", legacy_path=legacy)
+        assert [t["id"] for t in store.load()] == ["1", "3"]
+        assert [t["id"] for t in ShardedStore(tmp_path / "todos").load_shard("bob")] == ["2"]
+        assert legacy.exists()
+
+    def test_reshard_moves_misplaced_records_and_drops_strays(self, tmp_path):
+        root = tmp_path / "todos"
+        manager = TodoManager(store=ShardedStore(root))
+        manager.create_todo("A", "", "MID", "alice")
+        (root / "shards" / "alice.json").write_text(json.dumps([
+            {"id": "1", "title": "A", "owner": "alice"},
+            {"id": "2", "title": "B", "owner": "bob"},
+        ]), encoding="utf-8")
+        (root / "stray.json").write_text(json.dumps([{"id": "3", "owner": "carol"}]), encoding="utf-8")
+
+        assert reshard(root) == {"alice": 1, "bob": 1, "carol": 1}
+        assert [p.name for p in root.glob("*.json")] == ["manifest.json"]
+        assert sorted(p.name for p in root.glob("shards/*.json")) == ["alice.json", "bob.json", "carol.json"]
+        assert [t["id"] for t in ShardedStore(root, owner="bob").load()] == ["2"]
+
+    def test_reshard_holds_the_store_lock(self, tmp_path, monkeypatch):
+        root = tmp_path / "todos"
+        TodoManager(store=ShardedStore(root, owner="alice")).create_todo("A", "", "MID", "alice")
+        (root / "stray.json").write_text(json.dumps([{"id": "2", "owner": "bob"}]), encoding="utf-8")
+        held = []
+        write_shard = ShardedStore.write_shard
+
+        def checked_write_shard(self, *args, **kwargs):
+            held.append(lock_is_held(tmp_path / "todos.lock"))
+            write_shard(self, *args, **kwargs)
+
+        monkeypatch.setattr(ShardedStore, "write_shard", checked_write_shard)
+        assert reshard(root) == {"alice": 1, "bob": 1}
+        assert held == [True, True]
+
+    def test_sharded_selected_by_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TODO_STORAGE", "sharded")
+        store = open_store(tmp_path / "todos.json", owner="alice")
+        assert isinstance(store, ShardedStore)
+        assert store.root == tmp_path / "todos"
+        assert store.owner == "alice"
@@ -0,0 +1,141 @@
+"""
+Tests for the streaming readers and the on-disk offset index.
+"""
+
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import storage
+from main import TodoManager
+from storage import JsonStore
+from streaming import OffsetIndex, iter_json_array, iter_jsonl, iter_todos
+
+RECORDS = [
+    {"id": "1", "title": "Café", "owner": "alice", "status": "PENDING"},
+    {"id": "2", "title": "B", "owner": "bob", "status": "COMPLETED"},
+    {"id": "3", "title": "C", "owner": "alice", "status": "COMPLETED", "n": 12345},
+]
+
+
+def write_json(path, records, **kwargs):
+    path.write_text(json.dumps(records, **kwargs), encoding="utf-8")
+    return path
+
+
+class TestIterJsonArray:
+    """Test cases for the incremental JSON array reader."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64 * 1024])
+    def test_reads_every_record_across_chunk_boundaries(self, chunk_size):
+        data = json.dumps(RECORDS, indent=2, ensure_ascii=False).encode("utf-8")
+        records = [r for r, _, _ in iter_json_array(io.BytesIO(data), chunk_size=chunk_size)]
+        assert records == RECORDS
+
+    def test_offsets_point_at_each_record(self):
+        data = json.dumps(RECORDS, ensure_ascii=False).encode("utf-8")
+        for record, offset, length in iter_json_array(io.BytesIO(data), chunk_size=5):
+            assert json.loads(data[offset:offset + length]) == record
+
+    def test_empty_array_and_empty_file(self):
+        assert list(iter_json_array(io.BytesIO(b"  [ ]\n"))) == []
+        assert list(iter_json_array(io.BytesIO(b""))) == []
+
+    @pytest.mark.parametrize("data", [b"[{\"id\": 1}", b"[{\"id\": 1} {\"id\": 2}]", b"{\"id\": 1}"])
+    def test_malformed_input_raises(self, data):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_array(io.BytesIO(data)))
+
+
+class TestIterTodos:
+    """Test cases for filtered streaming."""
+
+    def test_filters_by_owner_and_status(self, tmp_path):
+        path = write_json(tmp_path / "todos.json", RECORDS)
+        assert [r["id"] for r in iter_todos(path, owner="alice")] == ["1", "3"]
+        assert [r["id"] for r in iter_todos(path, status="PENDING")] == ["1"]
+        assert [r["id"] for r in iter_todos(path, where=lambda r: "n" in r)] == ["3"]
+
+    def test_reads_jsonl_files(self, tmp_path):
+        path = tmp_path / "todos.jsonl"
+        path.write_text("\n".join(json.dumps(r) for r in RECORDS) + "\n\n", encoding="utf-8")
+        assert [r["id"] for r in iter_todos(path, owner="bob")] == ["2"]
+
+    def test_jsonl_offsets(self):
+        data = b'{"id": "a"}\n\n{"id": "b"}\n'
+        assert [(o, n) for _, o, n in iter_jsonl(io.BytesIO(data))] == [(0, 11), (13, 11)]
+
+
+class TestOwnerScopedJsonStore:
+    """Test cases for JsonStore loading and merging a single owner's rows."""
+
+    def test_load_only_returns_owner_records(self, tmp_path):
+        path = write_json(tmp_path / "todos.json", RECORDS)
+        assert [t["id"] for t in JsonStore(path, owner="alice").load()] == ["1", "3"]
+
+    def test_save_keeps_other_owners_and_order(self, tmp_path):
+        path = write_json(tmp_path / "todos.json", RECORDS)
+        manager = TodoManager(store=JsonStore(path, owner="alice"))
+        manager.update_todo("1", title="Changed")
+        manager.delete_todo("3")
+        new = manager.create_todo("New", "", "MID", "alice")
+
+        saved = json.loads(path.read_text(encoding="utf-8"))
+        assert [t["id"] for t in saved] == ["1", "2", new.id]
+        assert saved[0]["title"] == "Changed"
+        assert saved[1] == RECORDS[1]
+
+    def test_other_owners_records_are_copied_as_stored(self, tmp_path):
+        path = write_json(tmp_path / "todos.json", RECORDS, ensure_ascii=False)
+        TodoManager(store=JsonStore(path, owner="alice")).update_todo("1", title="Changed")
+
+        assert json.dumps(RECORDS[1], ensure_ascii=False) in path.read_text(encoding="utf-8")
+
+    def test_full_save_matches_json_dump(self, tmp_path):
+        path = tmp_path / "todos.json"
+        JsonStore(path).save(RECORDS)
+        assert path.read_text(encoding="utf-8") == json.dumps(RECORDS, indent=2)
+
+    def test_large_files_are_streamed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(JsonStore, "STREAM_MIN_BYTES", 0)
+        path = write_json(tmp_path / "todos.json", RECORDS, indent=2)
+        assert [t["id"] for t in JsonStore(path, owner="alice").load()] == ["1", "3"]
+        JsonStore(path, owner="bob").save([])
+        assert [t["id"] for t in JsonStore(path).load()] == ["1", "3"]
+
+    def test_stream_and_scoped_load_never_parse_the_whole_file(self, tmp_path, monkeypatch):
+        path = write_json(tmp_path / "todos.json", RECORDS)
+        monkeypatch.setattr(storage, "json", SimpleNamespace(loads=lambda text: pytest.fail("parsed the whole file")))
+        assert [t["id"] for t in JsonStore(path).stream("alice")] == ["1", "3"]
+        assert [t["id"] for t in JsonStore(path, owner="alice").load()] == ["1", "3"]
+
+    def test_jsonl_store_round_trip(self, tmp_path):
+        path = tmp_path / "todos.jsonl"
+        manager = TodoManager(store=JsonStore(path))
+        todo = manager.create_todo("Line", "", "MID", "alice")
+
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+        assert TodoManager(store=JsonStore(path)).get_todo_by_id(todo.id).title == "Line"
+
+
+class TestOffsetIndex:
+    """Test cases for the persisted id -> offset index."""
+
+    def test_build_and_lookup(self, tmp_path):
+        path = write_json(tmp_path / "todos.json", RECORDS, indent=2, ensure_ascii=False)
+        index = OffsetIndex.build(path)
+
+        assert OffsetIndex.index_path(path).exists()
+        assert len(index) == 3
+        assert index.get("3") == RECORDS[2]
+        assert index.get("missing") is None
+
+    def test_open_reuses_fresh_index_and_rebuilds_stale_one(self, tmp_path):
+        path = write_json(tmp_path / "todos.json", RECORDS)
+        OffsetIndex.build(path)
+        assert OffsetIndex.open(path).get("1") == RECORDS[0]
+
+        write_json(path, RECORDS[::-1] + [{"id": "4", "title": "Newer"}])
+        assert OffsetIndex.open(path).get("4") == {"id": "4", "title": "Newer"}
@@ -0,0 +1,106 @@
+"""
+Tests for time-ordered queries: changed since, created between and most recent.
+"""
+
+import pytest
+
+import clock
+from indexes import TimeIndex
+from main import TodoManager
+from models import TodoItem
+from storage import JsonStore
+
+from tests.conftest import SECOND, T0, titles
+
+pytestmark = pytest.mark.usefixtures("step_clock")
+
+
+def stamp(seconds):
+    return clock.iso_from_us(T0 + seconds * SECOND)
+
+
+class TestTimeIndex:
+    """Test cases for the sorted time index on its own."""
+
+    def item(self, todo_id, created, updated, owner="alice"):
+        return TodoItem(id=todo_id, owner=owner, created_at=stamp(created), updated_at=stamp(updated))
+
+    def test_ranges_and_latest(self):
+        items = [self.item("a", 1, 5), self.item("b", 2, 3), self.item("c", 3, 9), self.item("d", 4, 4, owner="bob")]
+        index = TimeIndex.build((t.id, t) for t in reversed(items))
+
+        assert index.ids("alice", "created_at") == ["a", "b", "c"]
+        assert index.ids("alice", "created_at", since=T0 + 2 * SECOND, until=T0 + 3 * SECOND) == ["b"]
+        assert index.ids("alice", "updated_at", since=T0 + 4 * SECOND) == ["a", "c"]
+        assert index.ids("alice", "updated_at", descending=True) == ["c", "a", "b"]
+        assert index.latest("alice", "updated_at", 2) == ["c", "a"]
+        assert index.latest("alice", "updated_at", 10) == ["c", "a", "b"]
+        assert index.latest("carol", "updated_at", 10) == []
+
+    def test_incremental_changes(self):
+        index = TimeIndex()
+        a, b = self.item("a", 1, 1), self.item("b", 2, 2)
+        index.add("a", a)
+        index.add("b", b)
+        touched = self.item("a", 1, 7)
+        index.update("a", a, touched)
+        assert index.latest("alice", "updated_at", 1) == ["a"]
+
+        index.remove("a", touched)
+        index.remove("b", b)
+        assert index.keys == {}
+
+    def test_unparseable_timestamps_sort_first(self):
+        index = TimeIndex()
+        index.add("a", self.item("a", 1, 1))
+        index.add("x", TodoItem(id="x", owner="alice", created_at="yesterday", updated_at="?"))
+        assert index.ids("alice", "created_at") == ["x", "a"]
+
+
+class TestManagerTimeQueries:
+    """Test cases for changed_since, created_between and recently_updated."""
+
+    def test_recently_updated(self, manager):
+        todos = [manager.create_todo(f"T{i}", "", "MID", "alice") for i in range(4)]
+        manager.create_todo("Bob's", "", "MID", "bob")
+        manager.update_todo(todos[1].id, status="COMPLETED")
+
+        assert titles(manager.recently_updated("alice", 3)) == ["T1", "T3", "T2"]
+
+    def test_changed_since(self, manager):
+        first = manager.create_todo("First", "", "MID", "alice")
+        second = manager.create_todo("Second", "", "MID", "alice")
+        checkpoint = manager.get_todo_by_id(second.id).updated_at
+        manager.update_todo(first.id, title="First, edited")
+        manager.create_todo("Third", "", "MID", "alice")
+
+        assert titles(manager.changed_since("alice", checkpoint)) == ["Second", "First, edited", "Third"]
+        assert titles(manager.changed_since("alice", checkpoint, limit=1)) == ["Second"]
+        assert manager.changed_since("alice", T0 + 100 * SECOND) == []
+
+    def test_created_between(self, manager):
+        for i in range(5):
+            manager.create_todo(f"T{i}", "", "MID", "alice")  # created at T0 + 1..5 s
+
+        assert titles(manager.created_between("alice", stamp(2), stamp(4))) == ["T1", "T2"]
+        assert titles(manager.created_between("alice", end=T0 + 2 * SECOND)) == ["T0"]
+        assert titles(manager.created_between("alice", start=stamp(5))) == ["T4"]
+
+    def test_deleted_todos_drop_out(self, manager):
+        todo = manager.create_todo("Gone", "", "MID", "alice")
+        manager.delete_todo(todo.id)
+        assert manager.recently_updated("alice") == []
+
+    def test_invalid_timestamp(self, manager):
+        with pytest.raises(ValueError):
+            manager.changed_since("alice", "last tuesday")
+
+
+def test_query_order_by_updated_at_uses_index_with_filters(tmp_path, step_clock):
+    manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+    todos = [manager.create_todo(f"T{i}", "", "HIGH" if i % 2 else "LOW", "alice") for i in range(4)]
+    manager.query("alice", order_by="updated_at")  # build the index before the update
+    manager.update_todo(todos[1].id, details="touched")
+
+    assert titles(manager.query("alice", priority="HIGH", order_by="-updated_at")) == ["T1", "T3"]
+    assert titles(manager.query("alice", order_by="updated_at", limit=2, offset=1)) == ["T2", "T3"]
@@ -0,0 +1,199 @@
+"""
+Tests for TodoManager operations against a temporary data file.
+"""
+
+import pytest
+
+from main import TodoManager
+from models import Priority, Status, VersionConflictError
+from storage import JsonStore
+
+
+@pytest.fixture
+def json_manager(tmp_path):
+    return TodoManager(store=JsonStore(tmp_path / "todos.json"))
+
+
+class TestIdIndex:
+    """Test cases for id-keyed point operations."""
+
+    def test_get_todo_by_id(self, json_manager):
+        todo = json_manager.create_todo("Find me", "", "HIGH", "alice")
+        assert json_manager.get_todo_by_id(todo.id) == todo
+
+    def test_get_todo_by_unknown_id(self, json_manager):
+        assert json_manager.get_todo_by_id("missing") is None
+
+    def test_update_todo_by_id(self, json_manager):
+        todo = json_manager.create_todo("Old", "", "LOW", "alice")
+        assert json_manager.update_todo(todo.id, title="New", priority="high") is True
+
+        updated = json_manager.get_todo_by_id(todo.id)
+        assert updated.title == "New"
+        assert updated.priority == Priority.HIGH
+        assert updated.status == Status.PENDING
+
+    def test_update_unknown_id(self, json_manager):
+        assert json_manager.update_todo("missing", title="x") is False
+
+    def test_delete_keeps_order_of_remaining_todos(self, json_manager):
+        ids = [json_manager.create_todo(f"T{i}", "", "MID", "alice").id for i in range(5)]
+        assert json_manager.delete_todo(ids[2]) is True
+        assert json_manager.delete_todo(ids[2]) is False
+
+        assert [t.id for t in json_manager.get_todos_by_owner("alice")] == ids[:2] + ids[3:]
+
+    def test_index_is_rebuilt_on_load(self, json_manager, tmp_path):
+        todo = json_manager.create_todo("Persisted", "", "MID", "alice")
+
+        reloaded = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        assert reloaded.get_todo_by_id(todo.id).title == "Persisted"
+
+
+class TestCanonicalItems:
+    """Test cases for TodoItem instances as the in-memory store."""
+
+    def test_reads_return_the_stored_instance(self, json_manager):
+        todo = json_manager.create_todo("Shared", "", "HIGH", "alice")
+        assert json_manager.get_todo_by_id(todo.id) is todo
+        assert json_manager.get_todos_by_owner("alice")[0] is todo
+        assert json_manager.query("alice", status="pending")[0] is todo
+
+    def test_update_sets_enum_members(self, json_manager):
+        todo = json_manager.create_todo("Enum", "", "LOW", "alice")
+        json_manager.update_todo(todo.id, priority="bogus", status="completed")
+        assert todo.priority is Priority.MID
+        assert todo.status is Status.COMPLETED
+        assert [t.id for t in json_manager.query("alice", priority="MID")] == [todo.id]
+        assert json_manager.query("alice", priority="LOW") == []
+
+    def test_file_still_holds_plain_records(self, json_manager, tmp_path):
+        todo = json_manager.create_todo("On disk", "", "HIGH", "alice")
+        json_manager.update_todo(todo.id, status="COMPLETED")
+        [record] = JsonStore(tmp_path / "todos.json").load()
+        assert record == todo.to_dict()
+        assert record["status"] == "COMPLETED"
+
+
+class TestOwnerIndexQueries:
+    """Test cases for per-owner indexes and TodoManager.query."""
+
+    @pytest.fixture
+    def populated(self, json_manager):
+        a = json_manager.create_todo("Alpha", "", "LOW", "alice")
+        b = json_manager.create_todo("bravo", "", "HIGH", "alice")
+        c = json_manager.create_todo("Charlie", "", "MID", "alice")
+        json_manager.create_todo("Other", "", "HIGH", "bob")
+        json_manager.update_todo(b.id, status="COMPLETED")
+        return json_manager, a, b, c
+
+    def test_get_todos_by_owner_only_returns_owner_rows(self, populated):
+        manager, a, b, c = populated
+        assert [t.id for t in manager.get_todos_by_owner("alice")] == [a.id, b.id, c.id]
+        assert manager.get_todos_by_owner("nobody") == []
+
+    def test_query_by_status(self, populated):
+        manager, a, b, c = populated
+        assert [t.id for t in manager.query("alice", status="PENDING")] == [a.id, c.id]
+        assert [t.id for t in manager.query("alice", status=Status.COMPLETED)] == [b.id]
+
+    def test_query_by_status_and_priority(self, populated):
+        manager, a, b, c = populated
+        assert [t.id for t in manager.query("alice", status="pending", priority="low")] == [a.id]
+        assert manager.query("alice", status="COMPLETED", priority="LOW") == []
+
+    def test_status_change_keeps_creation_order(self, populated):
+        manager, a, b, c = populated
+        manager.update_todo(b.id, status="PENDING")
+        assert [t.id for t in manager.query("alice", status="PENDING")] == [a.id, b.id, c.id]
+
+    def test_query_order_by(self, populated):
+        manager, a, b, c = populated
+        assert [t.id for t in manager.query("alice", order_by="priority")] == [b.id, c.id, a.id]
+        assert [t.id for t in manager.query("alice", order_by="title")] == [a.id, b.id, c.id]
+        assert [t.id for t in manager.query("alice", order_by="-created_at")] == [c.id, b.id, a.id]
+
+    def test_query_limit_and_offset(self, populated):
+        manager, a, b, c = populated
+        assert [t.id for t in manager.query("alice", limit=2)] == [a.id, b.id]
+        assert [t.id for t in manager.query("alice", limit=2, offset=2)] == [c.id]
+
+    def test_query_rejects_bad_arguments(self, populated):
+        manager = populated[0]
+        with pytest.raises(ValueError):
+            manager.query("alice", status="DONE")
+        with pytest.raises(ValueError):
+            manager.query("alice", order_by="owner")
+
+    def test_deleted_todo_leaves_indexes(self, populated):
+        manager, a, b, c = populated
+        manager.delete_todo(b.id)
+        assert manager.query("alice", status="COMPLETED") == []
+        assert [t.id for t in manager.get_todos_by_owner("alice")] == [a.id, c.id]
+
+
+def test_query_ties_keep_creation_order_on_every_backend(manager):
+    a = manager.create_todo("Same", "", "HIGH", "alice")
+    b = manager.create_todo("same", "", "LOW", "alice")
+    c = manager.create_todo("Same", "", "LOW", "alice")
+
+    assert [t.id for t in manager.query("alice", order_by="priority")] == [a.id, b.id, c.id]
+    assert [t.id for t in manager.query("alice", order_by="-priority")] == [b.id, c.id, a.id]
+    assert [t.id for t in manager.query("alice", order_by="-title")] == [a.id, b.id, c.id]
+    assert [t.id for t in manager.query("alice", order_by="-priority", limit=1, offset=1)] == [c.id]
+
+
+class TestVersioning:
+    """Test cases for record versions and compare-and-swap writes."""
+
+    def test_new_todo_starts_at_version_1(self, json_manager):
+        todo = json_manager.create_todo("A", "", "MID", "alice")
+        assert todo.version == 1
+        assert json_manager.get_todo_by_id(todo.id).version == 1
+
+    def test_update_increments_version(self, json_manager):
+        todo = json_manager.create_todo("A", "", "MID", "alice")
+        json_manager.update_todo(todo.id, title="B")
+        json_manager.update_todo(todo.id, title="C")
+        assert json_manager.get_todo_by_id(todo.id).version == 3
+
+    def test_update_with_matching_version(self, json_manager):
+        todo = json_manager.create_todo("A", "", "MID", "alice")
+        assert json_manager.update_todo(todo.id, expected_version=1, title="B") is True
+        assert json_manager.get_todo_by_id(todo.id).title == "B"
+
+    def test_stale_update_raises_and_changes_nothing(self, json_manager):
+        todo = json_manager.create_todo("A", "", "MID", "alice")
+        json_manager.update_todo(todo.id, title="B")
+
+        with pytest.raises(VersionConflictError) as excinfo:
+            json_manager.update_todo(todo.id, expected_version=1, title="Stale")
+        assert (excinfo.value.expected, excinfo.value.actual) == (1, 2)
+        assert json_manager.get_todo_by_id(todo.id).title == "B"
+
+    def test_stale_delete_raises_and_keeps_todo(self, json_manager):
+        todo = json_manager.create_todo("A", "", "MID", "alice")
+        json_manager.update_todo(todo.id, status="COMPLETED")
+
+        with pytest.raises(VersionConflictError):
+            json_manager.delete_todo(todo.id, expected_version=1)
+        assert json_manager.delete_todo(todo.id, expected_version=2) is True
+
+    def test_missing_todo_is_not_a_conflict(self, json_manager):
+        assert json_manager.update_todo("missing", expected_version=1, title="x") is False
+        assert json_manager.delete_todo("missing", expected_version=1) is False
+
+    def test_conflict_across_managers(self, json_manager, tmp_path):
+        todo = json_manager.create_todo("A", "", "MID", "alice")
+        other = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        seen = other.get_todo_by_id(todo.id)
+
+        json_manager.update_todo(todo.id, title="First writer")
+        with pytest.raises(VersionConflictError):
+            other.update_todo(todo.id, expected_version=seen.version, title="Second writer")
+
+    def test_legacy_record_without_version(self, tmp_path):
+        (tmp_path / "todos.json").write_text('[{"id": "old", "title": "Old"}]', encoding="utf-8")
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        assert manager.get_todo_by_id("old").version == 1
+        assert manager.update_todo("old", expected_version=1, title="New") is True
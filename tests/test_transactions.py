@@ -0,0 +1,134 @@
+"""
+Tests for TodoManager.transaction() and its SQLite counterpart.
+"""
+
+import pytest
+
+from main import TodoManager
+from sqlite_backend import SqliteTodoManager
+from storage import JsonStore
+
+from tests.conftest import CountingStore
+
+
+class Boom(Exception):
+    pass
+
+
+def reopen(manager, tmp_path):
+    if isinstance(manager, SqliteTodoManager):
+        return SqliteTodoManager(tmp_path / "todos.db")
+    return TodoManager(store=JsonStore(tmp_path / "todos.json"))
+
+
+def titles(manager):
+    return [t.title for t in manager.get_todos_by_owner("alice")]
+
+
+class TestTransaction:
+    """Test cases shared by both TodoManager implementations."""
+
+    def test_commit_and_read_your_writes(self, manager, tmp_path):
+        keep = manager.create_todo("Keep", "", "MID", "alice")
+        with manager.transaction():
+            todo = manager.create_todo("New", "", "HIGH", "alice")
+            manager.update_todo(keep.id, title="Kept")
+            assert titles(manager) == ["Kept", "New"]
+            assert manager.get_todo_by_id(todo.id).title == "New"
+        assert titles(reopen(manager, tmp_path)) == ["Kept", "New"]
+
+    def test_rollback_restores_everything(self, manager, tmp_path):
+        a = manager.create_todo("A", "", "MID", "alice")
+        b = manager.create_todo("B", "", "MID", "alice")
+        c = manager.create_todo("C", "", "LOW", "alice")
+        with pytest.raises(Boom):
+            with manager.transaction():
+                manager.create_todo("New", "", "HIGH", "alice")
+                manager.update_todo(a.id, title="A2", status="COMPLETED")
+                manager.delete_todo(b.id)
+                manager.update_todo(c.id, priority="HIGH")
+                manager.delete_todo(c.id)
+                raise Boom()
+
+        assert titles(manager) == ["A", "B", "C"]
+        assert manager.get_todo_by_id(a.id).version == 1
+        assert [t.id for t in manager.query("alice", status="COMPLETED")] == []
+        assert [t.id for t in manager.query("alice", priority="LOW")] == [c.id]
+        assert titles(reopen(manager, tmp_path)) == ["A", "B", "C"]
+
+    def test_nested_rollback_keeps_outer_changes(self, manager, tmp_path):
+        with manager.transaction():
+            manager.create_todo("Outer", "", "MID", "alice")
+            with pytest.raises(Boom):
+                with manager.transaction():
+                    manager.create_todo("Inner", "", "MID", "alice")
+                    raise Boom()
+            with manager.transaction():
+                manager.create_todo("Inner ok", "", "MID", "alice")
+        assert titles(reopen(manager, tmp_path)) == ["Outer", "Inner ok"]
+
+    def test_outer_rollback_undoes_committed_inner(self, manager):
+        with pytest.raises(Boom):
+            with manager.transaction():
+                with manager.transaction():
+                    manager.create_todo("Inner", "", "MID", "alice")
+                raise Boom()
+        assert titles(manager) == []
+
+
+class TestJsonTransaction:
+    """Test cases for the file-backed TodoManager."""
+
+    def test_commit_is_one_write(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store)
+        with manager.transaction():
+            todo = manager.create_todo("One", "", "MID", "alice")
+            manager.update_todo(todo.id, title="Two")
+            manager.create_many([{"title": "Three", "owner": "alice"}])
+            assert store.writes == 0
+        assert store.writes == 1
+
+    def test_rollback_writes_nothing(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store)
+        with pytest.raises(Boom):
+            with manager.transaction():
+                manager.create_todo("One", "", "MID", "alice")
+                raise Boom()
+        assert store.writes == 0
+        manager.create_todo("Two", "", "MID", "alice")
+        assert titles(TodoManager(store=JsonStore(tmp_path / "todos.json"))) == ["Two"]
+
+    def test_failed_save_rolls_back(self, tmp_path):
+        class FailingStore(JsonStore):
+            def save(self, todos):
+                raise OSError("disk full")
+
+        manager = TodoManager(store=FailingStore(tmp_path / "todos.json"))
+        with pytest.raises(OSError):
+            with manager.transaction():
+                manager.create_todo("Lost", "", "MID", "alice")
+        assert titles(manager) == []
+
+    def test_rollback_restores_held_instance(self, tmp_path):
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        todo = manager.create_todo("Held", "", "MID", "alice")
+        with pytest.raises(Boom):
+            with manager.transaction():
+                manager.update_todo(todo.id, title="Changed")
+                raise Boom()
+        assert todo.title == "Held"
+        assert manager.get_todo_by_id(todo.id) is todo
+
+    def test_batched_rollback(self, tmp_path):
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"), durability="batched",
+                              flush_interval=60, flush_ops=1000)
+        keep = manager.create_todo("Keep", "", "MID", "alice")
+        with pytest.raises(Boom):
+            with manager.transaction():
+                manager.delete_todo(keep.id)
+                manager.create_todo("Gone", "", "MID", "alice")
+                raise Boom()
+        manager.close()
+        assert titles(TodoManager(store=JsonStore(tmp_path / "todos.json"))) == ["Keep"]
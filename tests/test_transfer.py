@@ -0,0 +1,139 @@
+"""
+Tests for JSON Lines export/import and the admin commands that use them.
+"""
+
+import json
+
+import pytest
+
+import admin
+import main
+from clock import us_from_iso
+from main import TodoManager
+from storage import JsonStore, ShardedStore
+from transfer import RecordFilter, chunk_ranges, iter_jsonl_chunks
+
+
+def record(i, owner="alice", status="PENDING", priority="MID", created_at="2024-01-01T00:00:00+00:00"):
+    return {"id": f"id-{i}", "title": f"T{i}", "details": "", "priority": priority, "status": status,
+            "owner": owner, "created_at": created_at, "updated_at": created_at, "version": 1}
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+class TestRecordFilter:
+    """Test cases for RecordFilter."""
+
+    def test_fields(self):
+        flt = RecordFilter(owner="alice", status="COMPLETED", priority="HIGH")
+        assert flt.matches(record(1, status="COMPLETED", priority="HIGH"))
+        assert not flt.matches(record(1, owner="bob", status="COMPLETED", priority="HIGH"))
+        assert not flt.matches(record(1, priority="HIGH"))
+
+    def test_date_range_is_half_open_and_mixes_naive_and_aware(self):
+        flt = RecordFilter(since=us_from_iso("2024-01-02"), until=us_from_iso("2024-01-03"))
+        assert flt.matches(record(1, created_at="2024-01-02T00:00:00"))
+        assert flt.matches(record(1, created_at="2024-01-02T23:59:59+00:00"))
+        assert not flt.matches(record(1, created_at="2024-01-03T00:00:00+00:00"))
+        assert not flt.matches(record(1, created_at="not a date"))
+
+
+class TestChunkedParsing:
+    """Test cases for splitting and parsing JSON Lines input."""
+
+    def test_chunks_end_on_line_boundaries(self, tmp_path):
+        path = tmp_path / "in.jsonl"
+        write_jsonl(path, [record(i) for i in range(100)])
+        ranges = chunk_ranges(path, chunk_bytes=500)
+        assert len(ranges) > 1
+        data = path.read_bytes()
+        assert all(data[end - 1:end] == b"\n" for _start, end in ranges)
+        assert ranges[-1][1] == len(data)
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_parse_in_order_with_errors(self, tmp_path, workers):
+        path = tmp_path / "in.jsonl"
+        lines = [json.dumps(record(i)) for i in range(50)]
+        lines[10] = "{broken"
+        lines[20] = "[1, 2]"
+        path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+        records, errors = [], []
+        for chunk_records, chunk_errors in iter_jsonl_chunks(path, workers=workers, chunk_bytes=300):
+            records += chunk_records
+            errors += chunk_errors
+        assert [r["id"] for r in records] == [f"id-{i}" for i in range(50) if i not in (10, 20)]
+        assert len(errors) == 2
+
+
+class TestAdminCommands:
+    """Test cases for admin.py export and import."""
+
+    @pytest.fixture
+    def data_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "todos.json"
+        monkeypatch.setattr(admin, "TODOS_FILE", path)
+        monkeypatch.setattr(main, "TODOS_FILE", path)
+        monkeypatch.delenv("TODO_STORAGE", raising=False)
+        return path
+
+    def test_export_with_filters(self, data_file, tmp_path):
+        JsonStore(data_file).save([
+            record(1, created_at="2024-01-01T00:00:00+00:00"),
+            record(2, status="COMPLETED", created_at="2024-02-01T00:00:00+00:00"),
+            record(3, owner="bob", created_at="2024-02-01T00:00:00+00:00"),
+            record(4, created_at="2024-03-01T00:00:00"),
+        ])
+        out = tmp_path / "out.jsonl"
+        assert admin.main(["export", "-o", str(out), "--owner", "alice", "--since", "2024-01-15"]) == 0
+        assert [json.loads(line)["id"] for line in out.read_text().splitlines()] == ["id-2", "id-4"]
+
+        assert admin.main(["export", "-o", str(out), "--status", "completed"]) == 0
+        assert [json.loads(line)["id"] for line in out.read_text().splitlines()] == ["id-2"]
+
+    def test_export_sharded(self, data_file, tmp_path, monkeypatch):
+        ShardedStore(tmp_path / "todos").save([record(1), record(2, owner="bob")])
+        monkeypatch.setenv("TODO_STORAGE", "sharded")
+        out = tmp_path / "out.jsonl"
+        assert admin.main(["export", "-o", str(out), "--owner", "bob"]) == 0
+        assert [json.loads(line)["id"] for line in out.read_text().splitlines()] == ["id-2"]
+
+    def test_import_keeps_records_and_reports_skips(self, data_file, tmp_path, capsys):
+        JsonStore(data_file).save([record(0)])
+        src = tmp_path / "in.jsonl"
+        write_jsonl(src, [record(0), record(1, priority="HIGH"), record(2, owner="bob"),
+                          record(3, priority="URGENT")])
+        assert admin.main(["import", str(src), "--owner", "alice", "--workers", "1"]) == 1
+
+        todos = TodoManager(store=JsonStore(data_file)).get_todos_by_owner("alice")
+        assert [t.id for t in todos] == ["id-0", "id-1"]
+        assert todos[1].to_dict() == record(1, priority="HIGH")
+        out = capsys.readouterr()
+        assert "Imported 1 to-dos" in out.out
+        assert "Duplicate id id-0" in out.err
+
+    def test_import_overwrite(self, data_file, tmp_path):
+        JsonStore(data_file).save([record(0), record(1)])
+        src = tmp_path / "in.jsonl"
+        changed = dict(record(0), title="Replaced", version=5)
+        write_jsonl(src, [changed])
+        assert admin.main(["import", str(src), "--overwrite", "--workers", "1"]) == 0
+
+        manager = TodoManager(store=JsonStore(data_file))
+        assert [t.title for t in manager.get_todos_by_owner("alice")] == ["Replaced", "T1"]
+        assert manager.get_todo_by_id("id-0").version == 5
+
+    def test_roundtrip_through_sqlite(self, data_file, tmp_path, monkeypatch):
+        JsonStore(data_file).save([record(i) for i in range(5)])
+        out = tmp_path / "out.jsonl"
+        assert admin.main(["export", "-o", str(out)]) == 0
+
+        monkeypatch.setattr(main, "DB_FILE", tmp_path / "todos.db")
+        monkeypatch.setattr(admin, "DB_FILE", tmp_path / "todos.db")
+        monkeypatch.setenv("TODO_STORAGE", "sqlite")
+        assert admin.main(["import", str(out), "--workers", "1"]) == 0
+        again = tmp_path / "again.jsonl"
+        assert admin.main(["export", "-o", str(again)]) == 0
+        assert again.read_text() == out.read_text()
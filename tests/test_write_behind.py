@@ -0,0 +1,122 @@
+"""
+Tests for TodoManager's batched (write-behind) durability mode.
+"""
+
+import json
+import time
+
+import pytest
+
+from main import TodoManager
+from storage import JsonStore
+
+from tests.conftest import CountingStore
+
+
+class FailingOnceStore(CountingStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.failed = False
+
+    def save(self, todos):
+        if not self.failed:
+            self.failed = True
+            raise OSError("disk full")
+        super().save(todos)
+
+
+def saved_titles(path):
+    if not path.exists():
+        return []
+    return [t["title"] for t in json.loads(path.read_text(encoding="utf-8"))]
+
+
+class TestBatchedDurability:
+    """Test cases for coalesced background saves."""
+
+    def test_mutations_are_not_written_immediately(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store, durability="batched", flush_interval=60, flush_ops=1000)
+        for i in range(10):
+            manager.create_todo(f"T{i}", "", "MID", "alice")
+
+        assert store.writes == 0
+        manager.flush()
+        assert store.writes == 1
+        assert len(saved_titles(tmp_path / "todos.json")) == 10
+        manager.close()
+
+    def test_flush_without_changes_does_not_write(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store, durability="batched", flush_interval=60)
+        manager.flush()
+        manager.close()
+        assert store.writes == 0
+
+    def test_op_count_threshold_triggers_flush(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store, durability="batched", flush_interval=60, flush_ops=3)
+        for i in range(3):
+            manager.create_todo(f"T{i}", "", "MID", "alice")
+
+        deadline = time.monotonic() + 5
+        while store.writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert saved_titles(tmp_path / "todos.json") == ["T0", "T1", "T2"]
+        manager.close()
+
+    def test_interval_triggers_flush(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store, durability="batched", flush_interval=0.05, flush_ops=1000)
+        manager.create_todo("Later", "", "MID", "alice")
+
+        deadline = time.monotonic() + 5
+        while store.writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert saved_titles(tmp_path / "todos.json") == ["Later"]
+        manager.close()
+
+    def test_failed_background_save_is_retried_and_reported(self, tmp_path):
+        store = FailingOnceStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store, durability="batched", flush_interval=0.05, flush_ops=1000)
+        manager.create_todo("Retry", "", "MID", "alice")
+
+        deadline = time.monotonic() + 5
+        while not store.failed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert manager.flusher._thread.is_alive()
+        with pytest.raises(OSError, match="disk full"):
+            manager.flush()
+        assert saved_titles(tmp_path / "todos.json") == ["Retry"]
+        manager.close()
+
+    def test_close_writes_pending_changes(self, tmp_path):
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"), durability="batched", flush_interval=60)
+        todo = manager.create_todo("Pending", "", "MID", "alice")
+        manager.update_todo(todo.id, title="Renamed")
+        manager.close()
+
+        assert saved_titles(tmp_path / "todos.json") == ["Renamed"]
+
+    def test_strict_mode_saves_every_mutation(self, tmp_path):
+        store = CountingStore(tmp_path / "todos.json")
+        manager = TodoManager(store=store, durability="strict")
+        manager.create_todo("A", "", "MID", "alice")
+        manager.create_todo("B", "", "MID", "alice")
+        assert store.writes == 2
+
+    def test_durability_from_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TODO_DURABILITY", "batched")
+        manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+        assert manager.flusher is not None
+        manager.close()
+
+    def test_unknown_durability(self, tmp_path):
+        with pytest.raises(ValueError):
+            TodoManager(store=JsonStore(tmp_path / "todos.json"), durability="sometimes")
+
+
+def test_save_leaves_no_temp_file(tmp_path):
+    manager = TodoManager(store=JsonStore(tmp_path / "todos.json"))
+    manager.create_todo("A", "", "MID", "alice")
+    assert not list(tmp_path.glob("*.tmp"))